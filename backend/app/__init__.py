@@ -24,13 +24,38 @@ if os.path.exists(dotenv_path):
 from .models.user import User
 from .models.base import db
 from .utils.logger import setup_logger
+from .services.image_writer import init_image_writer
+from .services.image_store import init_image_stores
+from .services.thumbnails import init_thumbnails
+from .services.activity_logger import init_activity_logger
+from .services.reports import init_report_progress
+from .services.monthly_matrix import init_monthly_matrix_cache
+from .services.summary import init_daily_summary
+from .services.dashboard import init_dashboard_counters
+from .services.attendance_status import init_status_job
+from .services.archive import init_archiver
+from .services.events import init_event_broker
+from .services.revocation import init_revocation
+from .utils.identity import init_identity
+from .utils.compression import init_compression, send_precompressed
 from .config import get_config, BASE_DIR
 
 
 def cleanup_thread_function(app):
     """
     Background thread to periodically clean up old attendance images.
+
+    Every process runs this thread, but only the one holding the retention
+    lock does the cleanup. The others retry every ``RETENTION_INTERVAL`` so
+    one of them takes over if the leader exits.
     """
+    from .services.retention import LeaderLock
+
+    lock = LeaderLock(
+        os.path.join(app.config["RETENTION_STATE_FOLDER"], "retention.lock")
+    )
+    last_run = 0
+
     with app.app_context():
         while True:
             try:
@@ -39,15 +64,18 @@ def cleanup_thread_function(app):
                     cleanup_old_attendance_images,
                 )
 
-                # Run the cleanup function
-                cleanup_old_attendance_images()
+                # Run the cleanup once every 24 hours (86400 seconds)
+                if time.time() - last_run >= 86400:
+                    if cleanup_old_attendance_images(lock):
+                        last_run = time.time()
 
-                # Sleep for 24 hours (86400 seconds)
-                time.sleep(86400)
+                time.sleep(app.config["RETENTION_INTERVAL"])
             except Exception as e:
                 app.logger.error(f"Error in cleanup thread: {e}")
                 # Sleep for 1 hour before retrying if there was an error
                 time.sleep(3600)
+            finally:
+                db.session.remove()
 
 
 def create_app(config_name=None):
@@ -63,6 +91,13 @@ def create_app(config_name=None):
     os.makedirs(app.config["TEMP_ATTENDANCE_FOLDER"], exist_ok=True)
     os.makedirs(app.config["ANNOTATIONS_FOLDER"], exist_ok=True)
 
+    # Start the background writer for attendance images
+    init_image_writer(app)
+    init_image_stores(app)
+    init_thumbnails(app)
+    init_report_progress(app)
+    init_monthly_matrix_cache(app)
+
     # Initialize CORS
     CORS(
         app,
@@ -73,8 +108,16 @@ def create_app(config_name=None):
     # Initialize database
     db.init_app(app)
 
+    # Start the buffered activity log writer
+    init_activity_logger(app)
+
+    # Keep the daily attendance summary up to date
+    init_daily_summary(app)
+
     # Initialize JWT
     jwt = JWTManager(app)
+    init_revocation(app, jwt)
+    init_identity(app, jwt)
 
     # Initialize rate limiter
     limiter = Limiter(
@@ -86,7 +129,7 @@ def create_app(config_name=None):
     app.limiter = limiter
 
     # Set up logging
-    if not app.debug:
+    if not app.debug and not app.testing:
         # Create logs directory if it doesn't exist
         logs_dir = os.path.join(BASE_DIR, "..", "logs")
         os.makedirs(logs_dir, exist_ok=True)
@@ -113,35 +156,35 @@ def create_app(config_name=None):
 
     app.register_blueprint(api_bp)
 
+    # Compress responses and precompress the frontend files
+    init_compression(app)
+
     # Serve frontend files (for development and testing)
     @app.route("/app")
     @app.route("/app/<path:path>")
     def serve_frontend(path=""):
-        """Serve the frontend application files."""
-        frontend_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "frontend"
-        )
+        """Serve the frontend application files, precompressed if possible."""
+        frontend_dir = app.config["FRONTEND_FOLDER"]
+        max_age = app.config["STATIC_HASHED_MAX_AGE"]
 
         if path == "":
-            return send_from_directory(frontend_dir, "index.html")
+            return send_precompressed(frontend_dir, "index.html")
 
         # Try to serve the requested file
-        if os.path.exists(os.path.join(frontend_dir, path)):
-            return send_from_directory(frontend_dir, path)
+        if os.path.isfile(os.path.join(frontend_dir, path)):
+            return send_precompressed(frontend_dir, path, max_age)
 
         # If file doesn't exist, serve index.html (for SPA routing)
-        return send_from_directory(frontend_dir, "index.html")
+        return send_precompressed(frontend_dir, "index.html")
 
     # Serve frontend assets
     @app.route("/assets/<path:path>")
     def serve_frontend_assets(path):
-        """Serve the frontend assets."""
-        frontend_assets_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            "frontend",
-            "assets",
+        """Serve the frontend assets, precompressed if possible."""
+        frontend_assets_dir = os.path.join(app.config["FRONTEND_FOLDER"], "assets")
+        return send_precompressed(
+            frontend_assets_dir, path, app.config["STATIC_HASHED_MAX_AGE"]
         )
-        return send_from_directory(frontend_assets_dir, path)
 
     # Create database if it doesn't exist
     with app.app_context():
@@ -199,17 +242,33 @@ def create_app(config_name=None):
 
             db.session.commit()
 
+    # Load the dashboard counters and publish live events once the tables exist
+    init_dashboard_counters(app)
+    init_event_broker(app)
+
+    # Compute late, present and absent statuses of the days that have ended
+    init_status_job(app)
+
+    # Move old attendance and activity to the archive tables
+    init_archiver(app)
+
     # Start the cleanup thread
-    cleanup_thread = threading.Thread(
-        target=cleanup_thread_function, args=(app,), daemon=True
-    )
-    cleanup_thread.start()
-    app.logger.info("Started background thread for attendance image cleanup")
+    if app.config["RETENTION_ENABLED"]:
+        cleanup_thread = threading.Thread(
+            target=cleanup_thread_function, args=(app,), daemon=True
+        )
+        cleanup_thread.start()
+        app.logger.info("Started background thread for attendance image cleanup")
 
     @app.route("/health")
     def health_check():
         """Health check endpoint for the API."""
-        return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+        return {
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "image_writer": app.image_writer.metrics(),
+            "activity_logger": app.activity_logger.metrics(),
+        }
 
     @app.route("/")
     def index():
@@ -2,9 +2,10 @@
 API blueprint initialization.
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify, make_response
 from flask_restful import Api
 
+from app.models.serializers import dumps
 from app.utils.errors import AppError, ErrorCode
 
 
@@ -13,7 +14,7 @@ class CustomApi(Api):
     def handle_error(self, e):
         # Handle our custom AppError
         if isinstance(e, AppError):
-            return jsonify(e.to_dict()), 400
+            return jsonify(e.to_dict()), e.status_code
 
         # Let the parent handle other errors
         return super().handle_error(e)
@@ -24,6 +25,20 @@ api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
 api = CustomApi(api_bp)
 
 
+@api.representation("application/json")
+def output_json(data, code, headers=None):
+    """Encode resource responses with the fastest available JSON backend."""
+    # Already encoded, e.g. the 403 of admin_required
+    if isinstance(data, Response):
+        data.status_code = code
+        data.headers.extend(headers or {})
+        return data
+
+    response = make_response(dumps(data), code)
+    response.headers.extend(headers or {})
+    return response
+
+
 # Add documentation endpoint for the API
 @api_bp.route("/")
 def api_documentation():
@@ -39,30 +54,64 @@ def api_documentation():
             },
             "personnel": {
                 "/api/v1/personnel": "GET - List all personnel, POST - Create new personnel",
+                "/api/v1/personnel/import": "POST - Create and update personnel from a CSV or JSON roster",
                 "/api/v1/personnel/<id>": "GET - Get personnel details, PUT - Update personnel, DELETE - Remove personnel",
             },
             "attendance": {
                 "/api/v1/attendance": "GET - Get today's attendance, POST - Record attendance",
                 "/api/v1/attendance/history": "GET - Get attendance history",
                 "/api/v1/attendance/pending": "GET - Get pending attendance, POST - Submit for approval",
+                "/api/v1/attendance/pending/bulk": "POST - Approve or reject many pending records at once",
+                "/api/v1/attendance/summary": "GET - Get daily attendance counts per station",
             },
             "face_recognition": {
                 "/api/v1/face/recognize": "POST - Recognize face for attendance",
                 "/api/v1/face/register": "POST - Register face for personnel",
             },
+            "images": {
+                "/api/v1/images/<path>": "GET - Get a stored attendance or registration image",
+                "/api/v1/images/thumbnails/<size>/<path>": "GET - Get a thumbnail of a stored image",
+            },
+            "dashboard": {
+                "/api/v1/dashboard/stats": "GET - Get today's attendance and approval counts",
+                "/api/v1/events": "GET - Stream attendance and approval events (text/event-stream)",
+            },
+            "reports": {
+                "/api/v1/reports/attendance": "GET - Export attendance as csv, excel or pdf (also /api/v1/attendance/report)",
+                "/api/v1/reports/personnel": "GET - Export personnel as csv, excel or pdf",
+                "/api/v1/reports/activity": "GET - Export the activity log as csv, excel or pdf",
+                "/api/v1/reports/monthly": "GET - Get a station's personnel by day attendance matrix for a month",
+                "/api/v1/reports/progress/<report_id>": "GET - Get the progress of a report export",
+            },
         },
     }
 
 
 # Register resources
 from .auth import LoginResource, LogoutResource, TokenRefreshResource
-from .personnel import PersonnelResource, PersonnelListResource
+from .personnel import (
+    PersonnelResource,
+    PersonnelListResource,
+    PersonnelImportResource,
+)
 from .attendance import (
     AttendanceResource,
     AttendanceHistoryResource,
     PendingAttendanceResource,
+    PendingAttendanceBulkResource,
+    AttendanceSummaryResource,
 )
 from .face import FaceRecognitionResource, FaceRegistrationResource
+from .images import ImageResource, ThumbnailResource
+from .dashboard import DashboardStatsResource
+from .events import EventStreamResource
+from .reports import (
+    AttendanceReportResource,
+    PersonnelReportResource,
+    ActivityReportResource,
+    MonthlyAttendanceResource,
+    ReportProgressResource,
+)
 
 # API Routes
 api.add_resource(LoginResource, "/auth/login")
@@ -70,8 +119,20 @@ api.add_resource(LogoutResource, "/auth/logout")
 api.add_resource(TokenRefreshResource, "/auth/refresh")
 api.add_resource(PersonnelResource, "/personnel/<int:personnel_id>")
 api.add_resource(PersonnelListResource, "/personnel")
+api.add_resource(PersonnelImportResource, "/personnel/import")
 api.add_resource(AttendanceResource, "/attendance")
 api.add_resource(AttendanceHistoryResource, "/attendance/history")
 api.add_resource(PendingAttendanceResource, "/attendance/pending")
+api.add_resource(PendingAttendanceBulkResource, "/attendance/pending/bulk")
+api.add_resource(AttendanceSummaryResource, "/attendance/summary")
 api.add_resource(FaceRecognitionResource, "/face/recognize")
 api.add_resource(FaceRegistrationResource, "/face/register")
+api.add_resource(ImageResource, "/images/<path:image_path>")
+api.add_resource(ThumbnailResource, "/images/thumbnails/<size>/<path:image_path>")
+api.add_resource(DashboardStatsResource, "/dashboard/stats")
+api.add_resource(EventStreamResource, "/events")
+api.add_resource(AttendanceReportResource, "/reports/attendance", "/attendance/report")
+api.add_resource(PersonnelReportResource, "/reports/personnel")
+api.add_resource(ActivityReportResource, "/reports/activity")
+api.add_resource(MonthlyAttendanceResource, "/reports/monthly")
+api.add_resource(ReportProgressResource, "/reports/progress/<report_id>")
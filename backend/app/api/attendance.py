@@ -4,21 +4,29 @@ Attendance API endpoints.
 
 from flask import request, jsonify, current_app
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime, timedelta
+from flask_jwt_extended import jwt_required, current_user
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, or_
 
-from app.models.user import User
+from app.models.base import db
+from app.models.serializers import serialize_many
 from app.models.personnel import Personnel
 from app.models.attendance import (
     Attendance,
     PendingAttendance,
     AttendanceType,
-    AttendanceStatus,
 )
-from app.models.activity_log import ActivityLog
+from app.services.activity_logger import log_activity
+from app.services.summary import daily_summary, COUNT_COLUMNS
+from app.services.approvals import resolve_pending_bulk, ACTIONS
+from app.services.archive import attendance_source
+from app.signals import attendance_recorded, pending_created, pending_resolved
 from app.utils.security import admin_required, station_access_required
 from app.utils.validators import validate_required_fields, validate_date_format
 from app.utils.errors import AppError, ErrorCode
+from app.utils.pagination import encode_cursor, decode_cursor, get_page_limit
+from app.utils.streaming import wants_stream, stream_query
+from app.utils.conditional import ListValidators
 from app.services.face_recognition import process_attendance, save_attendance_image
 
 
@@ -80,9 +88,7 @@ class AttendanceResource(Resource):
             dict: Response with attendance status
         """
         try:
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-
+            user = current_user
             if not user:
                 raise AppError("User not found", ErrorCode.AUTH_INVALID_TOKEN)
 
@@ -127,6 +133,14 @@ class AttendanceResource(Resource):
 
             pending.save()
 
+            pending_created.send(
+                current_app._get_current_object(),
+                personnel_id=personnel.id,
+                station_id=personnel.station_id,
+                date=today,
+                pending=pending,
+            )
+
             return {
                 "success": True,
                 "message": "Manual attendance submitted for approval",
@@ -148,14 +162,54 @@ class AttendanceResource(Resource):
             }, 500
 
 
+# Columns that can be requested from the history endpoint with ``fields=``
+HISTORY_FIELDS = frozenset(column.name for column in Attendance.__table__.columns)
+
+# Sort key of the history endpoint: newest first, rows without time in last
+HISTORY_SORT_KEY = ("date", "time_in", "id")
+
+
+def history_after(cursor, source=Attendance):
+    """
+    Build the keyset condition for rows after a history cursor.
+
+    Rows are ordered by ``date DESC, time_in DESC, id DESC``, which puts rows
+    without a time in last on both MySQL and SQLite.
+
+    Args:
+        cursor (list): Date, time in and ID of the last row of the page
+        source: ``Attendance`` or the result of ``attendance_source``
+    """
+    cursor_date, cursor_time_in, cursor_id = cursor
+    if cursor_time_in is None:
+        same_date = and_(source.time_in.is_(None), source.id < cursor_id)
+    else:
+        same_date = or_(
+            source.time_in < cursor_time_in,
+            source.time_in.is_(None),
+            and_(source.time_in == cursor_time_in, source.id < cursor_id),
+        )
+    return or_(
+        source.date < cursor_date,
+        and_(source.date == cursor_date, same_date),
+    )
+
+
 class AttendanceHistoryResource(Resource):
     """Resource for attendance history."""
 
     @jwt_required()
     def get(self):
-        """Get attendance history."""
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        """
+        Get attendance history.
+
+        Results are paginated with ``limit`` and the ``next_cursor`` of the
+        previous page passed as ``cursor``. ``fields`` selects a comma
+        separated subset of columns, which is then the only data loaded.
+        With ``?stream=1`` or ``Accept: application/x-ndjson`` every matching
+        row is streamed instead of one page. Supports ``If-None-Match``.
+        """
+        user = current_user
 
         # Get filter parameters
         personnel_id = request.args.get("personnel_id", type=int)
@@ -171,33 +225,100 @@ class AttendanceHistoryResource(Resource):
                 "error": "Invalid date format. Use YYYY-MM-DD.",
             }, 400
 
-        # Build query
-        query = Attendance.query
+        # Validate pagination and projection parameters
+        fields = None
+        if request.args.get("fields"):
+            fields = [f.strip() for f in request.args["fields"].split(",") if f.strip()]
+            unknown = [f for f in fields if f not in HISTORY_FIELDS]
+            if unknown:
+                return {
+                    "success": False,
+                    "error": f"Unknown fields: {', '.join(unknown)}",
+                }, 400
+
+        limit = get_page_limit(
+            current_app.config["HISTORY_PAGE_SIZE"],
+            current_app.config["HISTORY_MAX_PAGE_SIZE"],
+        )
+
+        try:
+            cursor = None
+            if request.args.get("cursor"):
+                cursor = decode_cursor(request.args["cursor"], [date, datetime, int])
+        except AppError as e:
+            return e.to_dict(), 400
+
+        # Revalidate from the change counters before querying the history.
+        # The default date range moves with the current day.
+        validators = ListValidators(
+            ["attendance"],
+            None if user.is_admin else user.station_id,
+            key=(tuple(sorted(request.args.items(multi=True))), date_from, date_to),
+        )
+        if validators.not_modified():
+            return validators.not_modified_response()
+
+        # Build query, including archived records if the range reaches them
+        date_from = date.fromisoformat(date_from)
+        date_to = date.fromisoformat(date_to)
+        source = attendance_source(date_from, date_to)
+        if fields:
+            # Load only the requested columns plus the sort key
+            names = list(dict.fromkeys([*fields, *HISTORY_SORT_KEY]))
+            query = db.session.query(*[getattr(source, name) for name in names])
+        else:
+            query = db.session.query(source)
 
         # Filter by personnel if provided
         if personnel_id:
-            query = query.filter_by(personnel_id=personnel_id)
+            query = query.filter(source.personnel_id == personnel_id)
 
         # Filter by date range
-        if date_from:
-            query = query.filter(Attendance.date >= date_from)
-
-        if date_to:
-            query = query.filter(Attendance.date <= date_to)
+        query = query.filter(source.date >= date_from, source.date <= date_to)
 
         # Filter by user's access
         if not user.is_admin:
-            query = query.join(Personnel).filter(Personnel.station_id == user.id)
+            query = query.join(
+                Personnel, Personnel.id == source.personnel_id
+            ).filter(Personnel.station_id == user.id)
 
-        # Execute query
-        attendance_records = query.order_by(
-            Attendance.date.desc(), Attendance.time_in.desc()
-        ).all()
+        # Continue after the previous page
+        if cursor:
+            query = query.filter(history_after(cursor, source))
 
-        return {
-            "success": True,
-            "data": [record.to_dict() for record in attendance_records],
-        }, 200
+        query = query.order_by(
+            *[getattr(source, name).desc() for name in HISTORY_SORT_KEY]
+        )
+
+        # Stream every matching row instead of one page when asked to
+        if wants_stream():
+            return validators.apply(
+                stream_query(
+                    query, lambda rows: serialize_many(Attendance, rows, fields)
+                )
+            )
+
+        # Execute query, fetching one extra row to know if there is a next page
+        attendance_records = query.limit(limit + 1).all()
+
+        next_cursor = None
+        if len(attendance_records) > limit:
+            attendance_records = attendance_records[:limit]
+            last = attendance_records[-1]
+            next_cursor = encode_cursor([last.date, last.time_in, last.id])
+
+        data = serialize_many(Attendance, attendance_records, fields)
+
+        return (
+            {
+                "success": True,
+                "data": data,
+                "next_cursor": next_cursor,
+                "limit": limit,
+            },
+            200,
+            validators.headers,
+        )
 
 
 class PendingAttendanceResource(Resource):
@@ -205,9 +326,20 @@ class PendingAttendanceResource(Resource):
 
     @jwt_required()
     def get(self):
-        """Get pending attendance records."""
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        """
+        Get pending attendance records.
+
+        With ``?stream=1`` or ``Accept: application/x-ndjson`` the records are
+        streamed. Supports ``If-None-Match``.
+        """
+        user = current_user
+
+        # Revalidate from the change counters before querying the records
+        validators = ListValidators(
+            ["pending_attendance"], None if user.is_admin else user.station_id
+        )
+        if validators.not_modified():
+            return validators.not_modified_response()
 
         # Build query
         query = PendingAttendance.query
@@ -216,13 +348,27 @@ class PendingAttendanceResource(Resource):
         if not user.is_admin:
             query = query.join(Personnel).filter(Personnel.station_id == user.id)
 
+        query = query.order_by(PendingAttendance.date_created.desc())
+
+        # Stream the records when asked to
+        if wants_stream():
+            return validators.apply(
+                stream_query(
+                    query, lambda rows: serialize_many(PendingAttendance, rows)
+                )
+            )
+
         # Execute query
-        pending_records = query.order_by(PendingAttendance.date_created.desc()).all()
+        pending_records = query.all()
 
-        return {
-            "success": True,
-            "data": [record.to_dict() for record in pending_records],
-        }, 200
+        return (
+            {
+                "success": True,
+                "data": serialize_many(PendingAttendance, pending_records),
+            },
+            200,
+            validators.headers,
+        )
 
     @jwt_required()
     @admin_required
@@ -248,66 +394,218 @@ class PendingAttendanceResource(Resource):
                 "error": "Pending attendance record not found",
             }, 404
 
-        user_id = get_jwt_identity()
+        user_id = current_user.id
+        station_id = pending.personnel.station_id
+        attendance = None
 
         if action == "approve":
             # Create approved attendance record
             today = pending.date
             attendance_type = pending.attendance_type
 
-            # Find existing attendance record for the day
-            attendance = Attendance.query.filter_by(
-                personnel_id=pending.personnel_id, date=today
-            ).first()
-
-            if not attendance:
-                # Create new attendance record if none exists
-                attendance = Attendance(
-                    personnel_id=pending.personnel_id,
-                    date=today,
-                    is_auto_captured=False,
-                    is_approved=True,
-                    approved_by=user_id,
-                )
-
-            # Update time_in or time_out based on attendance type
+            # Create or update the day's record in one statement
             if attendance_type == AttendanceType.TIME_IN:
-                attendance.time_in = pending.date_created
-                attendance.time_in_image = pending.image_path
+                punch = {
+                    "time_in": pending.date_created,
+                    "time_in_image": pending.image_path,
+                }
             else:  # TIME_OUT
-                attendance.time_out = pending.date_created
-                attendance.time_out_image = pending.image_path
-
-            attendance.save()
-
-            # Log activity
-            log = ActivityLog(
-                user_id=user_id,
-                title="Approve Attendance",
-                description=f"Approved {attendance_type.value} for Personnel ID {pending.personnel_id}",
+                punch = {
+                    "time_out": pending.date_created,
+                    "time_out_image": pending.image_path,
+                }
+
+            attendance, applied = Attendance.record_punch(
+                pending.personnel_id,
+                today,
+                is_auto_captured=False,
+                is_approved=True,
+                approved_by=user_id,
+                commit=False,
+                **punch,
             )
-            log.save()
 
+            activity = (
+                "Approve Attendance",
+                f"Approved {attendance_type.value} for Personnel ID {pending.personnel_id}",
+            )
             result = {
                 "success": True,
                 "message": f"Attendance {attendance_type.value} approved",
                 "data": attendance.to_dict(),
+                "applied": applied,
             }
+            if not applied:
+                # The record already has a time in, or a later time out
+                result["message"] = (
+                    f"Attendance {attendance_type.value} approved, but the record "
+                    f"keeps its {attendance_type.value.lower()}"
+                )
         else:  # reject
-            # Log activity
-            log = ActivityLog(
-                user_id=user_id,
-                title="Reject Attendance",
-                description=f"Rejected {pending.attendance_type.value} for Personnel ID {pending.personnel_id}",
+            activity = (
+                "Reject Attendance",
+                f"Rejected {pending.attendance_type.value} for Personnel ID {pending.personnel_id}",
             )
-            log.save()
-
             result = {
                 "success": True,
                 "message": f"Attendance {pending.attendance_type.value} rejected",
             }
 
-        # Delete the pending record
+        # Delete the pending record, committing the approval with it
+        personnel_id, day = pending.personnel_id, pending.date
         pending.delete()
 
+        # Log activity, once the resolution is committed
+        log_activity(user_id, *activity)
+
+        app = current_app._get_current_object()
+        pending_resolved.send(
+            app,
+            personnel_id=personnel_id,
+            station_id=station_id,
+            date=day,
+            pending_id=pending_id,
+            approved=action == "approve",
+            attendance=attendance,
+        )
+        if attendance is not None:
+            attendance_recorded.send(
+                app,
+                personnel_id=personnel_id,
+                station_id=station_id,
+                date=day,
+                attendance=attendance,
+            )
+
         return result, 200
+
+
+class PendingAttendanceBulkResource(Resource):
+    """Resource for resolving many pending attendance records at once."""
+
+    @jwt_required()
+    @admin_required
+    def post(self):
+        """
+        Approve or reject pending attendance records in one transaction.
+
+        The body is either ``{"items": [{"pending_id": 1, "action":
+        "approve"}, ...]}`` or ``{"pending_ids": [1, 2], "action":
+        "reject"}``. Invalid or duplicate items and records that no longer
+        exist fail on their own without affecting the rest.
+        """
+        data = request.get_json(silent=True) or {}
+        if "items" in data:
+            items = data["items"]
+        elif "pending_ids" in data and isinstance(data["pending_ids"], list):
+            items = [
+                {"pending_id": pending_id, "action": data.get("action")}
+                for pending_id in data["pending_ids"]
+            ]
+        else:
+            items = None
+
+        max_items = current_app.config["PENDING_BULK_MAX_ITEMS"]
+        if not isinstance(items, list) or not items:
+            return {
+                "success": False,
+                "error": "Invalid request. Provide items or pending_ids and action.",
+            }, 400
+        if len(items) > max_items:
+            return {
+                "success": False,
+                "error": f"At most {max_items} records can be resolved at once",
+            }, 400
+
+        # Validate every item before touching the database
+        results = [None] * len(items)
+        valid = {}
+        for index, item in enumerate(items):
+            item = item if isinstance(item, dict) else {}
+            pending_id = item.get("pending_id")
+            action = item.get("action")
+            error = None
+            if not isinstance(pending_id, int) or isinstance(pending_id, bool):
+                error = "Invalid pending_id"
+            elif action not in ACTIONS:
+                error = "Invalid action. Use approve or reject."
+            elif pending_id in valid:
+                error = "Duplicate pending_id"
+
+            if error:
+                results[index] = {
+                    "pending_id": pending_id,
+                    "action": action,
+                    "success": False,
+                    "error": error,
+                }
+            else:
+                valid[pending_id] = index
+
+        if valid:
+            pairs = [
+                (pending_id, items[index]["action"])
+                for pending_id, index in valid.items()
+            ]
+            resolved = resolve_pending_bulk(pairs, current_user.id)
+            for index, result in zip(valid.values(), resolved):
+                results[index] = result
+
+        succeeded = [result for result in results if result["success"]]
+        approved = sum(1 for result in succeeded if result["action"] == "approve")
+        return {
+            "success": True,
+            "data": {
+                "results": results,
+                "approved": approved,
+                "rejected": len(succeeded) - approved,
+                "failed": len(results) - len(succeeded),
+            },
+        }, 200
+
+
+class AttendanceSummaryResource(Resource):
+    """Resource for daily attendance counts per station."""
+
+    @jwt_required()
+    def get(self):
+        """
+        Get present, late, absent and pending counts per station and day.
+
+        Filters: ``start_date`` and ``end_date`` (the last 7 days by default)
+        and, for admins, ``station_id``. Station accounts only get their own
+        station.
+        """
+        user = current_user
+
+        today = datetime.now().date()
+        date_from = request.args.get(
+            "start_date", (today - timedelta(days=6)).isoformat()
+        )
+        date_to = request.args.get("end_date", today.isoformat())
+
+        if not validate_date_format(date_from) or not validate_date_format(date_to):
+            return {
+                "success": False,
+                "error": "Invalid date format. Use YYYY-MM-DD.",
+            }, 400
+
+        station_id = request.args.get("station_id", type=int)
+        if not user.is_admin:
+            station_id = user.station_id
+
+        rows = daily_summary(
+            date.fromisoformat(date_from), date.fromisoformat(date_to), station_id
+        )
+
+        data = [
+            {
+                "date": row.date.isoformat(),
+                "station_id": row.station_id,
+                **{name: getattr(row, name) for name in COUNT_COLUMNS},
+            }
+            for row in rows
+        ]
+        totals = {name: sum(item[name] for item in data) for name in COUNT_COLUMNS}
+
+        return {"success": True, "data": data, "totals": totals}, 200
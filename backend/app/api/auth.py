@@ -10,17 +10,16 @@ from flask_jwt_extended import (
     jwt_required,
     get_jwt_identity,
     get_jwt,
+    current_user,
+    decode_token,
 )
+from jwt.exceptions import PyJWTError
 
 from app.models.user import User
-from app.models.activity_log import ActivityLog
+from app.services.activity_logger import log_activity
 from app.utils.validators import validate_required_fields
 from app.utils.errors import AppError, ErrorCode
 
-# JWT token blocklist - would be better in Redis for production
-# This should be moved to a more appropriate location in a real application
-jwt_blocklist = set()
-
 
 class LoginResource(Resource):
     """Resource for user login."""
@@ -51,12 +50,9 @@ class LoginResource(Resource):
             refresh_token = create_refresh_token(identity=user.id)
 
             # Log activity
-            activity_log = ActivityLog(
-                user_id=user.id,
-                title="User Login",
-                description=f"User logged in from {request.remote_addr}",
+            log_activity(
+                user.id, "User Login", f"User logged in from {request.remote_addr}"
             )
-            activity_log.save()
 
             return {
                 "success": True,
@@ -85,25 +81,46 @@ class LogoutResource(Resource):
         """
         Logout a user.
 
+        The refresh token of the session may be sent as ``refresh_token`` in
+        the JSON body so it is revoked along with the access token.
+
         Returns:
             dict: Response with logout status
         """
         try:
-            jti = get_jwt()["jti"]
-            jwt_blocklist.add(jti)
-
-            # Log activity
             user_id = get_jwt_identity()
+            tokens = [get_jwt()]
+
+            data = request.get_json(silent=True) or {}
+            if data.get("refresh_token"):
+                try:
+                    refresh = decode_token(data["refresh_token"], allow_expired=True)
+                except PyJWTError:
+                    refresh = None
+                if (
+                    not refresh
+                    or refresh.get("type") != "refresh"
+                    or refresh.get("sub") != user_id
+                ):
+                    raise AppError(
+                        "Invalid refresh token", ErrorCode.AUTH_INVALID_TOKEN
+                    )
+                tokens.append(refresh)
+
+            # Reject the tokens until they expire
+            for token in tokens:
+                current_app.revocation_store.revoke(token["jti"], token["exp"])
 
-            activity_log = ActivityLog(
-                user_id=user_id,
-                title="User Logout",
-                description=f"User logged out from {request.remote_addr}",
+            # Log activity
+            log_activity(
+                user_id, "User Logout", f"User logged out from {request.remote_addr}"
             )
-            activity_log.save()
 
             return {"success": True, "message": "Successfully logged out"}, 200
 
+        except AppError as e:
+            return e.to_dict(), 401
+
         except Exception as e:
             current_app.logger.error(f"Logout error: {str(e)}")
             return {
@@ -128,7 +145,7 @@ class TokenRefreshResource(Resource):
             user_id = get_jwt_identity()
 
             # Verify that user still exists
-            user = User.query.get(user_id)
+            user = current_user
             if not user:
                 raise AppError("User not found", ErrorCode.AUTH_INVALID_TOKEN)
 
@@ -0,0 +1,25 @@
+"""
+Dashboard API endpoints.
+"""
+
+from flask import current_app
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, current_user
+
+
+class DashboardStatsResource(Resource):
+    """Resource for today's dashboard numbers."""
+
+    @jwt_required()
+    def get(self):
+        """
+        Get today's counts of personnel timed in, timed out, late and absent,
+        and of pending approvals.
+
+        Admins get every station and the totals. Station accounts only get
+        their own station.
+        """
+        station_id = None if current_user.is_admin else current_user.station_id
+        stats = current_app.dashboard_counters.snapshot(station_id)
+
+        return {"success": True, "data": stats}, 200
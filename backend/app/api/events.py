@@ -0,0 +1,52 @@
+"""
+Server-sent events API endpoint.
+"""
+
+from flask import Response, request, current_app
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, current_user
+
+from app.services.events import ALL_CHANNEL, stream_events
+
+
+class EventStreamResource(Resource):
+    """Resource for the live event stream."""
+
+    @jwt_required(locations=["headers", "query_string"])
+    def get(self):
+        """
+        Stream attendance, pending attendance and approval events.
+
+        Station accounts receive their station's events. Admins receive every
+        station's events, or one station's with ``station_id``. Browsers'
+        ``EventSource`` cannot send headers, so the token may be passed as
+        ``?jwt=``. Reconnecting clients resume after their ``Last-Event-ID``.
+        """
+        if current_user.is_admin:
+            channel = request.args.get("station_id", type=int) or ALL_CHANNEL
+        else:
+            channel = current_user.station_id
+
+        last_id = request.headers.get("Last-Event-ID") or request.args.get(
+            "last_event_id"
+        )
+        try:
+            last_id = int(last_id) if last_id else None
+        except ValueError:
+            return {"success": False, "error": "Invalid Last-Event-ID"}, 400
+
+        config = current_app.config
+        response = Response(
+            stream_events(
+                current_app.event_broker,
+                channel,
+                last_id,
+                config["EVENTS_HEARTBEAT_INTERVAL"],
+                config["EVENTS_MAX_STREAM_DURATION"],
+            ),
+            mimetype="text/event-stream",
+        )
+        response.headers["Cache-Control"] = "no-cache"
+        # Keep nginx from buffering the stream
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
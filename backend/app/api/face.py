@@ -4,12 +4,11 @@ Face recognition API endpoints.
 
 from flask import request, jsonify
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 
-from app.models.user import User
 from app.models.personnel import Personnel
 from app.models.face_data import FaceData
-from app.models.activity_log import ActivityLog
+from app.services.activity_logger import log_activity
 from app.utils.security import admin_required, station_access_required
 from app.utils.validators import validate_required_fields
 from app.utils.errors import AppError, ErrorCode
@@ -94,11 +93,10 @@ class FaceRegistrationResource(Resource):
             dict: Response with registration result
         """
         try:
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-
+            user = current_user
             if not user:
                 raise AppError("User not found", ErrorCode.AUTH_INVALID_TOKEN)
+            user_id = user.id
 
             # Get request data
             data = request.json
@@ -119,12 +117,11 @@ class FaceRegistrationResource(Resource):
 
             if result.get("success"):
                 # Log activity
-                activity_log = ActivityLog(
-                    user_id=user_id,
-                    title="Face Registration",
-                    description=f"Registered face images for {personnel.full_name}",
+                log_activity(
+                    user_id,
+                    "Face Registration",
+                    f"Registered face images for {personnel.full_name}",
                 )
-                activity_log.save()
 
             if not result.get("success"):
                 raise AppError(
@@ -0,0 +1,164 @@
+"""
+Image API endpoints.
+"""
+
+import os
+import mimetypes
+
+from flask import request, current_app, send_file
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, current_user
+from sqlalchemy import select, union, or_
+
+from app.models.base import db
+from app.models.personnel import Personnel
+from app.models.attendance import Attendance, PendingAttendance
+from app.models.face_data import FaceData
+from app.utils.security import has_station_access
+from app.services.image_store import resolve_image_path
+from app.services.thumbnails import get_thumbnail
+
+
+def image_station_ids(image_path):
+    """
+    Get the stations of the personnel a stored image belongs to.
+
+    Args:
+        image_path (str): Path as stored in the database
+
+    Returns:
+        set: Station IDs of every record referencing the image
+    """
+    query = union(
+        select(Personnel.station_id)
+        .join(Attendance, Attendance.personnel_id == Personnel.id)
+        .where(
+            or_(
+                Attendance.time_in_image == image_path,
+                Attendance.time_out_image == image_path,
+            )
+        ),
+        select(Personnel.station_id)
+        .join(PendingAttendance, PendingAttendance.personnel_id == Personnel.id)
+        .where(PendingAttendance.image_path == image_path),
+        select(Personnel.station_id)
+        .join(FaceData, FaceData.personnel_id == Personnel.id)
+        .where(FaceData.filename == image_path),
+        select(Personnel.station_id).where(Personnel.image_path == image_path),
+    )
+    return {row[0] for row in db.session.execute(query)}
+
+
+def authorize_image(image_path):
+    """
+    Resolve a stored image path the current user may access.
+
+    Access follows ``station_access_required``: admins see every image,
+    station accounts only images of their own personnel.
+
+    Returns:
+        tuple: ``(path, None)`` on success, ``(None, (body, status))`` otherwise
+    """
+    user = current_user
+    path = resolve_image_path(image_path)
+    if not path:
+        return None, ({"success": False, "error": "Image not found"}, 404)
+
+    if not user.is_admin and not any(
+        has_station_access(user, station_id)
+        for station_id in image_station_ids(image_path)
+    ):
+        # Do not reveal whether the image exists
+        return None, ({"success": False, "error": "Image not found"}, 404)
+
+    return path, None
+
+
+class ImageResource(Resource):
+    """Resource for stored attendance and registration images."""
+
+    # Image tags cannot send headers, so the token may be in the query string
+    @jwt_required(locations=["headers", "query_string"])
+    def get(self, image_path):
+        """
+        Get a stored image.
+
+        Responses carry a strong ETag based on the image content and support
+        ``If-None-Match`` and ``Range`` requests. With
+        ``IMAGE_ACCEL_REDIRECT_PREFIX`` set, the transfer is handed to the
+        front proxy with ``X-Accel-Redirect``.
+
+        Returns:
+            Response: The image
+        """
+        path, error = authorize_image(image_path)
+        if error:
+            return error
+
+        if not os.path.isfile(path):
+            return {"success": False, "error": "Image not found"}, 404
+
+        etag = current_app.image_etags.get(path)
+        max_age = current_app.config["IMAGE_MAX_AGE"]
+
+        prefix = current_app.config["IMAGE_ACCEL_REDIRECT_PREFIX"]
+        if prefix:
+            response = current_app.response_class(
+                mimetype=mimetypes.guess_type(path)[0] or "application/octet-stream"
+            )
+            response.set_etag(etag)
+            if request.if_none_match.contains(etag):
+                response.status_code = 304
+            else:
+                response.headers["X-Accel-Redirect"] = (
+                    f"{prefix.rstrip('/')}/{image_path.lstrip('/')}"
+                )
+        else:
+            # Without a Range header this is sent with the server's
+            # wsgi.file_wrapper, which uses sendfile where available
+            response = send_file(path, etag=etag, max_age=max_age, conditional=True)
+
+        response.cache_control.max_age = max_age
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+
+
+class ThumbnailResource(Resource):
+    """Resource for image thumbnails."""
+
+    # Image tags cannot send headers, so the token may be in the query string
+    @jwt_required(locations=["headers", "query_string"])
+    def get(self, size, image_path):
+        """
+        Get a thumbnail of a stored image.
+
+        Thumbnails are generated on first request for images saved before
+        thumbnails existed.
+
+        Returns:
+            Response: The thumbnail, cacheable for a year
+        """
+        if size not in current_app.config["THUMBNAIL_SIZES"]:
+            return {"success": False, "error": "Unknown thumbnail size"}, 400
+
+        path, error = authorize_image(image_path)
+        if error:
+            return error
+
+        try:
+            thumbnail_path = get_thumbnail(path, size)
+        except ValueError as e:
+            current_app.logger.error(f"Thumbnail error: {str(e)}")
+            thumbnail_path = None
+
+        if not thumbnail_path:
+            return {"success": False, "error": "Image not found"}, 404
+
+        response = send_file(
+            thumbnail_path, max_age=current_app.config["THUMBNAIL_MAX_AGE"]
+        )
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.immutable = True
+        return response
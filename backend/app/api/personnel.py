@@ -2,16 +2,21 @@
 Personnel API endpoints.
 """
 
+import csv
+
 from flask import request, jsonify, current_app
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 
-from app.models.user import User
 from app.models.personnel import Personnel
-from app.models.activity_log import ActivityLog
+from app.services.activity_logger import log_activity
+from app.services.personnel_import import import_personnel, parse_csv
+from app.signals import personnel_changed
 from app.utils.security import admin_required, station_access_required
 from app.utils.validators import validate_required_fields
 from app.utils.errors import AppError, ErrorCode
+from app.utils.streaming import wants_stream, stream_query
+from app.utils.conditional import ListValidators
 
 
 class PersonnelListResource(Resource):
@@ -22,13 +27,14 @@ class PersonnelListResource(Resource):
         """
         Get all personnel or filter by station.
 
+        With ``?stream=1`` or ``Accept: application/x-ndjson`` the personnel
+        are streamed. Supports ``If-None-Match``.
+
         Returns:
             dict: Response with personnel data
         """
         try:
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-
+            user = current_user
             if not user:
                 raise AppError("User not found", ErrorCode.AUTH_INVALID_TOKEN)
 
@@ -39,6 +45,11 @@ class PersonnelListResource(Resource):
             if not user.is_admin and (not station_id or station_id != user.station_id):
                 raise AppError("Access denied", ErrorCode.AUTH_INSUFFICIENT_PERMISSIONS)
 
+            # Revalidate from the change counters before querying the list
+            validators = ListValidators(["personnel"], station_id)
+            if validators.not_modified():
+                return validators.not_modified_response()
+
             # Build query
             query = Personnel.query
 
@@ -49,10 +60,20 @@ class PersonnelListResource(Resource):
                 # Non-admin users can only see their station's personnel
                 query = query.filter_by(station_id=user.station_id)
 
+            # Stream the personnel when asked to
+            if wants_stream():
+                return validators.apply(
+                    stream_query(query.order_by(Personnel.id), Personnel.to_dict_list)
+                )
+
             # Execute query
             personnel = query.all()
 
-            return {"success": True, "data": [p.to_dict() for p in personnel]}, 200
+            return (
+                {"success": True, "data": Personnel.to_dict_list(personnel)},
+                200,
+                validators.headers,
+            )
 
         except AppError as e:
             return e.to_dict(), (
@@ -77,11 +98,10 @@ class PersonnelListResource(Resource):
             dict: Response with created personnel data
         """
         try:
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-
+            user = current_user
             if not user:
                 raise AppError("User not found", ErrorCode.AUTH_INVALID_TOKEN)
+            user_id = user.id
 
             # Get request data
             data = request.json
@@ -102,13 +122,17 @@ class PersonnelListResource(Resource):
             # Save to database
             personnel.save()
 
+            personnel_changed.send(
+                current_app._get_current_object(),
+                personnel_id=personnel.id,
+                station_id=personnel.station_id,
+                previous_station_id=None,
+            )
+
             # Log activity
-            activity_log = ActivityLog(
-                user_id=user_id,
-                title="Create Personnel",
-                description=f"Created personnel {personnel.full_name}",
+            log_activity(
+                user_id, "Create Personnel", f"Created personnel {personnel.full_name}"
             )
-            activity_log.save()
 
             return {"success": True, "data": personnel.to_dict()}, 201
 
@@ -126,14 +150,77 @@ class PersonnelListResource(Resource):
             }, 500
 
 
+class PersonnelImportResource(Resource):
+    """Resource for importing personnel rosters."""
+
+    @jwt_required()
+    def post(self):
+        """
+        Create and update personnel from a CSV or JSON roster.
+
+        The roster is a CSV upload in ``file``, a ``text/csv`` body, or JSON
+        with the rows in ``personnel``. Rows without ``station_id`` belong
+        to the ``station_id`` query parameter, or the user's own station.
+        With ``?dry_run=1`` the changes are reported but not written.
+
+        Returns:
+            dict: Response with the import report
+        """
+        user = current_user
+        data = {}
+        try:
+            upload = request.files.get("file")
+            if upload:
+                rows = parse_csv(upload.read().decode("utf-8-sig"))
+            elif request.mimetype == "text/csv":
+                rows = parse_csv(request.get_data().decode("utf-8-sig"))
+            else:
+                data = request.get_json(silent=True) or {}
+                rows = data.get("personnel") if isinstance(data, dict) else data
+        except (UnicodeDecodeError, csv.Error):
+            return {"success": False, "error": "Roster is not valid UTF-8 CSV"}, 400
+
+        if not isinstance(rows, list) or not rows:
+            return {
+                "success": False,
+                "error": "Provide a CSV file or personnel rows to import",
+            }, 400
+        max_rows = current_app.config["PERSONNEL_IMPORT_MAX_ROWS"]
+        if len(rows) > max_rows:
+            return {
+                "success": False,
+                "error": f"At most {max_rows} personnel can be imported at once",
+            }, 400
+
+        dry_run = request.args.get("dry_run", "").lower() in ("1", "true", "yes")
+        dry_run = dry_run or (isinstance(data, dict) and data.get("dry_run") is True)
+        station_id = request.args.get("station_id", type=int)
+        if station_id is None and not user.is_admin:
+            station_id = user.station_id
+
+        try:
+            if not user.is_admin and station_id != user.station_id:
+                raise AppError("Access denied", ErrorCode.AUTH_INSUFFICIENT_PERMISSIONS)
+            applied, report = import_personnel(rows, user, dry_run, station_id)
+        except AppError as e:
+            return e.to_dict(), e.status_code
+
+        if not applied:
+            return {
+                "success": False,
+                "error": "Import has invalid rows, nothing was changed",
+                "data": report,
+            }, 400
+        return {"success": True, "data": report}, 200
+
+
 class PersonnelResource(Resource):
     """Resource for individual personnel."""
 
     @jwt_required()
     def get(self, personnel_id):
         """Get a personnel by ID."""
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user
 
         # Get personnel
         personnel = Personnel.query.get(personnel_id)
@@ -151,8 +238,8 @@ class PersonnelResource(Resource):
     @jwt_required()
     def put(self, personnel_id):
         """Update a personnel."""
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user
+        user_id = user.id
 
         # Get personnel
         personnel = Personnel.query.get(personnel_id)
@@ -177,27 +264,33 @@ class PersonnelResource(Resource):
             personnel.rank = data["rank"]
 
         # Only admin can change station
+        previous_station_id = personnel.station_id
         if user.is_admin and "station_id" in data:
             personnel.station_id = data["station_id"]
 
         # Save changes
         personnel.save()
 
+        if personnel.station_id != previous_station_id:
+            personnel_changed.send(
+                current_app._get_current_object(),
+                personnel_id=personnel.id,
+                station_id=personnel.station_id,
+                previous_station_id=previous_station_id,
+            )
+
         # Log activity
-        log = ActivityLog(
-            user_id=user_id,
-            title="Update Personnel",
-            description=f"Updated personnel {personnel.full_name}",
+        log_activity(
+            user_id, "Update Personnel", f"Updated personnel {personnel.full_name}"
         )
-        log.save()
 
         return {"success": True, "data": personnel.to_dict()}, 200
 
     @jwt_required()
     def delete(self, personnel_id):
         """Delete a personnel."""
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user
+        user_id = user.id
 
         # Only admin can delete personnel
         if not user.is_admin:
@@ -214,14 +307,17 @@ class PersonnelResource(Resource):
         full_name = personnel.full_name
 
         # Delete personnel
+        station_id = personnel.station_id
         personnel.delete()
 
-        # Log activity
-        log = ActivityLog(
-            user_id=user_id,
-            title="Delete Personnel",
-            description=f"Deleted personnel {full_name}",
+        personnel_changed.send(
+            current_app._get_current_object(),
+            personnel_id=personnel_id,
+            station_id=None,
+            previous_station_id=station_id,
         )
-        log.save()
+
+        # Log activity
+        log_activity(user_id, "Delete Personnel", f"Deleted personnel {full_name}")
 
         return {"success": True, "message": "Personnel deleted successfully"}, 200
@@ -0,0 +1,310 @@
+"""
+Report export API endpoints.
+"""
+
+import re
+from datetime import datetime, time, timedelta
+
+from flask import request, current_app
+from flask_restful import Resource
+from flask_jwt_extended import jwt_required, current_user
+from sqlalchemy import select, exists
+
+from app.models.user import User
+from app.models.personnel import Personnel
+from app.models.face_data import FaceData
+from app.services.reports import export_report, get_report_format
+from app.services.monthly_matrix import MATRIX_TABLES
+from app.services.archive import attendance_source, activity_log_source
+from app.utils.conditional import ListValidators
+from app.utils.errors import AppError, ErrorCode
+
+REPORT_ID_REGEX = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def _report_params():
+    """
+    Parse the parameters shared by every report.
+
+    Returns:
+        tuple: ``(format, start_date, end_date, report_id)``
+
+    Raises:
+        AppError: If a parameter is invalid
+    """
+    report_format = get_report_format(request.args.get("format"))
+
+    dates = []
+    for name in ("start_date", "end_date"):
+        value = request.args.get(name)
+        try:
+            dates.append(datetime.strptime(value, "%Y-%m-%d").date() if value else None)
+        except ValueError:
+            raise AppError(
+                "Invalid date format. Use YYYY-MM-DD.",
+                ErrorCode.SYSTEM_VALIDATION_ERROR,
+            )
+
+    # Clients may choose the ID to poll the progress while downloading. IDs
+    # are per user, so another user's export cannot take it over
+    report_id = request.args.get("report_id")
+    if report_id and not REPORT_ID_REGEX.match(report_id):
+        raise AppError("Invalid report_id", ErrorCode.SYSTEM_VALIDATION_ERROR)
+
+    return report_format, dates[0], dates[1], report_id
+
+
+def _day_after(day):
+    """Get the start of the day after ``day``, the exclusive end of a range."""
+    return datetime.combine(day + timedelta(days=1), time.min)
+
+
+def _station_filter(column):
+    """
+    Restrict a statement to the stations the current user may see.
+
+    Returns:
+        list: Where clauses for ``column``
+    """
+    station_id = request.args.get("station_id", type=int)
+    if not current_user.is_admin:
+        return [column == current_user.station_id]
+    if station_id:
+        return [column == station_id]
+    return []
+
+
+class AttendanceReportResource(Resource):
+    """Resource for attendance report exports."""
+
+    @jwt_required()
+    def get(self):
+        """
+        Export attendance records as CSV, Excel or PDF.
+
+        Filters: ``start_date``, ``end_date``, ``personnel_id`` and, for
+        admins, ``station_id``.
+        """
+        try:
+            report_format, start_date, end_date, report_id = _report_params()
+        except AppError as e:
+            return e.to_dict(), 400
+
+        # Include archived records if the range reaches them
+        attendance = attendance_source(start_date, end_date)
+        statement = (
+            select(
+                attendance.date,
+                Personnel.id,
+                Personnel.last_name,
+                Personnel.first_name,
+                Personnel.rank,
+                User.username,
+                attendance.time_in,
+                attendance.time_out,
+                attendance.status,
+                attendance.is_auto_captured,
+            )
+            .join(Personnel, Personnel.id == attendance.personnel_id)
+            .join(User, User.id == Personnel.station_id)
+            .where(*_station_filter(Personnel.station_id))
+            .order_by(attendance.date, Personnel.last_name, Personnel.first_name)
+        )
+
+        personnel_id = request.args.get("personnel_id", type=int)
+        if personnel_id:
+            statement = statement.where(attendance.personnel_id == personnel_id)
+        if start_date:
+            statement = statement.where(attendance.date >= start_date)
+        if end_date:
+            statement = statement.where(attendance.date <= end_date)
+
+        try:
+            return export_report(
+                "attendance",
+                "Attendance Report",
+                [
+                    "Date",
+                    "Personnel ID",
+                    "Last Name",
+                    "First Name",
+                    "Rank",
+                    "Station",
+                    "Time In",
+                    "Time Out",
+                    "Status",
+                    "Auto Captured",
+                ],
+                statement,
+                report_format,
+                current_user.id,
+                report_id,
+            )
+        except AppError as e:
+            return e.to_dict(), 400
+
+
+class PersonnelReportResource(Resource):
+    """Resource for personnel report exports."""
+
+    @jwt_required()
+    def get(self):
+        """
+        Export personnel as CSV, Excel or PDF.
+
+        Admins may filter by ``station_id``. ``start_date`` and ``end_date``
+        filter by the date the personnel was added.
+        """
+        try:
+            report_format, start_date, end_date, report_id = _report_params()
+        except AppError as e:
+            return e.to_dict(), 400
+
+        has_face_data = (
+            exists().where(FaceData.personnel_id == Personnel.id).correlate(Personnel)
+        )
+        statement = (
+            select(
+                Personnel.id,
+                Personnel.last_name,
+                Personnel.first_name,
+                Personnel.rank,
+                User.username,
+                has_face_data.label("has_face_data"),
+                Personnel.date_created,
+            )
+            .join(User, User.id == Personnel.station_id)
+            .where(*_station_filter(Personnel.station_id))
+            .order_by(User.username, Personnel.last_name, Personnel.first_name)
+        )
+
+        if start_date:
+            statement = statement.where(
+                Personnel.date_created >= datetime.combine(start_date, time.min)
+            )
+        if end_date:
+            statement = statement.where(Personnel.date_created < _day_after(end_date))
+
+        try:
+            return export_report(
+                "personnel",
+                "Personnel Report",
+                [
+                    "Personnel ID",
+                    "Last Name",
+                    "First Name",
+                    "Rank",
+                    "Station",
+                    "Face Registered",
+                    "Date Added",
+                ],
+                statement,
+                report_format,
+                current_user.id,
+                report_id,
+            )
+        except AppError as e:
+            return e.to_dict(), 400
+
+
+class ActivityReportResource(Resource):
+    """Resource for activity log report exports."""
+
+    @jwt_required()
+    def get(self):
+        """
+        Export the activity log as CSV, Excel or PDF.
+
+        Station accounts only get their own activity. Admins may filter by
+        ``user_id``.
+        """
+        try:
+            report_format, start_date, end_date, report_id = _report_params()
+        except AppError as e:
+            return e.to_dict(), 400
+
+        since = until = None
+        if start_date:
+            since = datetime.combine(start_date, time.min)
+        if end_date:
+            until = _day_after(end_date)
+
+        # Include archived entries if the range reaches them
+        activity_log = activity_log_source(since, until)
+        statement = (
+            select(
+                activity_log.timestamp,
+                User.username,
+                activity_log.title,
+                activity_log.description,
+            )
+            .join(User, User.id == activity_log.user_id)
+            .order_by(activity_log.timestamp.desc())
+        )
+
+        user_id = request.args.get("user_id", type=int)
+        if not current_user.is_admin:
+            statement = statement.where(activity_log.user_id == current_user.id)
+        elif user_id:
+            statement = statement.where(activity_log.user_id == user_id)
+        if since:
+            statement = statement.where(activity_log.timestamp >= since)
+        if until:
+            statement = statement.where(activity_log.timestamp < until)
+
+        try:
+            return export_report(
+                "activity",
+                "Activity Report",
+                ["Timestamp", "User", "Activity", "Description"],
+                statement,
+                report_format,
+                current_user.id,
+                report_id,
+            )
+        except AppError as e:
+            return e.to_dict(), 400
+
+
+class MonthlyAttendanceResource(Resource):
+    """Resource for the monthly attendance matrix of a station."""
+
+    @jwt_required()
+    def get(self):
+        """
+        Get the personnel by day attendance matrix of a month.
+
+        Takes ``year`` and ``month``, by default the current month, and for
+        admins ``station_id``. Supports ``If-None-Match``.
+        """
+        today = datetime.now().date()
+        year = request.args.get("year", today.year, type=int)
+        month = request.args.get("month", today.month, type=int)
+        if not 1 <= month <= 12 or not 1 <= year <= 9999:
+            return {"success": False, "error": "Invalid year or month"}, 400
+
+        station_id = request.args.get("station_id", type=int)
+        if not current_user.is_admin:
+            station_id = current_user.station_id
+        elif not station_id:
+            return {"success": False, "error": "station_id is required"}, 400
+
+        validators = ListValidators(MATRIX_TABLES, station_id, key=(year, month))
+        if validators.not_modified():
+            return validators.not_modified_response()
+
+        matrix = current_app.monthly_matrix_cache.get(station_id, year, month)
+        return {"success": True, "data": matrix}, 200, validators.headers
+
+
+class ReportProgressResource(Resource):
+    """Resource for the progress of report exports."""
+
+    @jwt_required()
+    def get(self, report_id):
+        """Get the progress of a report export started by the current user."""
+        progress = current_app.report_progress.get(current_user.id, report_id)
+        if not progress:
+            return {"success": False, "error": "Report not found"}, 404
+
+        return {"success": True, "data": progress}, 200
@@ -4,12 +4,24 @@ Configuration for the BFP Sorsogon Attendance System.
 
 import os
 import json
-from datetime import timedelta
+import enum
+from datetime import date, datetime, timedelta
 
 # Get base directory of application
 BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 
 
+def json_default(value):
+    """Serialize values that the standard JSON encoder does not support."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 class Config:
     """Base configuration."""
 
@@ -32,11 +44,19 @@ class Config:
     # JWT settings
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    JWT_REVOCATION_STORE = os.environ.get(
+        "JWT_REVOCATION_STORE", "sqlite"
+    )  # 'memory' (single process) or 'sqlite' (shared by workers)
+    JWT_REVOCATION_DB = os.environ.get(
+        "JWT_REVOCATION_DB",
+        os.path.join(BASE_DIR, "..", "instance", "revoked_tokens.db"),
+    )
 
     # File upload settings
     UPLOAD_FOLDER = os.path.join(BASE_DIR, "..", "face_data")
     TEMP_ATTENDANCE_FOLDER = os.path.join(BASE_DIR, "..", "attendance_images_temp")
     ANNOTATIONS_FOLDER = os.path.join(BASE_DIR, "..", "annotations")
+    FRONTEND_FOLDER = os.path.join(BASE_DIR, "..", "frontend")
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max file size
 
     # Face recognition settings
@@ -45,10 +65,115 @@ class Config:
     FACE_RECOGNITION_THRESHOLD = 0.75
     TORCH_DEVICE = os.environ.get("TORCH_DEVICE", "cpu")  # 'cpu' or 'cuda'
 
+    # Seconds a user's identity is cached between authenticated requests.
+    # Changes made through another worker are only seen once this expires.
+    IDENTITY_CACHE_TTL = 30
+
     # Attendance settings
-    WORK_START_TIME = "08:00"  # Format: HH:MM
+    WORK_START_TIME = "08:00"  # Format: HH:MM, local time
+    # Hours local time is ahead of UTC, in which times in are stored
+    ATTENDANCE_UTC_OFFSET = float(os.environ.get("ATTENDANCE_UTC_OFFSET", 8))
     ATTENDANCE_COOLDOWN = 60  # seconds
     ATTENDANCE_IMAGE_RETENTION_DAYS = 1  # days
+    RETENTION_ENABLED = True
+    RETENTION_STATE_FOLDER = os.path.join(BASE_DIR, "..", "instance")
+    RETENTION_INTERVAL = 3600  # seconds between leader election attempts
+    RETENTION_BATCH_SIZE = 500  # files deleted before pausing
+    RETENTION_BATCH_PAUSE = 0.5  # seconds
+
+    # Nightly LATE/PRESENT/ABSENT computation
+    ATTENDANCE_STATUS_JOB_ENABLED = True
+    ATTENDANCE_STATUS_LOOKBACK_DAYS = 7  # ended days recomputed by every run
+    ATTENDANCE_STATUS_INTERVAL = 3600  # seconds between leader election attempts
+
+    # Archival of old records, see app.services.archive. Records are no longer
+    # updated once archived, so the horizons must exceed the status lookback
+    # and the time allowed for corrections.
+    ARCHIVE_ENABLED = True
+    ARCHIVE_ATTENDANCE_AFTER_DAYS = 365
+    ARCHIVE_ACTIVITY_LOG_AFTER_DAYS = 180
+    ARCHIVE_BATCH_SIZE = 1000  # rows moved per transaction
+    ARCHIVE_BATCH_PAUSE = 0.1  # seconds
+    ARCHIVE_INTERVAL = 3600  # seconds between leader election attempts
+
+    # Seconds between reloads of the dashboard counters from the database,
+    # and between checks of the change counters for writes that sent no signal
+    DASHBOARD_RECONCILE_ENABLED = True
+    DASHBOARD_RECONCILE_INTERVAL = 300
+    DASHBOARD_CHANGE_CHECK_INTERVAL = 10
+
+    # Server-sent events. Events are shared by the API processes through the
+    # live_event table, so the API may run as several worker processes.
+    EVENTS_BUFFER_SIZE = 1000  # events kept per station for Last-Event-ID resume
+    EVENTS_POLL_ENABLED = True
+    EVENTS_POLL_INTERVAL = 1  # seconds between reads of other processes' events
+    EVENTS_RETENTION = 3600  # seconds events are kept in the live_event table
+    EVENTS_HEARTBEAT_INTERVAL = 15  # seconds
+    EVENTS_MAX_STREAM_DURATION = 300  # seconds before clients must reconnect
+
+    # Attendance history pagination
+    HISTORY_PAGE_SIZE = 100
+    HISTORY_MAX_PAGE_SIZE = 500
+    STREAM_CHUNK_SIZE = 500  # rows fetched and flushed at a time when streaming
+
+    # Pending attendance records resolved per bulk request
+    PENDING_BULK_MAX_ITEMS = 500
+
+    # Monthly attendance matrices kept in memory
+    MONTHLY_MATRIX_CACHE_SIZE = 64
+
+    # Rows accepted per personnel import
+    PERSONNEL_IMPORT_MAX_ROWS = 5000
+
+    # Attendance image writer settings
+    ATTENDANCE_IMAGE_WRITER_WORKERS = int(
+        os.environ.get("ATTENDANCE_IMAGE_WRITER_WORKERS", 2)
+    )  # 0 writes images synchronously
+    ATTENDANCE_IMAGE_WRITER_QUEUE_SIZE = 64  # frames waiting to be written
+    ATTENDANCE_IMAGE_JPEG_QUALITY = 85
+    ATTENDANCE_IMAGE_FSYNC = os.environ.get(
+        "ATTENDANCE_IMAGE_FSYNC", "never"
+    )  # 'never' or 'always'
+
+    # Activity log settings
+    ACTIVITY_LOG_ASYNC = os.environ.get("ACTIVITY_LOG_ASYNC", "true").lower() in (
+        "true",
+        "1",
+    )  # false writes every entry synchronously
+    ACTIVITY_LOG_BATCH_SIZE = 100  # entries per insert
+    ACTIVITY_LOG_FLUSH_INTERVAL = 1.0  # seconds an entry may wait
+    ACTIVITY_LOG_QUEUE_SIZE = 1000  # entries waiting to be written
+
+    # Thumbnail settings
+    THUMBNAIL_SIZES = {"sm": 96, "md": 320}  # longest edge in pixels
+    THUMBNAIL_FORMAT = "webp"  # 'webp' or 'jpeg'
+    THUMBNAIL_QUALITY = 80
+    THUMBNAIL_MAX_AGE = 31536000  # seconds, thumbnails never change
+
+    # Image serving settings
+    IMAGE_MAX_AGE = 86400  # seconds
+    # Set to an nginx internal location (e.g. '/protected-images') to let the
+    # proxy send images with X-Accel-Redirect
+    IMAGE_ACCEL_REDIRECT_PREFIX = os.environ.get("IMAGE_ACCEL_REDIRECT_PREFIX", "")
+
+    # Response compression
+    COMPRESS_ENABLED = True
+    COMPRESS_MIN_SIZE = 1024  # bytes, smaller responses are sent as they are
+    COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", 6))  # gzip, 1-9
+    COMPRESS_BROTLI_LEVEL = int(
+        os.environ.get("COMPRESS_BROTLI_LEVEL", 5)
+    )  # 0-11, needs the brotli package
+    COMPRESS_MIMETYPES = [
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/html",
+    ]
+    COMPRESS_STATIC_ON_STARTUP = True  # write .gz/.br files next to the frontend
+    STATIC_HASHED_MAX_AGE = 31536000  # seconds, for assets with a hash in the name
+
+    # JSON encoding of API responses
+    RESTFUL_JSON = {"default": json_default}
 
     # CORS settings
     CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "*").split(",")
@@ -76,6 +201,15 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     PRESERVE_CONTEXT_ON_EXCEPTION = False
+    ATTENDANCE_IMAGE_WRITER_WORKERS = 0
+    ACTIVITY_LOG_ASYNC = False
+    JWT_REVOCATION_STORE = "memory"
+    COMPRESS_STATIC_ON_STARTUP = False
+    RETENTION_ENABLED = False
+    ATTENDANCE_STATUS_JOB_ENABLED = False
+    ARCHIVE_ENABLED = False
+    DASHBOARD_RECONCILE_ENABLED = False
+    EVENTS_POLL_ENABLED = False
 
 
 class ProductionConfig(Config):
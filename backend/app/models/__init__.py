@@ -8,3 +8,7 @@ from .personnel import Personnel
 from .attendance import Attendance, AttendanceStatus, AttendanceType, PendingAttendance
 from .face_data import FaceData
 from .activity_log import ActivityLog
+from .summary import DailyAttendanceSummary
+from .change import ChangeCounter
+from .archive import AttendanceArchive, ActivityLogArchive, ArchiveWatermark
+from .event import LiveEvent
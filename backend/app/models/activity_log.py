@@ -17,7 +17,9 @@ class ActivityLog(BaseModel):
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    timestamp = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+    timestamp = db.Column(
+        db.DateTime, nullable=True, default=datetime.utcnow, index=True
+    )
 
     # Define relationship with User model
     user = db.relationship("User", backref="activities", lazy=True)
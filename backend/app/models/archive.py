@@ -0,0 +1,74 @@
+"""
+Archive tables for historical attendance and activity.
+
+Rows older than the archive horizon are moved out of ``attendance`` and
+``activity_log`` into these tables by ``app.services.archive``, keeping
+their IDs, so the hot tables and their indexes stay small. Archived rows
+reference personnel and users without foreign keys, since they may outlive
+them.
+"""
+
+from datetime import datetime
+
+from .base import db, BaseModel
+from .attendance import AttendanceStatus
+
+
+class AttendanceArchive(BaseModel):
+    """Attendance records moved out of ``attendance``."""
+
+    __tablename__ = "attendance_archive"
+    __table_args__ = (
+        db.Index("ix_attendance_archive_personnel_date", "personnel_id", "date"),
+        db.Index("ix_attendance_archive_date_personnel", "date", "personnel_id"),
+    )
+
+    # The ID of the original record
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    personnel_id = db.Column(db.Integer, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    time_in = db.Column(db.DateTime, nullable=True)
+    time_out = db.Column(db.DateTime, nullable=True)
+    status = db.Column(db.Enum(AttendanceStatus), nullable=True)
+    confidence_score = db.Column(db.Float, nullable=True)
+    is_auto_captured = db.Column(db.Boolean, nullable=True)
+    is_approved = db.Column(db.Boolean, nullable=True)
+    approved_by = db.Column(db.Integer, nullable=True)
+    time_in_image = db.Column(db.String(255), nullable=True)
+    time_out_image = db.Column(db.String(255), nullable=True)
+
+
+class ActivityLogArchive(BaseModel):
+    """Activity log entries moved out of ``activity_log``."""
+
+    __tablename__ = "activity_log_archive"
+    __table_args__ = (
+        db.Index("ix_activity_log_archive_timestamp", "timestamp"),
+        db.Index("ix_activity_log_archive_user_timestamp", "user_id", "timestamp"),
+    )
+
+    # The ID of the original entry
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    timestamp = db.Column(db.DateTime, nullable=True)
+
+
+class ArchiveWatermark(BaseModel):
+    """
+    Boundary between the hot and the archive table of a table.
+
+    Rows dated before ``archived_before`` may be in either table, newer rows
+    are only in the hot table. The boundary is raised before rows are moved,
+    so readers never miss a row that is being archived.
+    """
+
+    __tablename__ = "archive_watermark"
+    __table_args__ = (
+        db.Index("uq_archive_watermark_table", "table_name", unique=True),
+    )
+
+    table_name = db.Column(db.String(64), nullable=False)
+    archived_before = db.Column(db.Date, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -5,6 +5,9 @@ Attendance models for tracking personnel attendance.
 import enum
 from datetime import datetime
 
+from sqlalchemy import case, func
+from sqlalchemy.dialects import mysql, sqlite
+
 from .base import db, BaseModel
 from .personnel import Personnel
 
@@ -30,6 +33,12 @@ class Attendance(BaseModel):
     """
 
     __tablename__ = "attendance"
+    __table_args__ = (
+        # One attendance record per personnel per day
+        db.Index("uq_attendance_personnel_date", "personnel_id", "date", unique=True),
+        # Date range scans that only need the personnel of each record
+        db.Index("ix_attendance_date_personnel", "date", "personnel_id"),
+    )
 
     personnel_id = db.Column(db.Integer, db.ForeignKey("personnel.id"), nullable=False)
     date = db.Column(db.Date, nullable=False, default=datetime.utcnow().date)
@@ -42,8 +51,12 @@ class Attendance(BaseModel):
     )  # Flag for auto vs manual capture
     is_approved = db.Column(db.Boolean, default=True)  # For manual uploads
     approved_by = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
-    time_in_image = db.Column(db.String(255), nullable=True)  # Path to time-in image
-    time_out_image = db.Column(db.String(255), nullable=True)  # Path to time-out image
+    time_in_image = db.Column(
+        db.String(255), nullable=True, index=True
+    )  # Path to time-in image
+    time_out_image = db.Column(
+        db.String(255), nullable=True, index=True
+    )  # Path to time-out image
 
     # Relationships
     personnel = db.relationship("Personnel", backref="attendances", lazy=True)
@@ -56,6 +69,183 @@ class Attendance(BaseModel):
             return self.time_out - self.time_in
         return None
 
+    @classmethod
+    def record_punch(
+        cls,
+        personnel_id,
+        date,
+        time_in=None,
+        time_out=None,
+        time_in_image=None,
+        time_out_image=None,
+        commit=True,
+        **values,
+    ):
+        """
+        Record a time in or time out with a single upsert statement.
+
+        The day's record is created if it does not exist. Otherwise
+        ``time_in`` is only set if it is still empty and ``time_out`` only
+        moves forward, each together with its image. Other ``values`` are
+        only used when the record is created. Where the database supports
+        ``RETURNING`` the record comes back with the statement itself.
+
+        Args:
+            personnel_id (int): Personnel ID
+            date (date): Attendance date
+            time_in (datetime): Time in to record, if any
+            time_out (datetime): Time out to record, if any
+            time_in_image (str): Image of the time in
+            time_out_image (str): Image of the time out
+            commit (bool): Commit the session after the statement
+            **values: Column values for a new record, e.g. ``approved_by``
+
+        Returns:
+            tuple: The day's record after the update, and whether the given
+                times were applied to it
+        """
+        table = cls.__table__
+        row = {
+            "personnel_id": personnel_id,
+            "date": date,
+            "time_in": time_in,
+            "time_out": time_out,
+            "time_in_image": time_in_image,
+            "time_out_image": time_out_image,
+            "date_created": datetime.utcnow(),
+            "status": AttendanceStatus.PRESENT,
+            "is_auto_captured": True,
+            "is_approved": True,
+        }
+        row.update(values)
+
+        dialect = db.session.get_bind().dialect.name
+        if dialect == "mysql":
+            statement = mysql.insert(cls).values(**row)
+            new, greatest = statement.inserted, func.greatest
+        elif dialect == "sqlite":
+            statement = sqlite.insert(cls).values(**row)
+            new, greatest = statement.excluded, func.max
+        else:
+            return cls._record_punch_fallback(row, commit)
+
+        # Images are assigned before their times: MySQL evaluates the
+        # assignments in order, so later ones see the updated values
+        updates = [
+            (
+                table.c.time_in_image,
+                case(
+                    (table.c.time_in.is_(None), new.time_in_image),
+                    else_=table.c.time_in_image,
+                ),
+            ),
+            (
+                table.c.time_out_image,
+                case(
+                    (
+                        new.time_out.is_not(None)
+                        & (
+                            table.c.time_out.is_(None)
+                            | (new.time_out >= table.c.time_out)
+                        ),
+                        new.time_out_image,
+                    ),
+                    else_=table.c.time_out_image,
+                ),
+            ),
+            (table.c.time_in, func.coalesce(table.c.time_in, new.time_in)),
+            (
+                table.c.time_out,
+                func.coalesce(
+                    greatest(table.c.time_out, new.time_out),
+                    new.time_out,
+                    table.c.time_out,
+                ),
+            ),
+        ]
+
+        if dialect == "mysql":
+            statement = statement.on_duplicate_key_update(
+                [(column.name, value) for column, value in updates]
+            )
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=["personnel_id", "date"],
+                set_={column.name: value for column, value in updates},
+            )
+
+        from .change import touch
+
+        if db.session.get_bind().dialect.insert_returning:
+            attendance = db.session.scalars(
+                statement.returning(cls),
+                execution_options={"populate_existing": True},
+            ).one()
+        else:
+            db.session.execute(statement)
+            attendance = None
+        # The upsert bypasses the flush that counts attendance changes
+        touch("attendance", personnel_ids=[personnel_id])
+        if commit:
+            db.session.commit()
+
+        if attendance is None:
+            attendance = (
+                cls.query.filter_by(personnel_id=personnel_id, date=date)
+                .populate_existing()
+                .one()
+            )
+        return attendance, attendance.has_punch(time_in, time_out)
+
+    @classmethod
+    def _record_punch_fallback(cls, row, commit):
+        """Read-then-write version of ``record_punch`` for other databases."""
+        attendance = (
+            cls.query.filter_by(personnel_id=row["personnel_id"], date=row["date"])
+            .with_for_update()
+            .first()
+        )
+        if not attendance:
+            attendance = cls(**row)
+            db.session.add(attendance)
+            applied = True
+        else:
+            applied = attendance.merge_punch(
+                row["time_in"], row["time_out"], row["time_in_image"], row["time_out_image"]
+            )
+
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
+        return attendance, applied
+
+    def merge_punch(
+        self, time_in=None, time_out=None, time_in_image=None, time_out_image=None
+    ):
+        """
+        Apply a time in or time out to a loaded record, like ``record_punch``.
+
+        ``time_in`` is only set if it is still empty and ``time_out`` only
+        moves forward, each together with its image.
+
+        Returns:
+            bool: Whether the given times were applied
+        """
+        if self.time_in is None and time_in is not None:
+            self.time_in = time_in
+            self.time_in_image = time_in_image
+        if time_out is not None and (self.time_out is None or time_out >= self.time_out):
+            self.time_out = time_out
+            self.time_out_image = time_out_image
+        return self.has_punch(time_in, time_out)
+
+    def has_punch(self, time_in=None, time_out=None):
+        """Check that the record holds the given time in and time out."""
+        return (time_in is None or self.time_in == time_in) and (
+            time_out is None or self.time_out == time_out
+        )
+
     def to_dict(self):
         """Convert model to dictionary for API responses."""
         result = super().to_dict()
@@ -78,7 +268,9 @@ class PendingAttendance(BaseModel):
     personnel_id = db.Column(db.Integer, db.ForeignKey("personnel.id"), nullable=False)
     date = db.Column(db.Date, nullable=False, default=datetime.utcnow().date)
     attendance_type = db.Column(db.Enum(AttendanceType), nullable=False)
-    image_path = db.Column(db.String(255), nullable=False)  # Path to uploaded image
+    image_path = db.Column(
+        db.String(255), nullable=False, index=True
+    )  # Path to uploaded image
     notes = db.Column(db.Text, nullable=True)  # Optional explanation for manual upload
 
     # Relationships
@@ -0,0 +1,211 @@
+"""
+Change counters for conditional requests.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import event, inspect, select, func, update, insert
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm.util import identity_key
+
+from .base import db, BaseModel
+from .personnel import Personnel
+from .attendance import Attendance, PendingAttendance
+from .face_data import FaceData
+
+# Tables whose changes are counted
+TRACKED_TABLES = ("personnel", "attendance", "pending_attendance")
+
+
+class ChangeCounter(BaseModel):
+    """
+    Per-station version of a table's rows.
+
+    The version of a station's row is increased in the same transaction as
+    every write to the table's rows of that station, so list endpoints can
+    tell whether their data changed without querying it.
+    """
+
+    __tablename__ = "change_counter"
+    __table_args__ = (
+        db.Index(
+            "uq_change_counter_table_station", "table_name", "station_id", unique=True
+        ),
+    )
+
+    table_name = db.Column(db.String(64), nullable=False)
+    station_id = db.Column(db.Integer, nullable=False)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @classmethod
+    def current(cls, tables, station_id=None):
+        """
+        Get the combined version of tables.
+
+        Versions only increase, so their sum changes with every write.
+
+        Args:
+            tables (list): Table names
+            station_id (int): Only count this station, all stations if None
+
+        Returns:
+            tuple: ``(version, updated_at)``, with ``updated_at`` None if the
+            tables were never written
+        """
+        statement = select(
+            func.coalesce(func.sum(cls.version), 0), func.max(cls.updated_at)
+        ).where(cls.table_name.in_(tables))
+        if station_id is not None:
+            statement = statement.where(cls.station_id == station_id)
+        version, updated_at = db.session.execute(statement).one()
+        return int(version), updated_at
+
+
+def bump_versions(connection, changes):
+    """
+    Increase the version of table and station pairs.
+
+    Args:
+        connection (Connection): Connection of the writing transaction
+        changes (iterable): ``(table_name, station_id)`` pairs
+    """
+    table = ChangeCounter.__table__
+    now = datetime.utcnow()
+    # A fixed order keeps concurrent transactions from deadlocking
+    rows = [
+        {
+            "table_name": table_name,
+            "station_id": station_id,
+            "version": 1,
+            "updated_at": now,
+            "date_created": now,
+        }
+        for table_name, station_id in sorted(set(changes))
+        if station_id is not None
+    ]
+    if not rows:
+        return
+
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(
+            version=table.c.version + 1, updated_at=statement.inserted.updated_at
+        )
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["table_name", "station_id"],
+            set_={"version": table.c.version + 1, "updated_at": now},
+        )
+    else:
+        for row in rows:
+            result = connection.execute(
+                update(table)
+                .where(
+                    table.c.table_name == row["table_name"],
+                    table.c.station_id == row["station_id"],
+                )
+                .values(version=table.c.version + 1, updated_at=now)
+            )
+            if not result.rowcount:
+                connection.execute(insert(table).values(row))
+        return
+
+    connection.execute(statement)
+
+
+def station_ids(session, personnel_ids):
+    """
+    Get the stations of personnel.
+
+    Personnel already in the session are not queried.
+
+    Args:
+        session (Session): Session to read from
+        personnel_ids (iterable): Personnel IDs
+
+    Returns:
+        dict: Station ID by personnel ID
+    """
+    stations = {}
+    missing = set()
+    for personnel_id in set(personnel_ids):
+        if personnel_id is None:
+            continue
+        personnel = session.identity_map.get(identity_key(Personnel, personnel_id))
+        if personnel is not None:
+            stations[personnel_id] = personnel.station_id
+        else:
+            missing.add(personnel_id)
+
+    if missing:
+        stations.update(
+            session.connection().execute(
+                select(Personnel.id, Personnel.station_id).where(
+                    Personnel.id.in_(missing)
+                )
+            ).all()
+        )
+    return stations
+
+
+def touch(table_name, personnel_ids=(), stations=()):
+    """
+    Bump versions after writes the session does not track.
+
+    Statements executed with ``db.session.execute`` bypass the flush, so
+    callers running them report the personnel or stations they wrote.
+
+    Args:
+        table_name (str): Table that was written
+        personnel_ids (iterable): Personnel whose rows were written
+        stations (iterable): Stations whose rows were written
+    """
+    stations = set(stations)
+    stations.update(station_ids(db.session, personnel_ids).values())
+    bump_versions(
+        db.session.connection(), [(table_name, station) for station in stations]
+    )
+
+
+def _changes(session, instances):
+    """Get the ``(table_name, station_id)`` pairs written by a flush."""
+    changes = set()
+    by_personnel = []
+
+    for instance in instances:
+        if isinstance(instance, Personnel):
+            changes.add(("personnel", instance.station_id))
+            # A personnel moved between stations takes its records along
+            history = inspect(instance).attrs.station_id.history
+            for station in history.deleted or ():
+                for table_name in TRACKED_TABLES:
+                    changes.add((table_name, station))
+                    changes.add((table_name, instance.station_id))
+        elif isinstance(instance, FaceData):
+            # Personnel lists show whether faces are registered
+            by_personnel.append(("personnel", instance.personnel_id))
+        elif isinstance(instance, (Attendance, PendingAttendance)):
+            by_personnel.append((instance.__tablename__, instance.personnel_id))
+
+    if by_personnel:
+        stations = station_ids(session, [pid for _, pid in by_personnel])
+        changes.update((table, stations.get(pid)) for table, pid in by_personnel)
+    return changes
+
+
+@event.listens_for(Personnel.station_id, "set", active_history=True)
+def _load_previous_station(target, value, oldvalue, initiator):
+    """Load the previous station of a moved personnel, even if expired."""
+
+
+@event.listens_for(db.session, "after_flush")
+def _bump_flushed_versions(session, flush_context):
+    """Bump the versions of the rows written by a flush."""
+    instances = list(session.new) + list(session.deleted)
+    instances += [instance for instance in session.dirty if session.is_modified(instance)]
+    changes = _changes(session, instances)
+    if changes:
+        bump_versions(session.connection(), changes)
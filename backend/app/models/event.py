@@ -0,0 +1,23 @@
+"""
+Live event model.
+"""
+
+from .base import db, BaseModel
+
+
+class LiveEvent(BaseModel):
+    """
+    Event published to the live dashboards.
+
+    Every API process stores the events of its writes here and publishes
+    the ones stored by all processes, in ID order, so a dashboard receives
+    every event whichever process it is connected to. Rows are only kept
+    for ``EVENTS_RETENTION`` seconds.
+    """
+
+    __tablename__ = "live_event"
+    __table_args__ = (db.Index("ix_live_event_date_created", "date_created"),)
+
+    station_id = db.Column(db.Integer, nullable=False)
+    event_type = db.Column(db.String(32), nullable=False)
+    data = db.Column(db.Text, nullable=False)  # JSON payload
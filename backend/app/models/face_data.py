@@ -14,7 +14,7 @@ class FaceData(BaseModel):
     __tablename__ = "face_data"
 
     personnel_id = db.Column(db.Integer, db.ForeignKey("personnel.id"), nullable=False)
-    filename = db.Column(db.String(255), nullable=False)
+    filename = db.Column(db.String(255), nullable=False, index=True)
     embedding = db.Column(
         db.Text(length=4294967295), nullable=True
     )  # LONGTEXT - JSON string of face embedding
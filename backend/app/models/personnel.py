@@ -2,6 +2,8 @@
 Personnel model representing fire personnel.
 """
 
+from sqlalchemy import func
+
 from .base import db, BaseModel
 from .user import User
 
@@ -17,7 +19,9 @@ class Personnel(BaseModel):
     last_name = db.Column(db.String(100), nullable=False)
     rank = db.Column(db.String(100), nullable=False)
     station_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    image_path = db.Column(db.String(255), nullable=True)  # Path to profile picture
+    image_path = db.Column(
+        db.String(255), nullable=True, index=True
+    )  # Path to profile picture
 
     # Relationships
     station = db.relationship("User", backref="personnel", lazy=True)
@@ -37,10 +41,64 @@ class Personnel(BaseModel):
         count = FaceData.query.filter_by(personnel_id=self.id).count()
         return count > 0
 
-    def to_dict(self):
-        """Convert model to dictionary for API responses."""
+    def to_dict(self, has_face_data=None):
+        """
+        Convert model to dictionary for API responses.
+
+        Args:
+            has_face_data (bool): Precomputed face data flag. Queried when
+                omitted, so lists should use ``to_dict_list`` instead.
+        """
         result = super().to_dict()
         # Add derived properties
         result["full_name"] = self.full_name
-        result["has_face_data"] = self.has_face_data
+        result["has_face_data"] = (
+            self.has_face_data if has_face_data is None else has_face_data
+        )
+        return result
+
+    @classmethod
+    def face_data_counts(cls, personnel_ids):
+        """
+        Count face data records for many personnel in one query.
+
+        Args:
+            personnel_ids (list): Personnel IDs
+
+        Returns:
+            dict: Face data count by personnel ID, omitting personnel without any
+        """
+        from .face_data import FaceData
+
+        if not personnel_ids:
+            return {}
+
+        rows = (
+            db.session.query(FaceData.personnel_id, func.count(FaceData.id))
+            .filter(FaceData.personnel_id.in_(personnel_ids))
+            .group_by(FaceData.personnel_id)
+            .all()
+        )
+        return dict(rows)
+
+    @classmethod
+    def to_dict_list(cls, personnel):
+        """
+        Convert many personnel to dictionaries with a fixed number of queries.
+
+        Args:
+            personnel (list): Personnel instances
+
+        Returns:
+            list: Dictionaries in the same order
+        """
+        from .serializers import serializer
+
+        serialize = serializer(cls)
+        counts = cls.face_data_counts([p.id for p in personnel])
+        result = []
+        for p in personnel:
+            data = serialize(p)
+            data["has_face_data"] = counts.get(p.id, 0) > 0
+            result.append(data)
         return result
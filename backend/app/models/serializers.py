@@ -0,0 +1,157 @@
+"""
+Compiled model serializers.
+
+``BaseModel.to_dict`` reflects over the table's columns for every row and
+leaves dates and enums to the JSON encoder. For lists, ``serializer`` instead
+generates one function per model and field set that reads each value once
+and converts dates and enums inline, e.g. for ``PendingAttendance``::
+
+    def serialize(obj):
+        d = obj.__dict__
+        if not NAMES <= d.keys():
+            d = {name: getattr(obj, name) for name in NAMES}
+        result = {
+            'personnel_id': d['personnel_id'],
+            'date': None if (v := d['date']) is None else v.isoformat(),
+            'attendance_type': None if (v := d['attendance_type']) is None else v.value,
+            ...
+        }
+        return result
+
+Loaded instances are read from their ``__dict__``, skipping the attribute
+instrumentation; expired or deferred attributes go through ``getattr`` and
+load as usual.
+
+The output equals ``to_dict`` after JSON encoding. Values that need other
+queries, such as ``Personnel.has_face_data``, are added by the caller.
+
+``dumps`` encodes with ``orjson`` when it is installed and falls back to the
+standard library otherwise.
+"""
+
+import json
+from functools import lru_cache
+
+from sqlalchemy import Date, DateTime, Enum, Time
+
+from ..config import json_default
+from .user import User
+from .personnel import Personnel
+from .attendance import Attendance
+from .face_data import FaceData
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson else "json"
+
+# Columns never sent to clients
+EXCLUDED_FIELDS = {
+    User: ("password",),
+    FaceData: ("embedding",),
+}
+
+# Derived fields appended to the generated function, with the column values
+# in ``d`` and the dictionary in ``result``
+DERIVED_FIELDS = {
+    Attendance: [
+        "if d['time_in'] and d['time_out'] and (x := d['time_out'] - d['time_in']):",
+        "    result['duration'] = str(x)",
+    ],
+    Personnel: [
+        "result['full_name'] = f\"{d['rank']} {d['first_name']} {d['last_name']}\"",
+    ],
+}
+
+
+def _value_source(column, read):
+    """Get the expression converting a column value read by ``read``."""
+    if isinstance(column.type, (Date, DateTime, Time)):
+        return f"None if (v := {read}) is None else v.isoformat()"
+    if isinstance(column.type, Enum) and column.type.enum_class is not None:
+        return f"None if (v := {read}) is None else v.value"
+    return read
+
+
+@lru_cache(maxsize=None)
+def serializer(model, fields=None):
+    """
+    Get the compiled serializer of a model.
+
+    Args:
+        model (type): Model class
+        fields (tuple): Columns to include, in order. When None, all columns
+            and the derived fields of a model instance. Otherwise the fields
+            are read as attributes, which also works on rows of
+            ``session.query(*columns)``.
+
+    Returns:
+        callable: Function converting one instance or row to a dictionary
+    """
+    columns = model.__table__.columns
+    excluded = EXCLUDED_FIELDS.get(model, ())
+    if fields is None:
+        names = [column.name for column in columns if column.name not in excluded]
+        derived = DERIVED_FIELDS.get(model, [])
+    else:
+        names = [name for name in fields if name not in excluded]
+        derived = []
+
+    for name in names:
+        if not name.isidentifier():
+            raise ValueError(f"Cannot serialize column {name!r} of {model.__name__}")
+
+    lines = ["def serialize(obj):"]
+    if fields is None:
+        lines += [
+            "    d = obj.__dict__",
+            "    if not NAMES <= d.keys():",
+            "        d = {name: getattr(obj, name) for name in NAMES}",
+        ]
+        read = "d[{!r}]".format
+    else:
+        read = "obj.{}".format
+
+    lines.append("    result = {")
+    lines += [
+        f"        {name!r}: {_value_source(columns[name], read(name))},"
+        for name in names
+    ]
+    lines.append("    }")
+    lines += [f"    {line}" for line in derived]
+    lines.append("    return result")
+
+    namespace = {"NAMES": frozenset(names)}
+    code = compile("\n".join(lines), f"<serializer {model.__name__}>", "exec")
+    exec(code, namespace)
+    return namespace["serialize"]
+
+
+def serialize_many(model, rows, fields=None):
+    """
+    Serialize many instances or rows of a model.
+
+    Args:
+        model (type): Model class
+        rows (list): Instances, or rows of the given ``fields``
+        fields (list): Columns to include, all columns when None
+
+    Returns:
+        list: Dictionaries in the same order
+    """
+    serialize = serializer(model, tuple(fields) if fields else None)
+    return [serialize(row) for row in rows]
+
+
+def dumps(value):
+    """
+    Encode a value as compact JSON.
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson:
+        return orjson.dumps(value, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=json_default, separators=(",", ":")).encode()
@@ -0,0 +1,35 @@
+"""
+Daily attendance summary model.
+"""
+
+from datetime import datetime
+
+from .base import db, BaseModel
+
+
+class DailyAttendanceSummary(BaseModel):
+    """
+    Per-station, per-day attendance counts.
+
+    Maintained by ``app.services.summary`` as attendance is recorded and
+    approved, so dashboards and reports read one row per station and day
+    instead of scanning attendance.
+    """
+
+    __tablename__ = "daily_attendance_summary"
+    __table_args__ = (
+        db.Index(
+            "uq_daily_attendance_summary_date_station", "date", "station_id", unique=True
+        ),
+    )
+
+    station_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    present = db.Column(db.Integer, nullable=False, default=0)
+    late = db.Column(db.Integer, nullable=False, default=0)
+    absent = db.Column(db.Integer, nullable=False, default=0)
+    pending = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+
+    # Relationships
+    station = db.relationship("User", lazy=True)
@@ -0,0 +1,223 @@
+"""
+Buffered activity logging.
+
+Activity log entries are queued by the request and written by a background
+thread in batches, with a single multi-row insert per batch, instead of a
+separate commit on every request.
+"""
+
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import insert
+
+from ..models import db, ActivityLog
+from ..utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("activity_logger")
+
+# Queue markers
+_FLUSH = object()
+_STOP = object()
+
+
+def activity_entry(user_id, title, description=None):
+    """
+    Build an activity log row for a multi-row insert.
+
+    Returns:
+        dict: Column values of the entry
+    """
+    return {
+        "user_id": user_id,
+        "title": title,
+        "description": description,
+        "timestamp": datetime.utcnow(),
+    }
+
+
+class ActivityLogger:
+    """
+    Queue of activity log entries flushed in batches by a writer thread.
+
+    A batch is written when it reaches ``batch_size`` entries or when its
+    oldest entry has waited ``flush_interval`` seconds. When the queue is
+    full, or the logger is not running, entries are written synchronously.
+    Entries are always written on their own connection and transaction, so
+    logging never commits or rolls back the caller's session.
+    """
+
+    def __init__(self, app, batch_size=100, flush_interval=1.0, queue_size=1000):
+        """
+        Initialize a new ActivityLogger.
+
+        Args:
+            app (Flask): Application whose database the entries are written to
+            batch_size (int): Maximum number of entries per insert
+            flush_interval (float): Maximum seconds an entry waits in a batch
+            queue_size (int): Maximum number of queued entries
+        """
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "logged": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "sync_writes": 0,
+        }
+
+    def start(self):
+        """Start the writer thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="activity-logger", daemon=True
+        )
+        self._thread.start()
+
+    def log(self, user_id, title, description=None):
+        """
+        Queue an activity log entry.
+
+        Args:
+            user_id (int): User who performed the action
+            title (str): Short title of the action
+            description (str): Details of the action
+        """
+        entry = activity_entry(user_id, title, description)
+
+        with self._lock:
+            self._stats["logged"] += 1
+
+        if self._closed or not self._thread:
+            self._write([entry], sync=True)
+            return
+
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self._write([entry], sync=True)
+
+    def flush(self):
+        """Block until every queued entry has been written."""
+        if self._thread:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def shutdown(self):
+        """Write outstanding entries and stop the writer thread."""
+        if self._closed:
+            return
+
+        self._closed = True
+        if self._thread:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def metrics(self):
+        """
+        Get queue and throughput metrics.
+
+        Returns:
+            dict: Current queue depth and cumulative counters
+        """
+        with self._lock:
+            result = dict(self._stats)
+        result["queue_depth"] = self._queue.qsize()
+        result["queue_capacity"] = self._queue.maxsize
+        return result
+
+    def _run(self):
+        """Writer loop."""
+        with self.app.app_context():
+            batch = []
+            received = 0
+            deadline = None
+
+            while True:
+                timeout = None if not batch else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                    received += 1
+                except queue.Empty:
+                    item = _FLUSH
+
+                if item is not _FLUSH and item is not _STOP:
+                    if not batch:
+                        deadline = time.monotonic() + self.flush_interval
+                    batch.append(item)
+                    if len(batch) < self.batch_size:
+                        continue
+
+                if batch:
+                    self._write(batch)
+                    batch = []
+
+                for _ in range(received):
+                    self._queue.task_done()
+                received = 0
+
+                if item is _STOP:
+                    return
+
+    def _write(self, entries, sync=False):
+        """Insert entries with a single statement and update the counters."""
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(ActivityLog).values(entries))
+            failed = False
+        except Exception as e:
+            logger.error(f"Error writing {len(entries)} activity log entries: {e}")
+            failed = True
+
+        with self._lock:
+            self._stats["failed" if failed else "written"] += len(entries)
+            self._stats["batches"] += 1
+            if sync:
+                self._stats["sync_writes"] += 1
+
+
+def init_activity_logger(app):
+    """
+    Create the application's activity logger and register it for shutdown.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        ActivityLogger: The logger, started unless ``ACTIVITY_LOG_ASYNC`` is off
+    """
+    activity_logger = ActivityLogger(
+        app,
+        batch_size=app.config["ACTIVITY_LOG_BATCH_SIZE"],
+        flush_interval=app.config["ACTIVITY_LOG_FLUSH_INTERVAL"],
+        queue_size=app.config["ACTIVITY_LOG_QUEUE_SIZE"],
+    )
+    if app.config["ACTIVITY_LOG_ASYNC"]:
+        activity_logger.start()
+        atexit.register(activity_logger.shutdown)
+    app.activity_logger = activity_logger
+    return activity_logger
+
+
+def log_activity(user_id, title, description=None):
+    """
+    Record an activity with the current application's activity logger.
+
+    Args:
+        user_id (int): User who performed the action
+        title (str): Short title of the action
+        description (str): Details of the action
+    """
+    current_app.activity_logger.log(user_id, title, description)
@@ -0,0 +1,204 @@
+"""
+Bulk approval of pending attendance.
+
+A batch is resolved in one transaction. The pending records and the
+attendance records they complete are loaded with one query each and locked
+against concurrent approvals. Approvals are merged into the attendance
+records in memory and written together. The pending records are then deleted
+with one statement and the activity log entries inserted with another, and
+the daily summary of every station and day involved is recomputed once.
+Signals are sent once the transaction has committed, with a single
+``attendance_recorded`` per attendance record however many approvals it
+merged.
+"""
+
+from sqlalchemy import select, delete, insert
+from sqlalchemy.exc import SQLAlchemyError
+from flask import current_app
+
+from ..models import (
+    db,
+    ActivityLog,
+    Attendance,
+    AttendanceStatus,
+    AttendanceType,
+    PendingAttendance,
+    Personnel,
+)
+from ..models.change import touch
+from ..signals import attendance_recorded, pending_resolved
+from ..utils.errors import AppError, ErrorCode
+from .activity_logger import activity_entry
+from .summary import refresh_daily_summaries
+
+ACTIONS = ("approve", "reject")
+
+
+def resolve_pending_bulk(items, user_id):
+    """
+    Approve or reject many pending attendance records at once.
+
+    Args:
+        items (list): ``(pending_id, action)`` pairs with unique IDs
+        user_id (int): Admin resolving the records
+
+    Returns:
+        list: One result per item, in the same order
+
+    Raises:
+        AppError: If the transaction failed. Nothing is changed then.
+    """
+    actions = dict(items)
+
+    try:
+        rows = db.session.execute(
+            select(PendingAttendance, Personnel.station_id)
+            .join(Personnel, Personnel.id == PendingAttendance.personnel_id)
+            .where(PendingAttendance.id.in_(actions))
+            .with_for_update(of=PendingAttendance)
+        ).all()
+        # Deleted rows cannot be read after the commit, so keep what the
+        # results and signals need
+        found = {
+            pending.id: (pending.personnel_id, pending.date, station_id)
+            for pending, station_id in rows
+        }
+
+        # Earlier punches first, so time out only moves forward
+        approvals = sorted(
+            (pending for pending, _ in rows if actions[pending.id] == "approve"),
+            key=lambda pending: pending.date_created,
+        )
+        records = _load_attendance(approvals)
+
+        for pending in approvals:
+            key = (pending.personnel_id, pending.date)
+            if key not in records:
+                records[key] = Attendance(
+                    personnel_id=pending.personnel_id,
+                    date=pending.date,
+                    status=AttendanceStatus.PRESENT,
+                    is_auto_captured=False,
+                    is_approved=True,
+                    approved_by=user_id,
+                )
+                db.session.add(records[key])
+
+            if pending.attendance_type == AttendanceType.TIME_IN:
+                records[key].merge_punch(
+                    time_in=pending.date_created, time_in_image=pending.image_path
+                )
+            else:
+                records[key].merge_punch(
+                    time_out=pending.date_created, time_out_image=pending.image_path
+                )
+
+        if rows:
+            db.session.execute(
+                delete(PendingAttendance).where(PendingAttendance.id.in_(found)),
+                execution_options={"synchronize_session": False},
+            )
+            touch(
+                "pending_attendance",
+                stations={station_id for _, _, station_id in found.values()},
+            )
+            db.session.execute(
+                insert(ActivityLog),
+                [
+                    _log_entry(pending, actions[pending.id], user_id)
+                    for pending, _ in rows
+                ],
+            )
+            refresh_daily_summaries(
+                ((station_id, day) for _, day, station_id in found.values()),
+                commit=False,
+            )
+
+        # The results and signals read the attendance records after the
+        # commit, which would otherwise reload them one by one
+        session = db.session()
+        session.expire_on_commit = False
+        try:
+            session.commit()
+        finally:
+            session.expire_on_commit = True
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Database error: {str(e)}")
+        raise AppError(
+            "Database error occurred while resolving pending attendance",
+            ErrorCode.SYSTEM_DATABASE_ERROR,
+        )
+
+    app = current_app._get_current_object()
+    results = []
+    for pending_id, action in items:
+        if pending_id not in found:
+            results.append(
+                {
+                    "pending_id": pending_id,
+                    "action": action,
+                    "success": False,
+                    "error": "Pending attendance record not found",
+                }
+            )
+            continue
+
+        personnel_id, day, station_id = found[pending_id]
+        attendance = records.get((personnel_id, day)) if action == "approve" else None
+        result = {"pending_id": pending_id, "action": action, "success": True}
+        if attendance is not None:
+            result["attendance_id"] = attendance.id
+        results.append(result)
+
+        pending_resolved.send(
+            app,
+            personnel_id=personnel_id,
+            station_id=station_id,
+            date=day,
+            pending_id=pending_id,
+            approved=action == "approve",
+            attendance=attendance,
+            summary_refreshed=True,
+        )
+
+    stations = {(pid, day): station for pid, day, station in found.values()}
+    for (personnel_id, day), attendance in records.items():
+        attendance_recorded.send(
+            app,
+            personnel_id=personnel_id,
+            station_id=stations[personnel_id, day],
+            date=day,
+            attendance=attendance,
+            summary_refreshed=True,
+        )
+
+    return results
+
+
+def _load_attendance(approvals):
+    """Load and lock the attendance records completed by approvals."""
+    if not approvals:
+        return {}
+
+    keys = {(pending.personnel_id, pending.date) for pending in approvals}
+    records = Attendance.query.filter(
+        Attendance.personnel_id.in_({personnel_id for personnel_id, _ in keys}),
+        Attendance.date.in_({day for _, day in keys}),
+    ).with_for_update()
+    return {
+        (record.personnel_id, record.date): record
+        for record in records
+        if (record.personnel_id, record.date) in keys
+    }
+
+
+def _log_entry(pending, action, user_id):
+    """Build the activity log entry of a resolved record."""
+    title = "Approve Attendance" if action == "approve" else "Reject Attendance"
+    verb = "Approved" if action == "approve" else "Rejected"
+    return activity_entry(
+        user_id,
+        title,
+        f"{verb} {pending.attendance_type.value} for Personnel ID {pending.personnel_id}",
+    )
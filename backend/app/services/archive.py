@@ -0,0 +1,282 @@
+"""
+Archival of historical attendance and activity.
+
+Attendance older than ``ARCHIVE_ATTENDANCE_AFTER_DAYS`` and activity log
+entries older than ``ARCHIVE_ACTIVITY_LOG_AFTER_DAYS`` are moved to their
+archive tables (``app.models.archive``) in batches of ``ARCHIVE_BATCH_SIZE``
+rows. Each batch is copied with one ``INSERT ... SELECT`` and removed with
+one ``DELETE`` in the same transaction, so a row is always in exactly one of
+the two tables.
+
+Readers get the rows of a range from ``attendance_source`` or
+``activity_log_source``. These return the hot model itself when the range
+starts after the table's watermark, and otherwise an alias of the model
+over a ``UNION ALL`` of both tables with the range applied to each side.
+The watermark is raised before rows are moved and read in the reader's
+transaction, whose snapshot then either predates the move or includes the
+raised watermark.
+
+As with the retention cleanup, only the process holding the leader lock
+archives.
+"""
+
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, delete, union_all, Date
+from sqlalchemy.orm import aliased
+
+from ..models import (
+    db,
+    Attendance,
+    ActivityLog,
+    AttendanceArchive,
+    ActivityLogArchive,
+    ArchiveWatermark,
+)
+from ..utils.logger import setup_logger
+from .retention import LeaderLock
+
+# Set up logger
+logger = setup_logger("archive")
+
+# Archive model and date column of each archived model
+ARCHIVES = {
+    Attendance: (AttendanceArchive, "date"),
+    ActivityLog: (ActivityLogArchive, "timestamp"),
+}
+
+
+def archived_before(model):
+    """
+    Get the watermark of a model's table.
+
+    Returns:
+        date: Rows before this day may be archived, None if none ever were
+    """
+    return db.session.scalar(
+        select(ArchiveWatermark.archived_before).where(
+            ArchiveWatermark.table_name == model.__tablename__
+        )
+    )
+
+
+def _bound(column, day):
+    """Convert a day to a bound comparable with a date or datetime column."""
+    if isinstance(column.type, Date) or day is None:
+        return day
+    return datetime.combine(day, datetime.min.time())
+
+
+def _source(model, start=None, end=None):
+    """
+    Get what to select a model's rows of a range from.
+
+    Args:
+        model (type): ``Attendance`` or ``ActivityLog``
+        start: First value of the date column, inclusive
+        end: Last value of the date column, inclusive
+
+    Returns:
+        The model, or an alias of it over both tables
+    """
+    archive, column_name = ARCHIVES[model]
+    watermark = archived_before(model)
+    column = model.__table__.c[column_name]
+    if watermark is None or (start is not None and start >= _bound(column, watermark)):
+        return model
+
+    def rows(table):
+        column = table.c[column_name]
+        statement = select(*[table.c[c.name] for c in model.__table__.columns])
+        if start is not None:
+            statement = statement.where(column >= start)
+        if end is not None:
+            statement = statement.where(column <= end)
+        return statement
+
+    union = union_all(rows(model.__table__), rows(archive.__table__))
+    return aliased(model, union.subquery(f"{model.__tablename__}_all"))
+
+
+def attendance_source(date_from=None, date_to=None):
+    """
+    Get what to select attendance of a date range from.
+
+    Use the result in place of ``Attendance`` in the query, e.g.
+    ``select(source.date).where(source.personnel_id == 1)``.
+
+    Args:
+        date_from (date): First day, None for all history
+        date_to (date): Last day, None for no limit
+
+    Returns:
+        ``Attendance``, or an alias of it including archived records
+    """
+    return _source(Attendance, date_from, date_to)
+
+
+def activity_log_source(since=None, until=None):
+    """
+    Get what to select activity log entries of a time range from.
+
+    Args:
+        since (datetime): First timestamp, None for all history
+        until (datetime): Last timestamp, None for no limit
+
+    Returns:
+        ``ActivityLog``, or an alias of it including archived entries
+    """
+    return _source(ActivityLog, since, until)
+
+
+def _raise_watermark(model, cutoff):
+    """Move a table's watermark up to ``cutoff`` and commit."""
+    watermark = ArchiveWatermark.query.filter_by(
+        table_name=model.__tablename__
+    ).first()
+    if watermark is None:
+        db.session.add(
+            ArchiveWatermark(table_name=model.__tablename__, archived_before=cutoff)
+        )
+    elif watermark.archived_before < cutoff:
+        watermark.archived_before = cutoff
+        watermark.updated_at = datetime.utcnow()
+    db.session.commit()
+
+
+def archive_rows(model, cutoff, batch_size=1000, batch_pause=0):
+    """
+    Move the rows of a model dated before a day to its archive table.
+
+    Args:
+        model (type): ``Attendance`` or ``ActivityLog``
+        cutoff (date): Rows before this day are moved
+        batch_size (int): Rows moved per transaction
+        batch_pause (float): Seconds to pause between batches
+
+    Returns:
+        int: Number of rows moved
+    """
+    archive, column_name = ARCHIVES[model]
+    hot, cold = model.__table__, archive.__table__
+    column = hot.c[column_name]
+    names = [c.name for c in hot.columns]
+
+    _raise_watermark(model, cutoff)
+
+    moved = 0
+    while True:
+        ids = db.session.scalars(
+            select(hot.c.id)
+            .where(column < _bound(column, cutoff))
+            .order_by(hot.c.id)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+
+        try:
+            rows = select(*[hot.c[name] for name in names]).where(hot.c.id.in_(ids))
+            db.session.execute(insert(cold).from_select(names, rows))
+            db.session.execute(delete(hot).where(hot.c.id.in_(ids)))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        moved += len(ids)
+        if batch_pause:
+            time.sleep(batch_pause)
+
+    return moved
+
+
+def run_archival(app, lock=None, today=None):
+    """
+    Archive old attendance and activity if this process is the leader.
+
+    Args:
+        app (Flask): The Flask application
+        lock (LeaderLock): Lock to elect the leader, as for ``run_retention``
+        today (date): Reference date, defaults to today
+
+    Returns:
+        dict: Rows moved per table, or None if another process is the leader
+    """
+    owns_lock = lock is None
+    if owns_lock:
+        lock = _leader_lock(app)
+
+    if not lock.acquire():
+        logger.info("Archival skipped, another process is the leader")
+        return None
+
+    try:
+        today = today or datetime.now().date()
+        config = app.config
+        horizons = {
+            Attendance: config["ARCHIVE_ATTENDANCE_AFTER_DAYS"],
+            ActivityLog: config["ARCHIVE_ACTIVITY_LOG_AFTER_DAYS"],
+        }
+        stats = {}
+        for model, days in horizons.items():
+            stats[model.__tablename__] = archive_rows(
+                model,
+                today - timedelta(days=days),
+                config["ARCHIVE_BATCH_SIZE"],
+                config["ARCHIVE_BATCH_PAUSE"],
+            )
+        logger.info(
+            f"Archived {stats['attendance']} attendance records and "
+            f"{stats['activity_log']} activity log entries"
+        )
+        return stats
+    finally:
+        if owns_lock:
+            lock.release()
+
+
+def _leader_lock(app):
+    """Create the lock electing the process that archives."""
+    folder = app.config["RETENTION_STATE_FOLDER"]
+    return LeaderLock(os.path.join(folder, "archive.lock"))
+
+
+def archive_thread_function(app):
+    """
+    Archive once a day.
+
+    Every process runs this thread but only the lock holder archives, and
+    the others retry every ``ARCHIVE_INTERVAL`` seconds.
+    """
+    lock = _leader_lock(app)
+    last_day = None
+
+    while True:
+        with app.app_context():
+            try:
+                today = datetime.now().date()
+                if last_day != today and run_archival(app, lock, today) is not None:
+                    last_day = today
+            except Exception as e:
+                logger.error(f"Error archiving: {e}")
+            finally:
+                db.session.remove()
+        time.sleep(app.config["ARCHIVE_INTERVAL"])
+
+
+def init_archiver(app):
+    """
+    Start archiving the application's old attendance and activity.
+
+    Args:
+        app (Flask): The Flask application
+    """
+    if not app.config["ARCHIVE_ENABLED"]:
+        return
+
+    thread = threading.Thread(target=archive_thread_function, args=(app,), daemon=True)
+    thread.start()
@@ -0,0 +1,271 @@
+"""
+Nightly computation of attendance statuses.
+
+Once a day has ended, every attendance record with a time in is marked
+``LATE`` or ``PRESENT`` by comparing its time in against ``WORK_START_TIME``,
+and every personnel without an attendance or pending attendance record for
+the day gets an ``ABSENT`` record. Both are single statements per day, an
+``UPDATE`` and an ``INSERT ... SELECT`` with ``NOT EXISTS`` anti-joins, so a
+day costs the same whatever the number of personnel.
+
+Times in are stored in UTC while ``WORK_START_TIME`` is local time, so the
+start of work is converted to UTC with ``ATTENDANCE_UTC_OFFSET`` and compared
+with the full time in, which also keeps late evening UTC times of the day
+before in the right place.
+
+Runs are idempotent: statuses that are already right are not written again
+and absences are only added once. The scheduled run therefore simply covers
+the last ``ATTENDANCE_STATUS_LOOKBACK_DAYS`` days, which also catches up on
+days missed while the application was down and on late approvals.
+"""
+
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, insert, exists, case, literal, or_
+
+from ..models import db, Attendance, AttendanceStatus, PendingAttendance, Personnel
+from ..models.change import touch
+from ..utils.logger import setup_logger
+from .retention import LeaderLock
+from .summary import rebuild_daily_summary
+
+# Set up logger
+logger = setup_logger("attendance_status")
+
+
+def late_after(day, work_start, utc_offset):
+    """Get the UTC time after which a time in on ``day`` is late."""
+    start = datetime.strptime(work_start, "%H:%M").time()
+    return datetime.combine(day, start) - timedelta(hours=utc_offset)
+
+
+def mark_lateness(day, work_start, utc_offset=0):
+    """
+    Set the status of a day's attendance records from their time in.
+
+    Args:
+        day (date): Day to update
+        work_start (str): Local start of work as ``HH:MM``
+        utc_offset (float): Hours local time is ahead of UTC
+
+    Returns:
+        int: Number of records whose status changed
+    """
+    status_type = Attendance.__table__.c.status.type
+    status = case(
+        (
+            Attendance.time_in > late_after(day, work_start, utc_offset),
+            literal(AttendanceStatus.LATE, status_type),
+        ),
+        else_=literal(AttendanceStatus.PRESENT, status_type),
+    )
+    result = db.session.execute(
+        update(Attendance)
+        .where(
+            Attendance.date == day,
+            Attendance.time_in.is_not(None),
+            or_(Attendance.status.is_(None), Attendance.status != status),
+        )
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def mark_absences(day, utc_offset=0):
+    """
+    Add absence records for personnel who did not attend on a day.
+
+    Personnel with a pending attendance record for the day are left alone
+    until it is resolved, as are personnel added after the day.
+
+    Args:
+        day (date): Day to update
+        utc_offset (float): Hours local time is ahead of UTC
+
+    Returns:
+        int: Number of absence records added
+    """
+    attended = exists().where(
+        Attendance.personnel_id == Personnel.id, Attendance.date == day
+    )
+    pending = exists().where(
+        PendingAttendance.personnel_id == Personnel.id, PendingAttendance.date == day
+    )
+    # Personnel are added with UTC times, compared with the local day's end
+    next_day = datetime.combine(day + timedelta(days=1), datetime.min.time())
+    next_day -= timedelta(hours=utc_offset)
+    columns = Attendance.__table__.c
+
+    absentees = select(
+        Personnel.id,
+        literal(day, columns.date.type),
+        literal(AttendanceStatus.ABSENT, columns.status.type),
+        literal(False, columns.is_auto_captured.type),
+        literal(True, columns.is_approved.type),
+        literal(datetime.utcnow(), columns.date_created.type),
+    ).where(
+        ~attended,
+        ~pending,
+        or_(Personnel.date_created.is_(None), Personnel.date_created < next_day),
+    )
+    result = db.session.execute(
+        insert(Attendance.__table__).from_select(
+            [
+                "personnel_id",
+                "date",
+                "status",
+                "is_auto_captured",
+                "is_approved",
+                "date_created",
+            ],
+            absentees,
+        )
+    )
+    return result.rowcount
+
+
+def update_statuses(date_from, date_to, work_start, today=None, utc_offset=0):
+    """
+    Compute the attendance statuses of a date range, one day per transaction.
+
+    Days that have not ended yet are skipped.
+
+    Args:
+        date_from (date): First day
+        date_to (date): Last day
+        work_start (str): Local start of work as ``HH:MM``
+        today (date): Reference date, defaults to today
+        utc_offset (float): Hours local time is ahead of UTC
+
+    Returns:
+        dict: Number of days processed, statuses changed and absences added
+    """
+    yesterday = (today or datetime.now().date()) - timedelta(days=1)
+    date_to = min(date_to, yesterday)
+    stats = {"days": 0, "late_or_present": 0, "absent": 0}
+
+    changed_from = changed_to = None
+    day = date_from
+    while day <= date_to:
+        try:
+            changed = mark_lateness(day, work_start, utc_offset)
+            added = mark_absences(day, utc_offset)
+            if changed or added:
+                # Statements bypass the flush, so report the writes
+                stations = db.session.scalars(
+                    select(Personnel.station_id).distinct()
+                ).all()
+                touch("attendance", stations=stations)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if changed or added:
+            changed_from = changed_from or day
+            changed_to = day
+        stats["days"] += 1
+        stats["late_or_present"] += changed
+        stats["absent"] += added
+        day += timedelta(days=1)
+
+    # Recount the summary over the days that changed
+    if changed_from:
+        rebuild_daily_summary(changed_from, changed_to)
+
+    return stats
+
+
+def _leader_lock(app):
+    """Create the lock electing the process that runs the job."""
+    return LeaderLock(
+        os.path.join(app.config["RETENTION_STATE_FOLDER"], "attendance_status.lock")
+    )
+
+
+def run_status_job(app, lock=None, today=None):
+    """
+    Compute the statuses of the last days if this process is the leader.
+
+    Args:
+        app (Flask): The Flask application
+        lock (LeaderLock): Lock to elect the leader, as for ``run_retention``
+        today (date): Reference date, defaults to today
+
+    Returns:
+        dict: Statistics of ``update_statuses``, or None if another process
+        is the leader
+    """
+    owns_lock = lock is None
+    if owns_lock:
+        lock = _leader_lock(app)
+
+    if not lock.acquire():
+        logger.info("Attendance status job skipped, another process is the leader")
+        return None
+
+    try:
+        today = today or datetime.now().date()
+        stats = update_statuses(
+            today - timedelta(days=app.config["ATTENDANCE_STATUS_LOOKBACK_DAYS"]),
+            today - timedelta(days=1),
+            app.config["WORK_START_TIME"],
+            today,
+            app.config["ATTENDANCE_UTC_OFFSET"],
+        )
+        logger.info(
+            f"Attendance status job checked {stats['days']} days, changed "
+            f"{stats['late_or_present']} statuses and added "
+            f"{stats['absent']} absences"
+        )
+
+        # Statuses are written without signals, so reload the dashboard now
+        counters = getattr(app, "dashboard_counters", None)
+        if counters is not None and (stats["late_or_present"] or stats["absent"]):
+            counters.reconcile()
+        return stats
+    finally:
+        if owns_lock:
+            lock.release()
+
+
+def status_thread_function(app):
+    """
+    Run the attendance status job once a day.
+
+    As with the retention cleanup, every process runs this thread but only
+    the lock holder does the work, and the others retry every
+    ``ATTENDANCE_STATUS_INTERVAL`` seconds.
+    """
+    lock = _leader_lock(app)
+    last_day = None
+
+    while True:
+        with app.app_context():
+            try:
+                today = datetime.now().date()
+                if last_day != today and run_status_job(app, lock, today):
+                    last_day = today
+            except Exception as e:
+                logger.error(f"Error in attendance status job: {e}")
+            finally:
+                db.session.remove()
+        time.sleep(app.config["ATTENDANCE_STATUS_INTERVAL"])
+
+
+def init_status_job(app):
+    """
+    Start the attendance status job of an application.
+
+    Args:
+        app (Flask): The Flask application
+    """
+    if not app.config["ATTENDANCE_STATUS_JOB_ENABLED"]:
+        return
+
+    thread = threading.Thread(target=status_thread_function, args=(app,), daemon=True)
+    thread.start()
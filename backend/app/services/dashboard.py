@@ -0,0 +1,372 @@
+"""
+In-memory dashboard counters.
+
+Today's per-station numbers (personnel, timed in, timed out, late, absent and
+pending approvals) are loaded from the database at startup and then kept up
+to date from the attendance and personnel signals, so reading them never
+touches the database. The nightly status job only marks days that have
+ended, so for today a time in after ``WORK_START_TIME`` counts as late, and
+once work has started personnel without a time in or time out count as
+absent. Writes that send no signal in this process, such as
+those of other workers, of the nightly status job or of ``manage.py``, still
+bump the change counters, so a background thread reloads the counters soon
+after the change counter version moves, and at least every
+``DASHBOARD_RECONCILE_INTERVAL`` seconds to correct any drift.
+"""
+
+import time
+import threading
+from datetime import datetime
+
+from sqlalchemy import select, func
+
+from ..models import db, Attendance, AttendanceStatus, PendingAttendance, Personnel
+from ..models.change import ChangeCounter, TRACKED_TABLES
+from ..signals import (
+    attendance_recorded,
+    pending_created,
+    pending_resolved,
+    personnel_changed,
+)
+from ..utils.logger import setup_logger
+from .attendance_status import late_after
+
+# Set up logger
+logger = setup_logger("dashboard")
+
+COUNTERS = ("personnel", "timed_in", "timed_out", "late", "absent", "pending")
+
+
+def _personnel_state(attendance, start=None):
+    """
+    Get the counters a personnel's attendance record contributes to.
+
+    Args:
+        attendance: Attendance record, or a row with the same columns
+        start (datetime): UTC start of work of the record's day, if known
+    """
+    late = attendance.status == AttendanceStatus.LATE
+    if start is not None and attendance.time_in is not None:
+        late = attendance.time_in > start
+    return {
+        "timed_in": attendance.time_in is not None and attendance.time_out is None,
+        "timed_out": attendance.time_out is not None,
+        "late": late,
+        "absent": attendance.status == AttendanceStatus.ABSENT,
+    }
+
+
+class DashboardCounters:
+    """
+    Per-station counters for the current day.
+
+    Personnel and pending counts are totals. The other counters only cover
+    today's attendance and start over when the day changes. Without a
+    ``work_start`` late and absent only come from the records' statuses.
+    """
+
+    def __init__(self, work_start=None, utc_offset=0):
+        """
+        Initialize empty counters.
+
+        Args:
+            work_start (str): Local start of work as ``HH:MM``
+            utc_offset (float): Hours local time is ahead of UTC
+        """
+        self.work_start = work_start
+        self.utc_offset = utc_offset
+        self._lock = threading.Lock()
+        self._day = None
+        self._stations = {}
+        self._states = {}
+        self._reconciled_at = None
+        self._version = None
+        self._corrections = 0
+
+    def snapshot(self, station_id=None):
+        """
+        Get the current counters.
+
+        Args:
+            station_id (int): Only include this station
+
+        Returns:
+            dict: Counters by station and their totals
+        """
+        with self._lock:
+            self._roll_over()
+            stations = {
+                key: dict(counters)
+                for key, counters in self._stations.items()
+                if station_id is None or key == station_id
+            }
+            reconciled_at = self._reconciled_at
+            day = self._day
+
+        if station_id is not None and station_id not in stations:
+            stations[station_id] = dict.fromkeys(COUNTERS, 0)
+
+        start = self._start(day)
+        started = start is not None and datetime.utcnow() >= start
+        for counters in stations.values():
+            punched = counters["timed_in"] + counters["timed_out"]
+            if started:
+                # Nobody is marked absent before the day has ended
+                counters["absent"] = max(0, counters["personnel"] - punched)
+            counters["not_recorded"] = max(
+                0, counters["personnel"] - punched - counters["absent"]
+            )
+
+        totals = {
+            name: sum(counters[name] for counters in stations.values())
+            for name in COUNTERS + ("not_recorded",)
+        }
+        return {
+            "date": day.isoformat(),
+            "stations": stations,
+            "totals": totals,
+            "reconciled_at": reconciled_at,
+        }
+
+    def record_attendance(self, personnel_id, station_id, day, attendance):
+        """Apply a personnel's current attendance record for a day."""
+        with self._lock:
+            self._roll_over()
+            if day != self._day:
+                return
+            self._set_state(
+                personnel_id, station_id, _personnel_state(attendance, self._start(day))
+            )
+
+    def add_pending(self, station_id, delta):
+        """Change a station's pending approvals."""
+        with self._lock:
+            counters = self._station(station_id)
+            counters["pending"] = max(0, counters["pending"] + delta)
+
+    def change_personnel(
+        self, station_id=None, previous_station_id=None, personnel_id=None
+    ):
+        """Move a personnel between stations, or add or remove one."""
+        with self._lock:
+            if previous_station_id is not None:
+                counters = self._station(previous_station_id)
+                counters["personnel"] = max(0, counters["personnel"] - 1)
+            if station_id is not None:
+                self._station(station_id)["personnel"] += 1
+
+            state = self._states.pop(personnel_id, None)
+            if state:
+                old_station_id, flags = state
+                self._apply(old_station_id, flags, -1)
+                if station_id is not None:
+                    self._states[personnel_id] = (station_id, flags)
+                    self._apply(station_id, flags, 1)
+
+    def reconcile(self):
+        """
+        Reload the counters from the database.
+
+        Returns:
+            int: Number of counters that had drifted
+        """
+        # Read first, so writes made while reloading trigger another reload
+        version, _ = ChangeCounter.current(TRACKED_TABLES)
+        today = datetime.now().date()
+        start = self._start(today)
+        stations = {}
+        states = {}
+
+        def station(key):
+            return stations.setdefault(key, dict.fromkeys(COUNTERS, 0))
+
+        for station_id, count in db.session.execute(
+            select(Personnel.station_id, func.count()).group_by(Personnel.station_id)
+        ):
+            station(station_id)["personnel"] = count
+
+        for station_id, count in db.session.execute(
+            select(Personnel.station_id, func.count())
+            .select_from(PendingAttendance)
+            .join(Personnel, Personnel.id == PendingAttendance.personnel_id)
+            .group_by(Personnel.station_id)
+        ):
+            station(station_id)["pending"] = count
+
+        for row in db.session.execute(
+            select(
+                Attendance.personnel_id,
+                Personnel.station_id,
+                Attendance.time_in,
+                Attendance.time_out,
+                Attendance.status,
+            )
+            .join(Personnel, Personnel.id == Attendance.personnel_id)
+            .where(Attendance.date == today)
+        ):
+            flags = _personnel_state(row, start)
+            states[row.personnel_id] = (row.station_id, flags)
+            for name, value in flags.items():
+                if value:
+                    station(row.station_id)[name] += 1
+
+        with self._lock:
+            corrections = 0
+            if self._day == today:
+                for key in set(stations) | set(self._stations):
+                    old = self._stations.get(key, {})
+                    new = stations.get(key, {})
+                    corrections += sum(
+                        old.get(name, 0) != new.get(name, 0) for name in COUNTERS
+                    )
+            self._day = today
+            self._stations = stations
+            self._states = states
+            self._reconciled_at = datetime.utcnow().isoformat()
+            self._version = version
+            self._corrections += corrections
+
+        if corrections:
+            logger.info(f"Corrected {corrections} dashboard counters")
+        return corrections
+
+    def is_stale(self):
+        """
+        Check if the tracked tables changed since the last reload.
+
+        Returns:
+            bool: True if the change counter version moved
+        """
+        version, _ = ChangeCounter.current(TRACKED_TABLES)
+        with self._lock:
+            return version != self._version
+
+    def _roll_over(self):
+        """Start today's counters over when the day has changed."""
+        today = datetime.now().date()
+        if self._day == today:
+            return
+        self._day = today
+        self._states = {}
+        for counters in self._stations.values():
+            for name in ("timed_in", "timed_out", "late", "absent"):
+                counters[name] = 0
+
+    def _start(self, day):
+        """Get the UTC start of work of a day, or None without a work start."""
+        if self.work_start is None:
+            return None
+        return late_after(day, self.work_start, self.utc_offset)
+
+    def _station(self, station_id):
+        """Get a station's counters, creating them if needed."""
+        return self._stations.setdefault(station_id, dict.fromkeys(COUNTERS, 0))
+
+    def _apply(self, station_id, flags, sign):
+        """Add or remove a personnel's contribution to a station."""
+        counters = self._station(station_id)
+        for name, value in flags.items():
+            if value:
+                counters[name] = max(0, counters[name] + sign)
+
+    def _set_state(self, personnel_id, station_id, flags):
+        """Replace a personnel's contribution to today's counters."""
+        previous = self._states.get(personnel_id)
+        if previous:
+            self._apply(previous[0], previous[1], -1)
+        self._states[personnel_id] = (station_id, flags)
+        self._apply(station_id, flags, 1)
+
+
+def reconcile_thread_function(app):
+    """
+    Reload the dashboard counters when the database changed.
+
+    The change counters are checked every ``DASHBOARD_CHANGE_CHECK_INTERVAL``
+    seconds, and the counters are reloaded if they moved or if the last reload
+    is ``DASHBOARD_RECONCILE_INTERVAL`` seconds old.
+    """
+    reconciled = time.monotonic()
+    while True:
+        time.sleep(app.config["DASHBOARD_CHANGE_CHECK_INTERVAL"])
+        with app.app_context():
+            try:
+                due = (
+                    time.monotonic() - reconciled
+                    >= app.config["DASHBOARD_RECONCILE_INTERVAL"]
+                )
+                if due or app.dashboard_counters.is_stale():
+                    app.dashboard_counters.reconcile()
+                    reconciled = time.monotonic()
+            except Exception as e:
+                logger.error(f"Error reconciling dashboard counters: {e}")
+            finally:
+                db.session.remove()
+
+
+def init_dashboard_counters(app):
+    """
+    Create the application's dashboard counters.
+
+    The counters are loaded from the database, connected to the signals and,
+    if ``DASHBOARD_RECONCILE_ENABLED``, reconciled periodically by a
+    background thread. Must be called after the tables have been created.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        DashboardCounters: The counters
+    """
+    counters = DashboardCounters(
+        app.config["WORK_START_TIME"], app.config["ATTENDANCE_UTC_OFFSET"]
+    )
+    app.dashboard_counters = counters
+
+    with app.app_context():
+        try:
+            counters.reconcile()
+        except Exception as e:
+            logger.error(f"Error loading dashboard counters: {e}")
+
+    def on_attendance(
+        sender, personnel_id=None, station_id=None, date=None, attendance=None, **kwargs
+    ):
+        if attendance is not None:
+            counters.record_attendance(personnel_id, station_id, date, attendance)
+
+    def on_pending_created(sender, station_id=None, **kwargs):
+        counters.add_pending(station_id, 1)
+
+    def on_pending_resolved(sender, station_id=None, **kwargs):
+        # Approved records arrive through attendance_recorded
+        counters.add_pending(station_id, -1)
+
+    def on_personnel(
+        sender, personnel_id=None, station_id=None, previous_station_id=None, **kwargs
+    ):
+        counters.change_personnel(station_id, previous_station_id, personnel_id)
+
+    # Receivers are kept alive by the application
+    app.dashboard_receivers = (
+        on_attendance,
+        on_pending_created,
+        on_pending_resolved,
+        on_personnel,
+    )
+    attendance_recorded.connect(on_attendance, sender=app)
+    pending_created.connect(on_pending_created, sender=app)
+    pending_resolved.connect(on_pending_resolved, sender=app)
+    personnel_changed.connect(on_personnel, sender=app)
+
+    if not app.config["DASHBOARD_RECONCILE_ENABLED"]:
+        return counters
+
+    thread = threading.Thread(
+        target=reconcile_thread_function,
+        args=(app,),
+        name="dashboard-reconcile",
+        daemon=True,
+    )
+    thread.start()
+    return counters
@@ -0,0 +1,392 @@
+"""
+Server-sent events for live dashboards.
+
+Attendance punches, new pending attendance and approvals are published to
+the channel of their station and to the ``all`` channel read by admins. Each
+channel keeps its latest events in a bounded ring buffer so a client that
+reconnects with ``Last-Event-ID`` receives what it missed.
+
+The API may run as several processes, so events are not published straight
+to the process's broker. They are stored in the ``live_event`` table, and
+every process publishes the stored events in ID order: right away for its
+own writes, and every ``EVENTS_POLL_INTERVAL`` seconds for those of the
+other processes. Event IDs are the row IDs, so they mean the same in every
+process. Each open stream holds a worker thread for up to
+``EVENTS_MAX_STREAM_DURATION`` seconds, so the processes need a thread per
+connected dashboard on top of those serving requests.
+"""
+
+import json
+import time
+import threading
+from collections import deque, namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, delete, func
+
+from ..config import json_default
+from ..models import db, LiveEvent
+from ..signals import attendance_recorded, pending_created, pending_resolved
+from ..utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("events")
+
+ALL_CHANNEL = "all"
+
+Event = namedtuple("Event", ["id", "type", "data"])
+
+
+class EventBroker:
+    """
+    Publishes events to per-station channels with a replay buffer.
+
+    Event IDs increase across all channels, so an ID identifies a position
+    in every channel's buffer.
+    """
+
+    def __init__(self, buffer_size=1000, last_id=0):
+        """
+        Initialize a new EventBroker.
+
+        Args:
+            buffer_size (int): Events kept per channel for replay
+            last_id (int): ID of the last event published before this broker
+        """
+        self.buffer_size = buffer_size
+        self._channels = {}
+        self._evicted = {}
+        self._first_id = last_id
+        self._last_id = last_id
+        self._condition = threading.Condition()
+
+    @property
+    def last_id(self):
+        """ID of the latest published event."""
+        with self._condition:
+            return self._last_id
+
+    def publish(self, event_type, station_id, data, event_id=None):
+        """
+        Publish an event to a station's channel and the ``all`` channel.
+
+        Args:
+            event_type (str): Event name
+            station_id (int): Station the event belongs to
+            data (dict): Event payload
+            event_id (int): ID of the event, the next one if not given. Must
+                be greater than the last ID.
+
+        Returns:
+            int: The event ID
+        """
+        with self._condition:
+            self._last_id = event_id if event_id is not None else self._last_id + 1
+            event = Event(self._last_id, event_type, data)
+            for channel in (station_id, ALL_CHANNEL):
+                buffer = self._buffer(channel)
+                if len(buffer) == self.buffer_size:
+                    self._evicted[channel] = buffer[0].id
+                buffer.append(event)
+            self._condition.notify_all()
+        return event.id
+
+    def events_after(self, channel, last_id):
+        """
+        Get the buffered events of a channel after an event ID.
+
+        Args:
+            channel (int | str): Station ID or ``ALL_CHANNEL``
+            last_id (int): ID of the last event the client received
+
+        Returns:
+            tuple: ``(events, complete)``, where ``complete`` is False if
+            events after ``last_id`` have already left the buffer
+        """
+        with self._condition:
+            return self._events_after(channel, last_id)
+
+    def wait(self, channel, last_id, timeout):
+        """
+        Wait for events after an event ID.
+
+        Args:
+            channel (int | str): Station ID or ``ALL_CHANNEL``
+            last_id (int): ID of the last event the client received
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            tuple: ``(events, complete)`` as returned by ``events_after``
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events, complete = self._events_after(channel, last_id)
+                remaining = deadline - time.monotonic()
+                if events or not complete or remaining <= 0:
+                    return events, complete
+                self._condition.wait(remaining)
+
+    def _buffer(self, channel):
+        """Get a channel's ring buffer, creating it if needed."""
+        if channel not in self._channels:
+            self._channels[channel] = deque(maxlen=self.buffer_size)
+        return self._channels[channel]
+
+    def _events_after(self, channel, last_id):
+        """Get buffered events after ``last_id``. Must hold the lock."""
+        buffer = self._channels.get(channel, ())
+        events = [event for event in reversed(buffer) if event.id > last_id]
+        events.reverse()
+
+        # Events were lost if one after ``last_id`` has left the buffer, or
+        # was published before this broker started
+        complete = max(self._evicted.get(channel, 0), self._first_id) <= last_id
+        return events, complete
+
+
+class EventFeed:
+    """
+    Shares events between processes through the ``live_event`` table.
+
+    IDs are taken when a row is inserted but become visible when it is
+    committed, so a gap in the IDs may be an event still being committed.
+    Publishing stops at a gap until it is filled, or until it has been there
+    for ``gap_timeout`` seconds and the insert is taken as rolled back.
+    """
+
+    def __init__(self, broker, gap_timeout=5.0, batch_size=500):
+        """
+        Initialize a new EventFeed.
+
+        Args:
+            broker (EventBroker): Broker of this process
+            gap_timeout (float): Seconds to wait for a missing ID
+            batch_size (int): Maximum events read per poll
+        """
+        self.broker = broker
+        self.gap_timeout = gap_timeout
+        self.batch_size = batch_size
+        self._gap_since = None
+        self._lock = threading.Lock()
+
+    def record(self, event_type, station_id, data):
+        """
+        Store an event for every process and publish the new events.
+
+        Uses its own connection, so the session of the caller is left alone.
+
+        Args:
+            event_type (str): Event name
+            station_id (int): Station the event belongs to
+            data (dict): Event payload
+        """
+        with db.engine.begin() as connection:
+            connection.execute(
+                insert(LiveEvent.__table__).values(
+                    station_id=station_id,
+                    event_type=event_type,
+                    data=json.dumps(data, default=json_default, separators=(",", ":")),
+                    date_created=datetime.utcnow(),
+                )
+            )
+        self.poll()
+
+    def poll(self):
+        """
+        Publish the stored events this process has not published yet.
+
+        Returns:
+            int: Number of events published
+        """
+        table = LiveEvent.__table__
+        with self._lock:
+            last_id = self.broker.last_id
+            with db.engine.connect() as connection:
+                rows = connection.execute(
+                    select(
+                        table.c.id, table.c.station_id, table.c.event_type, table.c.data
+                    )
+                    .where(table.c.id > last_id)
+                    .order_by(table.c.id)
+                    .limit(self.batch_size)
+                ).all()
+
+            published = 0
+            for row in rows:
+                if row.id != last_id + 1 and not self._gap_expired():
+                    break
+                self._gap_since = None
+                data = json.loads(row.data)
+                self.broker.publish(
+                    row.event_type, row.station_id, data, event_id=row.id
+                )
+                last_id = row.id
+                published += 1
+            return published
+
+    def prune(self, max_age):
+        """
+        Delete stored events older than ``max_age`` seconds.
+
+        Returns:
+            int: Number of events deleted
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+        with db.engine.begin() as connection:
+            result = connection.execute(
+                delete(LiveEvent.__table__).where(
+                    LiveEvent.__table__.c.date_created < cutoff
+                )
+            )
+        return result.rowcount
+
+    def _gap_expired(self):
+        """Check if the current gap in the IDs has been there long enough."""
+        now = time.monotonic()
+        if self._gap_since is None:
+            self._gap_since = now
+        return now - self._gap_since >= self.gap_timeout
+
+
+def format_event(event):
+    """Encode an event in the text/event-stream format."""
+    data = json.dumps(event.data, default=json_default, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+def stream_events(broker, channel, last_id, heartbeat, max_duration):
+    """
+    Generate the event stream of a channel.
+
+    A ``reset`` event is sent first if the client missed events that are no
+    longer buffered, telling it to reload its data. Comments are sent as
+    heartbeats, and the stream ends after ``max_duration`` seconds so the
+    client reconnects and its token is checked again.
+
+    Args:
+        broker (EventBroker): Broker to read from
+        channel (int | str): Station ID or ``ALL_CHANNEL``
+        last_id (int): ``Last-Event-ID`` sent by the client, or None
+        heartbeat (float): Seconds between heartbeats
+        max_duration (float): Seconds before the stream is closed
+
+    Yields:
+        str: Event stream chunks
+    """
+    yield "retry: 3000\n\n"
+
+    if last_id is None:
+        # New clients only receive events published from now on
+        last_id = broker.last_id
+    elif last_id > broker.last_id:
+        # The ID is from before a restart, nothing can be replayed
+        last_id = broker.last_id
+        yield format_event(Event(last_id, "reset", {}))
+
+    deadline = time.monotonic() + max_duration
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+
+        events, complete = broker.wait(channel, last_id, min(heartbeat, remaining))
+        if not complete:
+            last_id = broker.last_id
+            yield format_event(Event(last_id, "reset", {}))
+        elif events:
+            yield "".join(format_event(event) for event in events)
+            last_id = events[-1].id
+        else:
+            yield ": heartbeat\n\n"
+
+
+def event_poll_thread_function(app):
+    """
+    Publish the events stored by other processes, and drop old ones.
+
+    The table is read every ``EVENTS_POLL_INTERVAL`` seconds, and events
+    older than ``EVENTS_RETENTION`` seconds are deleted about as often as
+    they expire.
+    """
+    retention = app.config["EVENTS_RETENTION"]
+    pruned = time.monotonic()
+    while True:
+        time.sleep(app.config["EVENTS_POLL_INTERVAL"])
+        with app.app_context():
+            try:
+                app.event_feed.poll()
+                if time.monotonic() - pruned >= retention:
+                    app.event_feed.prune(retention)
+                    pruned = time.monotonic()
+            except Exception as e:
+                logger.error(f"Error polling live events: {e}")
+            finally:
+                db.session.remove()
+
+
+def init_event_broker(app):
+    """
+    Create the application's event broker and publish the attendance signals.
+
+    Events are stored for the other processes and, if
+    ``EVENTS_POLL_ENABLED``, a background thread publishes theirs. Must be
+    called after the tables have been created.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        EventBroker: The broker
+    """
+    with app.app_context():
+        # Events from before this process started cannot be replayed
+        last_id = db.session.execute(select(func.max(LiveEvent.id))).scalar()
+        db.session.remove()
+
+    broker = EventBroker(app.config["EVENTS_BUFFER_SIZE"], last_id=last_id or 0)
+    feed = EventFeed(broker)
+    app.event_broker = broker
+    app.event_feed = feed
+
+    def on_attendance(sender, station_id=None, attendance=None, **kwargs):
+        feed.record("attendance", station_id, attendance.to_dict())
+
+    def on_pending_created(sender, station_id=None, pending=None, **kwargs):
+        feed.record("pending_created", station_id, pending.to_dict())
+
+    def on_pending_resolved(
+        sender,
+        personnel_id=None,
+        station_id=None,
+        pending_id=None,
+        approved=False,
+        attendance=None,
+        **kwargs,
+    ):
+        feed.record(
+            "pending_approved" if approved else "pending_rejected",
+            station_id,
+            {
+                "pending_id": pending_id,
+                "personnel_id": personnel_id,
+                "attendance": attendance.to_dict() if attendance else None,
+            },
+        )
+
+    # Receivers are kept alive by the application
+    app.event_receivers = (on_attendance, on_pending_created, on_pending_resolved)
+    attendance_recorded.connect(on_attendance, sender=app)
+    pending_created.connect(on_pending_created, sender=app)
+    pending_resolved.connect(on_pending_resolved, sender=app)
+
+    if app.config["EVENTS_POLL_ENABLED"]:
+        thread = threading.Thread(
+            target=event_poll_thread_function,
+            args=(app,),
+            name="event-poll",
+            daemon=True,
+        )
+        thread.start()
+    return broker
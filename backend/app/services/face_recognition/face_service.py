@@ -9,12 +9,13 @@ import numpy as np
 import json
 import logging
 import base64
+import binascii
 from datetime import datetime, timedelta
 import uuid
 from flask import current_app
 from sqlalchemy import or_
 
-from ...models import Personnel, FaceData, Attendance, AttendanceStatus, User
+from ...models import db, Personnel, FaceData, Attendance, AttendanceStatus, User
 from ...utils.logger import setup_logger
 
 # Set up logger
@@ -102,22 +103,82 @@ def process_base64_image(base64_image):
 
 def register_face(personnel_id, base64_images):
     """Register face images for a personnel."""
-    # Placeholder - will be implemented with face registration logic
     logger.info(
         f"Registering {len(base64_images)} face images for personnel {personnel_id}"
     )
-    return {"success": True, "message": "Face registration processed"}
+
+    try:
+        images = [decode_base64_image(image) for image in base64_images]
+    except (ValueError, binascii.Error) as e:
+        logger.error(f"Invalid face image data: {e}")
+        return {"success": False, "error": "Invalid image data"}
+
+    store = current_app.image_stores["faces"]
+    filenames = []
+
+    for data in images:
+        try:
+            filename = store.put(data)
+        except ValueError as e:
+            db.session.rollback()
+            logger.error(f"Invalid face image data: {e}")
+            return {"success": False, "error": "Invalid image data"}
+        if filename in filenames:
+            continue
+        filenames.append(filename)
+
+        # Embedding extraction is still a placeholder, see extract_face_embeddings
+        db.session.add(FaceData(personnel_id=personnel_id, filename=filename))
+
+    db.session.commit()
+
+    return {
+        "success": True,
+        "message": "Face registration processed",
+        "files": filenames,
+    }
+
+
+def decode_base64_image(base64_image):
+    """Decode a base64 image, with or without a data URL prefix."""
+    if base64_image.startswith("data:") and "," in base64_image:
+        base64_image = base64_image.split(",", 1)[1]
+    return base64.b64decode(base64_image, validate=True)
 
 
 def save_attendance_image(personnel_id, base64_image, prefix):
-    """Save an attendance image to disk."""
-    # Placeholder - will be implemented with image saving logic
-    logger.info(f"Saving attendance image for personnel {personnel_id}")
-    return f"attendance_images_temp/placeholder_{personnel_id}_{prefix}.jpg"
+    """
+    Save an attendance image to disk.
+
+    Images go to the attendance image store, which names them by content and
+    date and hands them to the application's image writer. The returned path
+    is final but the file may appear on disk slightly later.
+
+    Returns:
+        str: Path of the image relative to the data directory, or None if the
+        data is not an image
+    """
+    logger.info(f"Saving {prefix} image for personnel {personnel_id}")
+
+    try:
+        data = decode_base64_image(base64_image)
+        return current_app.image_stores["attendance"].put(data)
+    except (ValueError, binascii.Error) as e:
+        logger.error(f"Invalid attendance image data: {e}")
+        return None
+
+
+def cleanup_old_attendance_images(lock=None):
+    """
+    Clean up old attendance images.
+
+    Args:
+        lock (LeaderLock): Leader lock held by the calling process, if any
 
+    Returns:
+        bool: True if this process ran the cleanup
+    """
+    from ..retention import run_retention
 
-def cleanup_old_attendance_images():
-    """Clean up old attendance images."""
-    # Placeholder - will be implemented with cleanup logic
     logger.info("Cleaning up old attendance images")
-    return True
+    return run_retention(current_app, lock) is not None
@@ -0,0 +1,265 @@
+"""
+Content-addressed, date-sharded image storage.
+
+Images are stored as ``<root>/<YYYY>/<MM>/<DD>/<hh>/<digest><ext>`` where
+``digest`` is the SHA-256 of the uploaded data and ``hh`` its first two hex
+characters. Keeping each directory small keeps directory operations fast as
+the number of images grows.
+
+Naming an image only hashes the upload, so the path is returned right away
+and decoding and re-encoding happen on the image writer's threads. Each file
+is written once from its upload and never changes, so its name identifies
+its content. Uploads that are not in a known image format are rejected up
+front; one that passes that check but fails to decode is logged by the
+writer and its path resolves to no file. Deduplication is limited to the
+same day on purpose: retention deletes whole day partitions, which must not
+hold files referenced by records of later days.
+
+Paths stored in the database (``Attendance.time_in_image``,
+``PendingAttendance.image_path``, ``FaceData.filename``) are relative to the
+data directory and start with the store's folder name, e.g.
+``attendance_images_temp/2024/05/01/3f/3fa9....jpg``. Older flat paths such as
+``attendance_images_temp/manual_time_in_1_....jpg`` resolve the same way.
+"""
+
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+
+from .image_writer import ImageWriter
+
+DIGEST_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+# Leading bytes of the image formats OpenCV decodes
+IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff",  # JPEG
+    b"\x89PNG\r\n\x1a\n",  # PNG
+    b"BM",  # BMP
+    b"II*\x00",  # TIFF, little endian
+    b"MM\x00*",  # TIFF, big endian
+)
+
+
+def content_digest(data):
+    """
+    Get the hex SHA-256 digest naming an upload.
+
+    Args:
+        data (bytes | numpy.ndarray): Image bytes or decoded frame
+
+    Returns:
+        str: Digest of the bytes, or of the frame's shape and pixels
+
+    Raises:
+        ValueError: If bytes are not in a known image format
+    """
+    if isinstance(data, (bytes, bytearray)):
+        is_webp = data[:4] == b"RIFF" and data[8:12] == b"WEBP"
+        if not (is_webp or data.startswith(IMAGE_SIGNATURES)):
+            raise ValueError("Data is not in a known image format")
+        return hashlib.sha256(data).hexdigest()
+
+    digest = hashlib.sha256(f"{data.shape}{data.dtype}".encode())
+    digest.update(data.tobytes())
+    return digest.hexdigest()
+
+
+class ImageStore:
+    """Content-addressed image store rooted at one folder."""
+
+    def __init__(self, root, writer=None):
+        """
+        Initialize a new ImageStore.
+
+        Args:
+            root (str): Absolute path of the store's folder
+            writer (ImageWriter): Writer used to persist images. If omitted,
+                images are written synchronously.
+        """
+        self.root = os.path.abspath(root)
+        self.name = os.path.basename(os.path.normpath(root))
+        self.writer = writer if writer is not None else ImageWriter(workers=0)
+
+    def relative_path(self, digest, day, ext=".jpg"):
+        """
+        Build the path of an image relative to the store's root.
+
+        Args:
+            digest (str): Hex SHA-256 digest of the uploaded image
+            day (date): Date partition of the image
+            ext (str): File extension, including the dot
+
+        Returns:
+            str: Relative path using forward slashes
+        """
+        return f"{day:%Y/%m/%d}/{digest[:2]}/{digest}{ext}"
+
+    def stored_path(self, relative_path):
+        """Get the path saved in the database for a relative path."""
+        return f"{self.name}/{relative_path}"
+
+    def absolute_path(self, relative_path):
+        """Get the absolute path on disk for a relative path."""
+        return os.path.join(self.root, *relative_path.split("/"))
+
+    def put(self, data, day=None, ext=".jpg"):
+        """
+        Store an image, reusing an identical image stored on the same day.
+
+        Args:
+            data (bytes | numpy.ndarray): Image bytes or decoded frame
+            day (date): Date partition, defaults to today
+            ext (str): File extension, including the dot
+
+        Returns:
+            str: Path to save in the database
+
+        Raises:
+            ValueError: If the bytes are not in a known image format
+        """
+        digest = content_digest(data)
+        relative_path = self.relative_path(digest, day or datetime.now().date(), ext)
+        path = self.absolute_path(relative_path)
+
+        if not self.contains(path):
+            self.writer.submit(path, data)
+
+        return self.stored_path(relative_path)
+
+    def contains(self, path):
+        """Check if an absolute path is on disk or waiting to be written."""
+        return os.path.exists(path) or self.writer.pending_frame(path) is not None
+
+
+class ImageStoreRegistry:
+    """Maps stored image paths to the store that owns them."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._stores = {}
+
+    def register(self, key, store):
+        """Register a store under a key such as ``"attendance"``."""
+        self._stores[key] = store
+
+    def __getitem__(self, key):
+        """Get a store by key."""
+        return self._stores[key]
+
+    def __iter__(self):
+        """Iterate over the registered stores."""
+        return iter(self._stores.values())
+
+    def resolve(self, stored_path):
+        """
+        Resolve a path saved in the database to an absolute path on disk.
+
+        Args:
+            stored_path (str): Path such as ``attendance_images_temp/...``
+
+        Returns:
+            str: Absolute path, or None if the path does not belong to a store
+            or tries to escape it
+        """
+        if not stored_path:
+            return None
+
+        name, _, relative_path = stored_path.replace("\\", "/").partition("/")
+        for store in self._stores.values():
+            if store.name != name:
+                continue
+
+            path = os.path.normpath(store.absolute_path(relative_path))
+            if os.path.commonpath([path, store.root]) != store.root:
+                return None
+            return path
+
+        return None
+
+
+class ContentETags:
+    """
+    Strong ETags derived from image content.
+
+    Content-addressed images are written once and never change, so the
+    digest in their file name identifies their bytes. Other images are
+    hashed once and remembered by path, size and modification time.
+    """
+
+    def __init__(self, max_entries=4096):
+        """
+        Initialize a new ContentETags cache.
+
+        Args:
+            max_entries (int): Number of hashed files to remember
+        """
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """
+        Get the ETag of a file.
+
+        Args:
+            path (str): Absolute path of the file
+
+        Returns:
+            str: Hex SHA-256 digest identifying the file content
+        """
+        stem = os.path.basename(path).partition(".")[0]
+        if DIGEST_NAME.match(stem) and os.path.basename(path) == f"{stem}.jpg":
+            return stem
+
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        etag = digest.hexdigest()
+
+        with self._lock:
+            self._cache[key] = etag
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return etag
+
+
+def init_image_stores(app):
+    """
+    Create the image stores for the application's image folders.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        ImageStoreRegistry: The registry of stores
+    """
+    writer = getattr(app, "image_writer", None)
+
+    stores = ImageStoreRegistry()
+    stores.register(
+        "attendance", ImageStore(app.config["TEMP_ATTENDANCE_FOLDER"], writer)
+    )
+    stores.register("faces", ImageStore(app.config["UPLOAD_FOLDER"], writer))
+    stores.register("annotations", ImageStore(app.config["ANNOTATIONS_FOLDER"], writer))
+
+    app.image_stores = stores
+    app.image_etags = ContentETags()
+    return stores
+
+
+def resolve_image_path(stored_path):
+    """Resolve a stored image path using the current application's stores."""
+    return current_app.image_stores.resolve(stored_path)
@@ -0,0 +1,263 @@
+"""
+Background writer for attendance images.
+
+Decoding, JPEG re-encoding, disk writes and thumbnail generation for
+captured frames run on a small pool of worker threads fed by a bounded queue.
+The request that captured a frame only pays for queueing it.
+"""
+
+import os
+import queue
+import atexit
+import threading
+
+from ..utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("image_writer")
+
+FSYNC_POLICIES = ("never", "always")
+
+
+class ImageWriter:
+    """
+    Bounded thread pool that encodes and persists image frames.
+
+    A frame is either the raw bytes of an uploaded image or an already decoded
+    ``numpy`` frame. Both are re-encoded as JPEG at the configured quality
+    before being written atomically to their final path.
+    """
+
+    def __init__(self, workers=2, queue_size=64, jpeg_quality=85, fsync="never"):
+        """
+        Initialize a new ImageWriter.
+
+        Args:
+            workers (int): Number of writer threads. ``0`` writes synchronously.
+            queue_size (int): Maximum number of frames waiting to be written
+            jpeg_quality (int): JPEG quality used when re-encoding frames
+            fsync (str): Either ``"never"`` or ``"always"``
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+
+        self.workers = workers
+        self.jpeg_quality = jpeg_quality
+        self.fsync = fsync
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._closed = False
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "failed": 0,
+            "sync_writes": 0,
+            "max_queue_depth": 0,
+        }
+
+    def start(self):
+        """Start the writer threads."""
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"image-writer-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def add_listener(self, listener):
+        """
+        Register a callable run on the writer thread after each image is written.
+
+        Args:
+            listener (callable): Called as ``listener(path, frame)`` with the
+                decoded frame
+        """
+        self._listeners.append(listener)
+
+    def submit(self, path, frame):
+        """
+        Queue a frame to be written to ``path``.
+
+        If the queue is full the frame is written on the calling thread, so a
+        burst of captures slows down instead of dropping images.
+
+        Args:
+            path (str): Absolute destination path
+            frame (bytes | numpy.ndarray): Image bytes or decoded frame
+
+        Returns:
+            str: The destination path
+        """
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._pending[path] = frame
+
+        if self._closed or not self._threads:
+            self._write_and_record(path, frame, sync=True)
+            return path
+
+        try:
+            self._queue.put_nowait((path, frame))
+        except queue.Full:
+            self._write_and_record(path, frame, sync=True)
+            return path
+
+        with self._lock:
+            depth = self._queue.qsize()
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+
+        return path
+
+    def pending_frame(self, path):
+        """
+        Get a frame that has been submitted but not written yet.
+
+        Args:
+            path (str): Absolute destination path
+
+        Returns:
+            bytes | numpy.ndarray | None: The frame, if it is still queued
+        """
+        with self._lock:
+            return self._pending.get(path)
+
+    def flush(self):
+        """Block until every queued frame has been written."""
+        if self._threads:
+            self._queue.join()
+
+    def shutdown(self):
+        """Flush outstanding frames and stop the writer threads."""
+        if self._closed:
+            return
+
+        self._closed = True
+        self.flush()
+
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def metrics(self):
+        """
+        Get queue and throughput metrics.
+
+        Returns:
+            dict: Current queue depth and cumulative counters
+        """
+        with self._lock:
+            result = dict(self._stats)
+            result["in_flight"] = len(self._pending)
+        result["queue_depth"] = self._queue.qsize()
+        result["queue_capacity"] = self._queue.maxsize
+        result["workers"] = len(self._threads)
+        return result
+
+    def _run(self):
+        """Worker loop."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write_and_record(*item)
+            finally:
+                self._queue.task_done()
+
+    def _write_and_record(self, path, frame, sync=False):
+        """Write a frame and update the counters."""
+        try:
+            self._write(path, frame)
+            failed = False
+        except Exception as e:
+            logger.error(f"Error writing image {path}: {e}")
+            failed = True
+
+        with self._lock:
+            self._pending.pop(path, None)
+            self._stats["failed" if failed else "written"] += 1
+            if sync:
+                self._stats["sync_writes"] += 1
+
+    def _write(self, path, frame):
+        """Encode a frame and write it atomically."""
+        frame = self._decode(frame)
+        data = self._encode(frame)
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            if self.fsync == "always":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+        if self.fsync == "always" and hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+        for listener in self._listeners:
+            try:
+                listener(path, frame)
+            except Exception as e:
+                logger.error(f"Error in image writer listener for {path}: {e}")
+
+    def _decode(self, frame):
+        """Decode image bytes into a frame."""
+        # Imported here so the writer can be constructed without OpenCV
+        import cv2
+        import numpy as np
+
+        if not isinstance(frame, (bytes, bytearray)):
+            return frame
+
+        decoded = cv2.imdecode(np.frombuffer(frame, np.uint8), cv2.IMREAD_COLOR)
+        if decoded is None:
+            raise ValueError("Could not decode image data")
+        return decoded
+
+    def _encode(self, frame):
+        """Re-encode a frame as JPEG at the configured quality."""
+        import cv2
+
+        ok, encoded = cv2.imencode(
+            ".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
+        )
+        if not ok:
+            raise ValueError("Could not encode image")
+        return encoded.tobytes()
+
+
+def init_image_writer(app):
+    """
+    Create the application's image writer and register it for shutdown.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        ImageWriter: The started writer
+    """
+    writer = ImageWriter(
+        workers=app.config["ATTENDANCE_IMAGE_WRITER_WORKERS"],
+        queue_size=app.config["ATTENDANCE_IMAGE_WRITER_QUEUE_SIZE"],
+        jpeg_quality=app.config["ATTENDANCE_IMAGE_JPEG_QUALITY"],
+        fsync=app.config["ATTENDANCE_IMAGE_FSYNC"],
+    )
+    writer.start()
+    atexit.register(writer.shutdown)
+    app.image_writer = writer
+    return writer
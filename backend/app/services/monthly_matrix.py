@@ -0,0 +1,204 @@
+"""
+Monthly attendance matrix of a station.
+
+The matrix has one row per personnel and one column per day of the month,
+holding a status code and the hours worked, followed by per personnel and
+per day totals. The month's attendance is read with one query returning only
+the needed columns. Each column is converted to a NumPy array in one pass,
+and the arrays are placed into the matrix and summed up with vectorized
+operations.
+
+Matrices are cached per station and month together with the change counter
+version they were built from (see ``app.models.change``). A cached matrix is
+used as long as no personnel or attendance record of the station has been
+written since.
+"""
+
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+from sqlalchemy import select
+
+from ..models import db, AttendanceStatus, Personnel
+from ..models.change import ChangeCounter
+from .archive import attendance_source
+
+# Tables a matrix is built from
+MATRIX_TABLES = ("personnel", "attendance")
+
+# Cell codes, 0 meaning no record
+STATUS_CODES = {
+    AttendanceStatus.PRESENT: 1,
+    AttendanceStatus.LATE: 2,
+    AttendanceStatus.ABSENT: 3,
+}
+CODE_LABELS = np.array(["", "P", "L", "A"])
+
+
+def build_monthly_matrix(station_id, year, month):
+    """
+    Build the attendance matrix of a station for a month.
+
+    Args:
+        station_id (int): Station account ID
+        year (int): Year
+        month (int): Month, 1 to 12
+
+    Returns:
+        dict: ``days``, one entry per personnel in ``rows`` with its
+        ``statuses`` (``P``, ``L``, ``A`` or empty), ``hours`` and totals,
+        and the per day ``totals``
+    """
+    days = calendar.monthrange(year, month)[1]
+    first_day = date(year, month, 1)
+    last_day = date(year, month, days)
+
+    personnel = db.session.execute(
+        select(Personnel.id, Personnel.rank, Personnel.first_name, Personnel.last_name)
+        .where(Personnel.station_id == station_id)
+        .order_by(Personnel.last_name, Personnel.first_name, Personnel.id)
+    ).all()
+    attendance = attendance_source(first_day, last_day)
+    records = db.session.execute(
+        select(
+            attendance.personnel_id,
+            attendance.date,
+            attendance.status,
+            attendance.time_in,
+            attendance.time_out,
+        )
+        .join(Personnel, Personnel.id == attendance.personnel_id)
+        .where(
+            Personnel.station_id == station_id,
+            attendance.date.between(first_day, last_day),
+        )
+    ).all()
+
+    personnel_ids = np.array([row.id for row in personnel], dtype=np.int64)
+    by_id = np.argsort(personnel_ids)
+    codes = np.zeros((len(personnel), days), dtype=np.int8)
+    hours = np.full((len(personnel), days), np.nan)
+
+    if records:
+        count = len(records)
+        personnel_column, dates, statuses, times_in, times_out = zip(*records)
+        # NumPy's own conversion of date objects is much slower than these
+        rows = by_id[
+            np.searchsorted(
+                personnel_ids[by_id], np.fromiter(personnel_column, np.int64, count)
+            )
+        ]
+        columns = np.fromiter((day.day - 1 for day in dates), np.int64, count)
+        codes[rows, columns] = np.fromiter(
+            (STATUS_CODES.get(status, 0) for status in statuses), np.int8, count
+        )
+        # Records without both times have no hours
+        seconds = np.fromiter(
+            (
+                (time_out - time_in).total_seconds() if time_in and time_out else np.nan
+                for time_in, time_out in zip(times_in, times_out)
+            ),
+            np.float64,
+            count,
+        )
+        hours[rows, columns] = seconds / 3600
+
+    counts = {
+        name: np.count_nonzero(codes == code, axis=1)
+        for name, code in (("present", 1), ("late", 2), ("absent", 3))
+    }
+    total_hours = np.round(np.nansum(hours, axis=1), 2)
+    labels = CODE_LABELS[codes].tolist()
+    # JSON has no NaN, days without hours are null
+    cell_hours = np.where(np.isnan(hours), None, np.round(hours, 2)).tolist()
+
+    rows = [
+        {
+            "personnel_id": person.id,
+            "full_name": f"{person.rank} {person.first_name} {person.last_name}",
+            "statuses": labels[index],
+            "hours": cell_hours[index],
+            "present": int(counts["present"][index]),
+            "late": int(counts["late"][index]),
+            "absent": int(counts["absent"][index]),
+            "hours_total": float(total_hours[index]),
+        }
+        for index, person in enumerate(personnel)
+    ]
+
+    return {
+        "station_id": station_id,
+        "year": year,
+        "month": month,
+        "days": list(range(1, days + 1)),
+        "rows": rows,
+        "totals": {
+            "present": np.count_nonzero(codes == 1, axis=0).tolist(),
+            "late": np.count_nonzero(codes == 2, axis=0).tolist(),
+            "absent": np.count_nonzero(codes == 3, axis=0).tolist(),
+            "hours": np.round(np.nansum(hours, axis=0), 2).tolist(),
+        },
+    }
+
+
+class MonthlyMatrixCache:
+    """Least recently used cache of monthly matrices."""
+
+    def __init__(self, max_entries=64):
+        """
+        Initialize a new MonthlyMatrixCache.
+
+        Args:
+            max_entries (int): Number of matrices to keep
+        """
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, station_id, year, month):
+        """
+        Get the matrix of a station and month, building it if it changed.
+
+        Args:
+            station_id (int): Station account ID
+            year (int): Year
+            month (int): Month, 1 to 12
+
+        Returns:
+            dict: The matrix, see ``build_monthly_matrix``
+        """
+        key = (station_id, year, month)
+        version = ChangeCounter.current(MATRIX_TABLES, station_id)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == version:
+                self._cache.move_to_end(key)
+                return cached[1]
+
+        matrix = build_monthly_matrix(station_id, year, month)
+
+        with self._lock:
+            self._cache[key] = (version, matrix)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return matrix
+
+
+def init_monthly_matrix_cache(app):
+    """
+    Create the application's monthly matrix cache.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        MonthlyMatrixCache: The cache
+    """
+    app.monthly_matrix_cache = MonthlyMatrixCache(
+        app.config["MONTHLY_MATRIX_CACHE_SIZE"]
+    )
+    return app.monthly_matrix_cache
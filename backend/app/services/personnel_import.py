@@ -0,0 +1,245 @@
+"""
+Bulk import of personnel rosters.
+
+Rows are matched to existing personnel by their station and name, compared
+case-insensitively. Every row is validated before anything is written, and
+an import with invalid rows changes nothing. Otherwise new personnel are
+inserted with one statement, changed ones updated with another and a single
+summary entry is added to the activity log, all in one transaction.
+"""
+
+import csv
+import io
+
+from sqlalchemy import select, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from flask import current_app
+
+from ..models import db, ActivityLog, Personnel, User
+from ..models.change import touch
+from ..signals import personnel_changed
+from ..utils.errors import AppError, ErrorCode
+from .activity_logger import activity_entry
+
+# Longest value of each text column
+MAX_LENGTHS = {"first_name": 100, "last_name": 100, "rank": 100}
+
+
+def parse_csv(text):
+    """
+    Parse a CSV roster with a header row.
+
+    Header names are matched case-insensitively, with spaces read as
+    underscores, so ``First Name`` maps to ``first_name``.
+
+    Args:
+        text (str): CSV content
+
+    Returns:
+        list: One dictionary per data row
+    """
+    reader = csv.reader(io.StringIO(text.lstrip("﻿")))
+    header = next(reader, None)
+    if not header:
+        return []
+
+    columns = [name.strip().lower().replace(" ", "_") for name in header]
+    return [
+        dict(zip(columns, values))
+        for values in reader
+        if any(value.strip() for value in values)
+    ]
+
+
+def _natural_key(station_id, first_name, last_name):
+    """Key matching a row to an existing personnel."""
+    return station_id, first_name.casefold(), last_name.casefold()
+
+
+def _clean(row, default_station_id):
+    """
+    Validate one import row.
+
+    Returns:
+        tuple: ``(values, errors)``
+    """
+    if not isinstance(row, dict):
+        return None, ["Row must be an object"]
+
+    values, errors = {}, []
+    for field, max_length in MAX_LENGTHS.items():
+        value = row.get(field)
+        value = value.strip() if isinstance(value, str) else ""
+        if not value:
+            errors.append(f"Missing {field}")
+        elif len(value) > max_length:
+            errors.append(f"{field} is longer than {max_length} characters")
+        values[field] = value
+
+    station_id = row.get("station_id")
+    if station_id in (None, ""):
+        station_id = default_station_id
+    try:
+        values["station_id"] = int(station_id)
+    except (TypeError, ValueError):
+        errors.append("Invalid station_id")
+    return values, errors
+
+
+def _add_created_ids(creates):
+    """Read back the IDs of inserted personnel by their natural key."""
+    stations = {values["station_id"] for _, values in creates}
+    rows = db.session.execute(
+        select(
+            Personnel.id,
+            Personnel.first_name,
+            Personnel.last_name,
+            Personnel.station_id,
+        ).where(Personnel.station_id.in_(stations))
+    )
+    ids = {
+        _natural_key(row.station_id, row.first_name, row.last_name): row.id
+        for row in rows
+    }
+    for entry, values in creates:
+        key = _natural_key(
+            values["station_id"], values["first_name"], values["last_name"]
+        )
+        entry["personnel_id"] = ids.get(key)
+
+
+def import_personnel(rows, user, dry_run=False, default_station_id=None):
+    """
+    Create and update personnel from a roster.
+
+    Args:
+        rows (list): Row dictionaries with ``first_name``, ``last_name``,
+            ``rank`` and ``station_id``
+        user (Identity): User importing the roster. Stations may only import
+            their own personnel.
+        dry_run (bool): Report the changes without writing them
+        default_station_id (int): Station of rows without ``station_id``
+
+    Returns:
+        tuple: ``(applied, report)``. ``applied`` is False if any row was
+        invalid, in which case nothing was written. ``report`` has one entry
+        per row with its ``action`` (``create``, ``update``, ``unchanged`` or
+        ``error``) and the totals.
+
+    Raises:
+        AppError: If the import could not be written
+    """
+    cleaned = [_clean(row, default_station_id) for row in rows]
+    stations = {values["station_id"] for values, errors in cleaned if not errors}
+    known_stations = set(
+        db.session.scalars(select(User.id).where(User.id.in_(stations)))
+    )
+
+    existing = {}
+    for personnel in db.session.execute(
+        select(
+            Personnel.id,
+            Personnel.first_name,
+            Personnel.last_name,
+            Personnel.rank,
+            Personnel.station_id,
+        ).where(Personnel.station_id.in_(known_stations))
+    ):
+        key = _natural_key(
+            personnel.station_id, personnel.first_name, personnel.last_name
+        )
+        existing.setdefault(key, []).append(personnel)
+
+    entries, seen = [], {}
+    creates, updates = [], []
+    for index, (values, errors) in enumerate(cleaned, 1):
+        entry = {"row": index}
+        entries.append(entry)
+
+        if not errors:
+            station_id = values["station_id"]
+            key = _natural_key(station_id, values["first_name"], values["last_name"])
+            if station_id not in known_stations:
+                errors.append(f"Station {station_id} does not exist")
+            elif not user.is_admin and station_id != user.station_id:
+                errors.append("Access denied to this station")
+            elif key in seen:
+                errors.append(f"Same personnel as row {seen[key]}")
+            elif len(existing.get(key, ())) > 1:
+                errors.append("Matches more than one existing personnel")
+            else:
+                seen[key] = index
+
+        if errors:
+            entry.update(action="error", errors=errors)
+            continue
+
+        matches = existing.get(key)
+        if not matches:
+            entry["action"] = "create"
+            creates.append((entry, values))
+            continue
+
+        current = matches[0]
+        entry["personnel_id"] = current.id
+        changes = {
+            field: values[field]
+            for field in MAX_LENGTHS
+            if getattr(current, field) != values[field]
+        }
+        if changes:
+            entry.update(action="update", changes=sorted(changes))
+            updates.append({"id": current.id, **changes})
+        else:
+            entry["action"] = "unchanged"
+
+    report = {
+        "dry_run": dry_run,
+        "created": len(creates),
+        "updated": len(updates),
+        "unchanged": sum(1 for entry in entries if entry["action"] == "unchanged"),
+        "failed": sum(1 for entry in entries if entry["action"] == "error"),
+        "rows": entries,
+    }
+    if report["failed"] or dry_run or not (creates or updates):
+        return not report["failed"], report
+
+    try:
+        if creates:
+            db.session.execute(insert(Personnel), [values for _, values in creates])
+        if updates:
+            db.session.execute(update(Personnel), updates)
+        touch("personnel", stations=stations)
+
+        if creates:
+            _add_created_ids(creates)
+
+        db.session.execute(
+            insert(ActivityLog),
+            [
+                activity_entry(
+                    user.id,
+                    "Import Personnel",
+                    f"Imported {len(rows)} personnel rows: {len(creates)} created, "
+                    f"{len(updates)} updated, {report['unchanged']} unchanged",
+                )
+            ],
+        )
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Database error: {str(e)}")
+        raise AppError(
+            "Database error occurred while importing personnel",
+            ErrorCode.SYSTEM_DATABASE_ERROR,
+        )
+
+    app = current_app._get_current_object()
+    for entry, values in creates:
+        personnel_changed.send(
+            app,
+            personnel_id=entry["personnel_id"],
+            station_id=values["station_id"],
+            previous_station_id=None,
+        )
+    return True, report
@@ -0,0 +1,383 @@
+"""
+Report export.
+
+Report rows are read with a server-side cursor (``yield_per``) and handed to
+a CSV, XLSX or PDF writer one at a time, so memory use does not grow with the
+size of the report. CSV is streamed to the client as it is written. XLSX and
+PDF are spooled to a temporary file first, since both formats are only
+complete once the last row is known, and then streamed from that file.
+
+Excel export needs ``openpyxl`` and PDF export needs ``reportlab``. Both are
+imported only when such a report is requested.
+"""
+
+import io
+import csv
+import enum
+import time
+import uuid
+import tempfile
+import threading
+from datetime import date, datetime
+
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import select, func
+
+from ..models import db
+from ..utils.errors import AppError, ErrorCode
+from ..utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("reports")
+
+# Report format: (extension, mimetype)
+REPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "excel": (
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+    "pdf": ("pdf", "application/pdf"),
+}
+FORMAT_ALIASES = {"xlsx": "excel"}
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+class ReportProgress:
+    """
+    Registry of the progress of report exports in this process.
+
+    Entries are keyed by user and report ID, since clients choose the IDs.
+    Finished entries are kept for ``ttl`` seconds so clients can read the
+    final state, and the oldest entries are dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600):
+        """
+        Initialize a new ReportProgress.
+
+        Args:
+            max_entries (int): Maximum number of entries kept
+            ttl (float): Seconds a finished entry is kept
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def start(self, user_id, report_id, report, report_format, total):
+        """Register a new export, replacing the user's export of the same ID."""
+        with self._lock:
+            self._prune()
+            self._entries.pop((user_id, report_id), None)
+            self._entries[user_id, report_id] = {
+                "report_id": report_id,
+                "user_id": user_id,
+                "report": report,
+                "format": report_format,
+                "status": "running",
+                "rows": 0,
+                "total": total,
+                "started_at": datetime.utcnow(),
+                "finished_at": None,
+                "error": None,
+            }
+
+    def update(self, user_id, report_id, rows):
+        """Record the number of rows written so far."""
+        with self._lock:
+            entry = self._entries.get((user_id, report_id))
+            if entry:
+                entry["rows"] = rows
+
+    def finish(self, user_id, report_id, status="complete", error=None):
+        """Mark an export as finished."""
+        with self._lock:
+            entry = self._entries.get((user_id, report_id))
+            if entry:
+                entry["status"] = status
+                entry["error"] = error
+                entry["finished_at"] = datetime.utcnow()
+                entry["_expires"] = time.monotonic() + self.ttl
+
+    def get(self, user_id, report_id):
+        """
+        Get the progress of one of a user's exports.
+
+        Returns:
+            dict: Progress with a ``percent`` field, or None if unknown
+        """
+        with self._lock:
+            entry = self._entries.get((user_id, report_id))
+            if not entry:
+                return None
+            result = {k: v for k, v in entry.items() if not k.startswith("_")}
+
+        total = result["total"]
+        result["percent"] = (
+            round(100.0 * result["rows"] / total, 1) if total else 100.0
+        )
+        if result["status"] == "running":
+            result["percent"] = min(result["percent"], 99.9)
+        return result
+
+    def _prune(self):
+        """Drop expired entries and the oldest ones beyond ``max_entries``."""
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if entry.get("_expires", now + 1) < now:
+                del self._entries[key]
+
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+
+def get_report_format(value):
+    """
+    Normalize a requested report format.
+
+    Args:
+        value (str): ``csv``, ``excel`` (or ``xlsx``) or ``pdf``
+
+    Returns:
+        str: The format name
+
+    Raises:
+        AppError: If the format is not supported
+    """
+    report_format = (value or "csv").lower()
+    report_format = FORMAT_ALIASES.get(report_format, report_format)
+    if report_format not in REPORT_FORMATS:
+        raise AppError(
+            "Invalid format. Use csv, excel or pdf.",
+            ErrorCode.SYSTEM_VALIDATION_ERROR,
+        )
+    return report_format
+
+
+def _text(value):
+    """Format a value for CSV and PDF output."""
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return str(value)
+
+
+def _cell(value):
+    """Format a value for an Excel cell, keeping dates and numbers native."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return value
+
+
+def write_csv(title, columns, rows):
+    """
+    Write rows as CSV.
+
+    Yields:
+        bytes: Encoded CSV, a buffer of rows at a time
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Byte order mark so Excel detects UTF-8
+    buffer.write("﻿")
+    writer.writerow(columns)
+
+    for index, row in enumerate(rows, 1):
+        writer.writerow([_text(value) for value in row])
+        if index % 500 == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def write_excel(title, columns, rows):
+    """
+    Write rows as an XLSX workbook in write-only mode.
+
+    Yields:
+        bytes: The workbook file, in chunks
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title[:31])
+    sheet.append(columns)
+    for row in rows:
+        sheet.append([_cell(value) for value in row])
+
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        yield from _read_chunks(f)
+
+
+def write_pdf(title, columns, rows):
+    """
+    Write rows as a PDF table, one page at a time.
+
+    Yields:
+        bytes: The PDF file, in chunks
+    """
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+
+    font, size, leading, margin = "Helvetica", 8, 12, 36
+    width, height = landscape(A4)
+    column_width = (width - 2 * margin) / len(columns)
+
+    def fit(text):
+        """Truncate text to the column width."""
+        limit = column_width - 4
+        if stringWidth(text, font, size) <= limit:
+            return text
+        while text and stringWidth(text + "...", font, size) > limit:
+            text = text[:-1]
+        return text + "..."
+
+    with tempfile.TemporaryFile() as f:
+        pdf = canvas.Canvas(f, pagesize=(width, height))
+        pdf.setTitle(title)
+        page = 0
+
+        def start_page():
+            """Draw the title and column headers of a new page."""
+            nonlocal page
+            page += 1
+            pdf.setFont("Helvetica-Bold", 12)
+            pdf.drawString(margin, height - margin, title)
+            pdf.setFont(font, size)
+            pdf.drawRightString(width - margin, height - margin, f"Page {page}")
+            pdf.setFont("Helvetica-Bold", size)
+            y = height - margin - 2 * leading
+            for index, column in enumerate(columns):
+                pdf.drawString(margin + index * column_width, y, fit(column))
+            pdf.line(margin, y - 3, width - margin, y - 3)
+            pdf.setFont(font, size)
+            return y - leading
+
+        y = start_page()
+        for row in rows:
+            if y < margin:
+                pdf.showPage()
+                y = start_page()
+            for index, value in enumerate(row):
+                pdf.drawString(margin + index * column_width, y, fit(_text(value)))
+            y -= leading
+
+        pdf.save()
+        yield from _read_chunks(f)
+
+
+WRITERS = {"csv": write_csv, "excel": write_excel, "pdf": write_pdf}
+
+
+def _read_chunks(f):
+    """Read a file from the start in chunks."""
+    f.seek(0)
+    while True:
+        data = f.read(FILE_CHUNK_SIZE)
+        if not data:
+            return
+        yield data
+
+
+def _check_writer(report_format):
+    """Fail early if the writer's optional dependency is missing."""
+    module = {"excel": "openpyxl", "pdf": "reportlab"}.get(report_format)
+    if not module:
+        return
+    try:
+        __import__(module)
+    except ImportError:
+        raise AppError(
+            f"{report_format.upper()} export requires the {module} package",
+            ErrorCode.SYSTEM_VALIDATION_ERROR,
+        )
+
+
+def export_report(
+    name, title, columns, statement, report_format, user_id, report_id=None
+):
+    """
+    Stream a report built from a select statement.
+
+    Args:
+        name (str): Report name, used in the file name
+        title (str): Title shown in the document
+        columns (list): Column headers, one per selected column
+        statement (Select): Statement selecting the report rows
+        report_format (str): ``csv``, ``excel`` or ``pdf``
+        user_id (int): User requesting the report
+        report_id (str): ID to report progress under, generated if not given
+
+    Returns:
+        Response: Streaming download with the report ID in ``X-Report-Id``
+    """
+    _check_writer(report_format)
+    extension, mimetype = REPORT_FORMATS[report_format]
+    report_id = report_id or uuid.uuid4().hex
+    chunk_size = current_app.config["STREAM_CHUNK_SIZE"]
+    progress = current_app.report_progress
+
+    total = db.session.execute(
+        select(func.count()).select_from(statement.order_by(None).subquery())
+    ).scalar()
+    progress.start(user_id, report_id, name, report_format, total)
+
+    def rows():
+        """Read the report rows, recording progress."""
+        result = db.session.execute(statement.execution_options(yield_per=chunk_size))
+        count = 0
+        for row in result:
+            yield row
+            count += 1
+            if count % chunk_size == 0:
+                progress.update(user_id, report_id, count)
+        progress.update(user_id, report_id, count)
+
+    def generate():
+        status, error = "complete", None
+        try:
+            yield from WRITERS[report_format](title, columns, rows())
+        except GeneratorExit:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Error generating {name} report {report_id}: {e}")
+            status, error = "failed", str(e)
+            raise
+        finally:
+            progress.finish(user_id, report_id, status, error)
+
+    filename = f"{name}_report_{datetime.now().date().isoformat()}.{extension}"
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["X-Report-Id"] = report_id
+    return response
+
+
+def init_report_progress(app):
+    """
+    Create the application's report progress registry.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        ReportProgress: The registry
+    """
+    app.report_progress = ReportProgress()
+    return app.report_progress
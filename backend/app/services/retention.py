@@ -0,0 +1,412 @@
+"""
+Retention cleanup for attendance images.
+
+Images older than ``ATTENDANCE_IMAGE_RETENTION_DAYS`` are removed one date
+partition at a time (see ``image_store``), while older flat files left from
+before the store existed are scanned with ``os.scandir`` in rate-limited
+batches. Only one process runs the cleanup: the one holding the leader lock.
+Progress is saved to a state file so each run only touches partitions it has
+not finished yet, and images still referenced by pending attendance records
+are kept until they are approved or rejected.
+"""
+
+import os
+import json
+import time
+import shutil
+from datetime import date, datetime, timedelta
+
+from ..models import db, PendingAttendance
+from ..utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("retention")
+
+
+class LeaderLock:
+    """Non-blocking, process-wide exclusive lock on a file."""
+
+    def __init__(self, path):
+        """
+        Initialize a new LeaderLock.
+
+        Args:
+            path (str): Path of the lock file
+        """
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self):
+        """Check if this process holds the lock."""
+        return self._file is not None
+
+    def acquire(self):
+        """
+        Try to acquire the lock without waiting.
+
+        Returns:
+            bool: True if this process holds the lock
+        """
+        if self._file is not None:
+            return True
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        lock_file = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._file = lock_file
+        return True
+
+    def release(self):
+        """Release the lock if it is held."""
+        if self._file is None:
+            return
+
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class RetentionState:
+    """Progress of the retention cleanup, persisted as JSON."""
+
+    def __init__(self, path):
+        """
+        Load the state from ``path``, or start fresh if it does not exist.
+
+        Args:
+            path (str): Path of the state file
+        """
+        self.path = path
+        self.completed_before = None
+        self.revisit = []
+        self.legacy_scanned = False
+        self.legacy_retained = []
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if data.get("completed_before"):
+            self.completed_before = date.fromisoformat(data["completed_before"])
+        self.revisit = data.get("revisit", [])
+        self.legacy_scanned = data.get("legacy_scanned", False)
+        self.legacy_retained = data.get("legacy_retained", [])
+
+    def save(self):
+        """Write the state atomically."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(
+                {
+                    "completed_before": (
+                        self.completed_before.isoformat()
+                        if self.completed_before
+                        else None
+                    ),
+                    "revisit": self.revisit,
+                    "legacy_scanned": self.legacy_scanned,
+                    "legacy_retained": self.legacy_retained,
+                },
+                f,
+            )
+        os.replace(temp_path, self.path)
+
+
+class RetentionEngine:
+    """Deletes expired images from one image store."""
+
+    def __init__(
+        self, store, retention_days, state_path, batch_size=500, batch_pause=0.5
+    ):
+        """
+        Initialize a new RetentionEngine.
+
+        Args:
+            store (ImageStore): Store to clean up
+            retention_days (int): Number of days to keep images
+            state_path (str): Path of the state file
+            batch_size (int): Files deleted before pausing
+            batch_pause (float): Seconds to pause between batches
+        """
+        self.store = store
+        self.retention_days = retention_days
+        self.state_path = state_path
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._deleted_in_batch = 0
+
+    def run(self, protected_paths, today=None):
+        """
+        Delete images older than the retention period.
+
+        Args:
+            protected_paths (set): Stored paths that must be kept
+            today (date): Reference date, defaults to today
+
+        Returns:
+            dict: Number of partitions and files deleted, and files kept
+        """
+        cutoff = (today or datetime.now().date()) - timedelta(
+            days=self.retention_days
+        )
+        state = RetentionState(self.state_path)
+        protected = self._group_protected(protected_paths)
+        stats = {"partitions": 0, "files": 0, "kept": 0}
+
+        # Partitions kept last time are revisited, the rest only once
+        revisit = {date.fromisoformat(day) for day in state.revisit}
+        retained = []
+        for day, path in self._partitions():
+            if day >= cutoff:
+                continue
+            if (
+                state.completed_before
+                and day < state.completed_before
+                and day not in revisit
+            ):
+                continue
+
+            kept = self._clean_partition(path, protected.get(day, set()), stats)
+            if kept:
+                retained.append(day.isoformat())
+
+        state.completed_before = cutoff
+        state.revisit = sorted(retained)
+        state.save()
+
+        cutoff_timestamp = datetime.combine(cutoff, datetime.min.time()).timestamp()
+        if state.legacy_scanned:
+            names = state.legacy_retained
+        else:
+            names = None
+        state.legacy_retained = self._clean_legacy(
+            names, protected.get(None, set()), cutoff_timestamp, stats
+        )
+        state.legacy_scanned = True
+        state.save()
+
+        logger.info(
+            f"Retention cleanup of {self.store.name} removed "
+            f"{stats['partitions']} partitions and {stats['files']} files, "
+            f"kept {stats['kept']} pending images"
+        )
+        return stats
+
+    def _group_protected(self, protected_paths):
+        """Group protected stored paths by partition date (None for legacy)."""
+        grouped = {}
+        prefix = f"{self.store.name}/"
+
+        for stored_path in protected_paths:
+            stored_path = stored_path.replace("\\", "/")
+            if not stored_path.startswith(prefix):
+                continue
+
+            parts = stored_path[len(prefix) :].split("/")
+            if len(parts) == 1:
+                grouped.setdefault(None, set()).add(parts[0])
+                continue
+
+            try:
+                day = date(int(parts[0]), int(parts[1]), int(parts[2]))
+            except (ValueError, IndexError):
+                continue
+            path = self.store.absolute_path("/".join(parts))
+            grouped.setdefault(day, set()).add(self._stem(path))
+
+        return grouped
+
+    def _partitions(self):
+        """Yield ``(date, path)`` for every date partition in the store."""
+        for year in self._subdirectories(self.store.root):
+            for month in self._subdirectories(year.path):
+                for day in self._subdirectories(month.path):
+                    try:
+                        partition = date(int(year.name), int(month.name), int(day.name))
+                    except ValueError:
+                        continue
+                    yield partition, day.path
+
+    @staticmethod
+    def _subdirectories(path):
+        """List numeric subdirectories of ``path`` in name order."""
+        try:
+            with os.scandir(path) as entries:
+                found = [
+                    entry
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False) and entry.name.isdigit()
+                ]
+        except FileNotFoundError:
+            return []
+        return sorted(found, key=lambda entry: entry.name)
+
+    def _clean_partition(self, path, protected, stats):
+        """
+        Delete a date partition, keeping protected files if there are any.
+
+        Returns:
+            bool: True if some files were kept
+        """
+        if not protected:
+            shutil.rmtree(path, ignore_errors=True)
+            stats["partitions"] += 1
+            self._pause()
+            return False
+
+        kept = False
+        for root, _, files in os.walk(path):
+            for name in files:
+                file_path = os.path.join(root, name)
+                # Derivatives such as thumbnails share the original's digest
+                if self._stem(file_path) in protected:
+                    kept = True
+                    stats["kept"] += 1
+                    continue
+                self._delete(file_path, stats)
+        return kept
+
+    @staticmethod
+    def _stem(path):
+        """Strip every extension from the file name of ``path``."""
+        directory, name = os.path.split(path)
+        return os.path.join(directory, name.partition(".")[0])
+
+    def _clean_legacy(self, names, protected, cutoff_timestamp, stats):
+        """
+        Delete expired files stored directly in the store's root folder.
+
+        Args:
+            names (list): File names to check, or None to scan the folder
+            protected (set): File names that must be kept
+            cutoff_timestamp (float): Files modified before this are expired
+            stats (dict): Counters to update
+
+        Returns:
+            list: Names of files that were kept, to check again next run
+        """
+        retained = []
+
+        if names is None:
+            try:
+                entries = os.scandir(self.store.root)
+            except FileNotFoundError:
+                return retained
+            with entries:
+                candidates = [
+                    (entry.name, entry.path)
+                    for entry in entries
+                    if not entry.name.startswith(".")
+                    and entry.is_file(follow_symlinks=False)
+                ]
+        else:
+            candidates = [
+                (name, os.path.join(self.store.root, name)) for name in names
+            ]
+
+        for name, path in candidates:
+            try:
+                if os.stat(path).st_mtime >= cutoff_timestamp:
+                    retained.append(name)
+                    continue
+            except FileNotFoundError:
+                continue
+
+            if name in protected:
+                retained.append(name)
+                stats["kept"] += 1
+                continue
+            self._delete(path, stats)
+
+        return retained
+
+    def _delete(self, path, stats):
+        """Delete a file, pausing after every batch."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.error(f"Error deleting {path}: {e}")
+            return
+
+        stats["files"] += 1
+        self._deleted_in_batch += 1
+        if self._deleted_in_batch >= self.batch_size:
+            self._pause()
+
+    def _pause(self):
+        """Pause between batches to bound the I/O load."""
+        self._deleted_in_batch = 0
+        if self.batch_pause:
+            time.sleep(self.batch_pause)
+
+
+def pending_image_paths():
+    """Get the image paths referenced by pending attendance records."""
+    rows = db.session.query(PendingAttendance.image_path).all()
+    return {row.image_path for row in rows if row.image_path}
+
+
+def run_retention(app, lock=None):
+    """
+    Run the retention cleanup if this process is the leader.
+
+    Args:
+        app (Flask): The Flask application
+        lock (LeaderLock): Lock to elect the leader. A long-running process
+            passes its own lock and keeps it, so it stays the leader; without
+            one, a lock is taken for this run only.
+
+    Returns:
+        dict: Cleanup statistics, or None if another process is the leader
+    """
+    state_folder = app.config["RETENTION_STATE_FOLDER"]
+    owns_lock = lock is None
+    if owns_lock:
+        lock = LeaderLock(os.path.join(state_folder, "retention.lock"))
+
+    if not lock.acquire():
+        logger.info("Retention cleanup skipped, another process is the leader")
+        return None
+
+    try:
+        store = app.image_stores["attendance"]
+        engine = RetentionEngine(
+            store,
+            app.config["ATTENDANCE_IMAGE_RETENTION_DAYS"],
+            os.path.join(state_folder, f"retention_{store.name}.json"),
+            batch_size=app.config["RETENTION_BATCH_SIZE"],
+            batch_pause=app.config["RETENTION_BATCH_PAUSE"],
+        )
+        return engine.run(pending_image_paths())
+    finally:
+        if owns_lock:
+            lock.release()
@@ -0,0 +1,214 @@
+"""
+Revoked JWT storage.
+
+Logged out tokens are kept until they expire, so they can be rejected by the
+``token_in_blocklist_loader`` on every request. Two stores are available: an
+in-process one for single-process deployments and tests, and a SQLite file
+shared by every worker process on the host.
+"""
+
+import os
+import abc
+import time
+import heapq
+import sqlite3
+import threading
+
+from ..utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("revocation")
+
+REVOCATION_STORES = ("memory", "sqlite")
+
+
+class RevocationStore(abc.ABC):
+    """Interface of the revoked token stores."""
+
+    @abc.abstractmethod
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token until it expires.
+
+        Args:
+            jti (str): Token ID
+            expires_at (float): Token expiry as a UNIX timestamp
+        """
+
+    @abc.abstractmethod
+    def is_revoked(self, jti):
+        """
+        Check if a token has been revoked.
+
+        Args:
+            jti (str): Token ID
+
+        Returns:
+            bool: True if the token was revoked and has not expired yet
+        """
+
+
+class MemoryRevocationStore(RevocationStore):
+    """
+    In-process store that forgets tokens once they expire.
+
+    Tokens are grouped in buckets of ``bucket_seconds`` by expiry. Whole
+    buckets are dropped once their time has passed, so expiring entries
+    needs no per-token timer or scan.
+    """
+
+    def __init__(self, bucket_seconds=60):
+        """
+        Initialize a new MemoryRevocationStore.
+
+        Args:
+            bucket_seconds (int): Width of the expiry buckets
+        """
+        self.bucket_seconds = bucket_seconds
+        self._revoked = set()
+        self._buckets = {}
+        self._bucket_heap = []
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, expires_at):
+        """Revoke a token until it expires."""
+        # Round up so a token is never forgotten before it expires
+        bucket = int(expires_at // self.bucket_seconds) + 1
+
+        with self._lock:
+            self._expire(time.time())
+            if bucket not in self._buckets:
+                self._buckets[bucket] = set()
+                heapq.heappush(self._bucket_heap, bucket)
+            self._buckets[bucket].add(jti)
+            self._revoked.add(jti)
+
+    def is_revoked(self, jti):
+        """Check if a token has been revoked."""
+        with self._lock:
+            self._expire(time.time())
+            return jti in self._revoked
+
+    def __len__(self):
+        with self._lock:
+            return len(self._revoked)
+
+    def _expire(self, now):
+        """Drop the buckets whose tokens have all expired."""
+        current = int(now // self.bucket_seconds)
+        while self._bucket_heap and self._bucket_heap[0] <= current:
+            bucket = heapq.heappop(self._bucket_heap)
+            self._revoked.difference_update(self._buckets.pop(bucket))
+
+
+class SQLiteRevocationStore(RevocationStore):
+    """
+    Store kept in a local SQLite file shared by every worker process.
+
+    Lookups use the primary key. Expired tokens are purged at most once per
+    ``purge_interval`` seconds, by the process revoking a token.
+    """
+
+    def __init__(self, path, purge_interval=300):
+        """
+        Initialize a new SQLiteRevocationStore.
+
+        Args:
+            path (str): Path of the SQLite database file
+            purge_interval (float): Minimum seconds between purges
+        """
+        self.path = path
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS revoked_token ("
+            "jti TEXT PRIMARY KEY, expires_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_revoked_token_expires_at "
+            "ON revoked_token (expires_at)"
+        )
+
+    def revoke(self, jti, expires_at):
+        """Revoke a token until it expires."""
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO revoked_token (jti, expires_at) VALUES (?, ?)",
+            (jti, expires_at),
+        )
+
+        now = time.time()
+        if now - self._last_purge >= self.purge_interval:
+            self._last_purge = now
+            connection.execute(
+                "DELETE FROM revoked_token WHERE expires_at <= ?", (now,)
+            )
+
+    def is_revoked(self, jti):
+        """Check if a token has been revoked."""
+        row = (
+            self._connection()
+            .execute(
+                "SELECT 1 FROM revoked_token WHERE jti = ? AND expires_at > ?",
+                (jti, time.time()),
+            )
+            .fetchone()
+        )
+        return row is not None
+
+    def _connection(self):
+        """Get this thread's connection to the database."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Autocommit, so every revocation is visible to other processes
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+def create_revocation_store(app):
+    """
+    Create the revocation store selected by ``JWT_REVOCATION_STORE``.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        RevocationStore: The configured store
+    """
+    store_type = app.config["JWT_REVOCATION_STORE"]
+    if store_type not in REVOCATION_STORES:
+        raise ValueError(f"Unknown revocation store: {store_type}")
+
+    if store_type == "sqlite":
+        return SQLiteRevocationStore(app.config["JWT_REVOCATION_DB"])
+    return MemoryRevocationStore()
+
+
+def init_revocation(app, jwt):
+    """
+    Create the application's revocation store and register the blocklist check.
+
+    Args:
+        app (Flask): The Flask application
+        jwt (JWTManager): The application's JWT manager
+
+    Returns:
+        RevocationStore: The store
+    """
+    store = create_revocation_store(app)
+    app.revocation_store = store
+
+    @jwt.token_in_blocklist_loader
+    def token_in_blocklist(jwt_header, jwt_payload):
+        return store.is_revoked(jwt_payload["jti"])
+
+    return store
@@ -0,0 +1,294 @@
+"""
+Maintenance of the daily attendance summary.
+
+A station's row for a day is recomputed whenever attendance or pending
+attendance of that station and day changes, which only reads that day's
+records of the station. ``rebuild_daily_summary`` recomputes whole date
+ranges for backfills and repairs.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects import mysql, sqlite
+
+from ..models import (
+    db,
+    Attendance,
+    AttendanceStatus,
+    PendingAttendance,
+    Personnel,
+    DailyAttendanceSummary,
+)
+from ..signals import attendance_recorded, pending_created, pending_resolved
+from .archive import attendance_source
+from ..utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("summary")
+
+# Summary column of each attendance status
+STATUS_COLUMNS = {
+    AttendanceStatus.PRESENT: "present",
+    AttendanceStatus.LATE: "late",
+    AttendanceStatus.ABSENT: "absent",
+}
+COUNT_COLUMNS = ("present", "late", "absent", "pending")
+
+
+def compute_summaries(date_from, date_to, station_id=None):
+    """
+    Count attendance and pending attendance per station and day.
+
+    Args:
+        date_from (date): First day
+        date_to (date): Last day
+        station_id (int): Only count this station
+
+    Returns:
+        dict: Counts by ``(station_id, date)``, for days with any record
+    """
+    station_filter = [Personnel.station_id == station_id] if station_id else []
+    summaries = {}
+
+    def counts(key):
+        if key not in summaries:
+            summaries[key] = dict.fromkeys(COUNT_COLUMNS, 0)
+        return summaries[key]
+
+    # Days that were archived are counted from the archive as well
+    source = attendance_source(date_from, date_to)
+    attendance = db.session.execute(
+        select(Personnel.station_id, source.date, source.status, func.count())
+        .join(Personnel, Personnel.id == source.personnel_id)
+        .where(source.date.between(date_from, date_to), *station_filter)
+        .group_by(Personnel.station_id, source.date, source.status)
+    )
+    for row_station_id, day, status, count in attendance:
+        column = STATUS_COLUMNS.get(status)
+        if column:
+            counts((row_station_id, day))[column] += count
+
+    pending = db.session.execute(
+        select(Personnel.station_id, PendingAttendance.date, func.count())
+        .join(Personnel, Personnel.id == PendingAttendance.personnel_id)
+        .where(PendingAttendance.date.between(date_from, date_to), *station_filter)
+        .group_by(Personnel.station_id, PendingAttendance.date)
+    )
+    for row_station_id, day, count in pending:
+        counts((row_station_id, day))["pending"] += count
+
+    return summaries
+
+
+def _summary_row(station_id, day, counts):
+    """Build a summary table row."""
+    return {
+        "station_id": station_id,
+        "date": day,
+        "updated_at": datetime.utcnow(),
+        "date_created": datetime.utcnow(),
+        **counts,
+    }
+
+
+def _upsert(rows):
+    """Insert summary rows, replacing the counts of existing ones."""
+    table = DailyAttendanceSummary.__table__
+    updated = COUNT_COLUMNS + ("updated_at",)
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        statement = mysql.insert(table).values(rows)
+        statement = statement.on_duplicate_key_update(
+            {name: statement.inserted[name] for name in updated}
+        )
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["date", "station_id"],
+            set_={name: statement.excluded[name] for name in updated},
+        )
+    else:
+        for row in rows:
+            summary = DailyAttendanceSummary.query.filter_by(
+                station_id=row["station_id"], date=row["date"]
+            ).first()
+            if summary:
+                for name in updated:
+                    setattr(summary, name, row[name])
+            else:
+                db.session.add(DailyAttendanceSummary(**row))
+        return
+
+    db.session.execute(statement)
+
+
+def refresh_daily_summary(station_id, day, commit=True):
+    """
+    Recompute a station's summary for one day.
+
+    Args:
+        station_id (int): Station account ID
+        day (date): Day to recompute
+        commit (bool): Commit the session afterwards
+    """
+    counts = compute_summaries(day, day, station_id).get(
+        (station_id, day), dict.fromkeys(COUNT_COLUMNS, 0)
+    )
+    _upsert([_summary_row(station_id, day, counts)])
+    if commit:
+        db.session.commit()
+
+
+def refresh_daily_summaries(keys, commit=True):
+    """
+    Recompute the summaries of several station days.
+
+    Each station's days are counted with one query over their date span, and
+    every row is written with a single upsert.
+
+    Args:
+        keys (iterable): ``(station_id, date)`` pairs
+        commit (bool): Commit the session afterwards
+    """
+    by_station = {}
+    for station_id, day in set(keys):
+        by_station.setdefault(station_id, []).append(day)
+    if not by_station:
+        return
+
+    rows = []
+    for station_id, days in sorted(by_station.items()):
+        summaries = compute_summaries(min(days), max(days), station_id)
+        rows.extend(
+            _summary_row(
+                station_id,
+                day,
+                summaries.get((station_id, day), dict.fromkeys(COUNT_COLUMNS, 0)),
+            )
+            for day in sorted(days)
+        )
+    _upsert(rows)
+    if commit:
+        db.session.commit()
+
+
+def rebuild_daily_summary(date_from=None, date_to=None, only_missing=False, batch_days=31):
+    """
+    Recompute the summary of a date range, a batch of days at a time.
+
+    Args:
+        date_from (date): First day, defaults to the oldest record
+        date_to (date): Last day, defaults to the newest record
+        only_missing (bool): Only add rows for station days without one
+        batch_days (int): Days recomputed per transaction
+
+    Returns:
+        int: Number of summary rows written
+    """
+    if date_from is None or date_to is None:
+        bounds = [
+            db.session.execute(select(func.min(column), func.max(column))).one()
+            for column in (Attendance.date, PendingAttendance.date)
+        ]
+        dates_from = [low for low, _ in bounds if low]
+        dates_to = [high for _, high in bounds if high]
+        if not dates_from:
+            return 0
+        date_from = date_from or min(dates_from)
+        date_to = date_to or max(dates_to)
+
+    written = 0
+    start = date_from
+    while start <= date_to:
+        end = min(start + timedelta(days=batch_days - 1), date_to)
+        summaries = compute_summaries(start, end)
+
+        if only_missing:
+            existing = set(
+                db.session.execute(
+                    select(
+                        DailyAttendanceSummary.station_id, DailyAttendanceSummary.date
+                    ).where(DailyAttendanceSummary.date.between(start, end))
+                ).all()
+            )
+            summaries = {
+                key: counts
+                for key, counts in summaries.items()
+                if key not in existing
+            }
+        else:
+            db.session.execute(
+                delete(DailyAttendanceSummary).where(
+                    DailyAttendanceSummary.date.between(start, end)
+                )
+            )
+
+        if summaries:
+            db.session.execute(
+                DailyAttendanceSummary.__table__.insert(),
+                [
+                    _summary_row(station_id, day, counts)
+                    for (station_id, day), counts in summaries.items()
+                ],
+            )
+        db.session.commit()
+
+        written += len(summaries)
+        start = end + timedelta(days=1)
+
+    return written
+
+
+def daily_summary(date_from, date_to, station_id=None):
+    """
+    Read the summary of a date range.
+
+    Args:
+        date_from (date): First day
+        date_to (date): Last day
+        station_id (int): Only return this station
+
+    Returns:
+        list: Summary rows ordered by date and station
+    """
+    query = DailyAttendanceSummary.query.filter(
+        DailyAttendanceSummary.date.between(date_from, date_to)
+    )
+    if station_id:
+        query = query.filter(DailyAttendanceSummary.station_id == station_id)
+    return query.order_by(
+        DailyAttendanceSummary.date, DailyAttendanceSummary.station_id
+    ).all()
+
+
+def _refresh_on_change(
+    app, station_id=None, date=None, summary_refreshed=False, **kwargs
+):
+    """Refresh the summary of the station and day a signal describes."""
+    if summary_refreshed:
+        return
+    try:
+        refresh_daily_summary(station_id, date)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error refreshing summary of station {station_id} on {date}: {e}")
+
+
+def _refresh_on_resolved(app, approved=False, **kwargs):
+    """Refresh the summary of a rejection; approvals also send a record."""
+    if not approved:
+        _refresh_on_change(app, **kwargs)
+
+
+def init_daily_summary(app):
+    """
+    Keep the daily summary of an application up to date.
+
+    Args:
+        app (Flask): The Flask application
+    """
+    for signal in (attendance_recorded, pending_created):
+        signal.connect(_refresh_on_change, sender=app)
+    pending_resolved.connect(_refresh_on_resolved, sender=app)
@@ -0,0 +1,183 @@
+"""
+Thumbnail generation for attendance and profile images.
+
+Thumbnails are stored next to their original as ``<name>.<size>.<format>``,
+e.g. ``3fa9....jpg`` gets ``3fa9....sm.webp``. They are generated by the image
+writer right after an original is written, and generated on first request for
+images saved before thumbnails existed.
+"""
+
+import os
+import threading
+
+from flask import current_app
+
+from ..utils.logger import setup_logger
+
+# Set up logger
+logger = setup_logger("thumbnails")
+
+
+class ThumbnailGenerator:
+    """Creates fixed-size thumbnails of images."""
+
+    def __init__(self, sizes, image_format="webp", quality=80):
+        """
+        Initialize a new ThumbnailGenerator.
+
+        Args:
+            sizes (dict): Maximum edge length in pixels by size name
+            image_format (str): ``"webp"`` or ``"jpeg"``. WebP falls back to
+                JPEG if OpenCV was built without WebP support.
+            quality (int): Encoder quality from 1 to 100
+        """
+        self.sizes = sizes
+        self.image_format = image_format
+        self.quality = quality
+
+    @property
+    def extension(self):
+        """File extension of generated thumbnails, without the dot."""
+        return "webp" if self.image_format == "webp" else "jpg"
+
+    def path_for(self, path, size):
+        """
+        Get the thumbnail path of an image.
+
+        Args:
+            path (str): Absolute path of the original image
+            size (str): Size name
+
+        Returns:
+            str: Absolute path of the thumbnail
+        """
+        directory, name = os.path.split(path)
+        stem = name.partition(".")[0]
+        return os.path.join(directory, f"{stem}.{size}.{self.extension}")
+
+    def generate(self, path, frame=None):
+        """
+        Generate every thumbnail size of an image.
+
+        Args:
+            path (str): Absolute path of the original image
+            frame (numpy.ndarray): Decoded original, read from ``path`` if omitted
+        """
+        if frame is None:
+            frame = self._read(path)
+
+        for size in self.sizes:
+            self._write(self.path_for(path, size), self._resize(frame, size))
+
+    def get(self, path, size):
+        """
+        Get the thumbnail of an image, generating it if it does not exist yet.
+
+        Args:
+            path (str): Absolute path of the original image
+            size (str): Size name
+
+        Returns:
+            str: Absolute path of the thumbnail, or None if the original does
+            not exist
+        """
+        if size not in self.sizes:
+            raise ValueError(f"Unknown thumbnail size: {size}")
+
+        thumbnail_path = self.path_for(path, size)
+        if os.path.exists(thumbnail_path):
+            return thumbnail_path
+
+        if not os.path.exists(path):
+            return None
+
+        return self._write(thumbnail_path, self._resize(self._read(path), size))
+
+    def _read(self, path):
+        """Read an image from disk."""
+        import cv2
+
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError(f"Could not read image {path}")
+        return frame
+
+    def _resize(self, frame, size):
+        """Scale a frame down so its longest edge fits the size."""
+        import cv2
+
+        height, width = frame.shape[:2]
+        scale = self.sizes[size] / max(height, width)
+        if scale >= 1:
+            return frame
+
+        return cv2.resize(
+            frame,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=cv2.INTER_AREA,
+        )
+
+    def _write(self, path, frame):
+        """Encode a thumbnail, write it atomically and return its path."""
+        import cv2
+
+        if self.image_format == "webp":
+            ok, encoded = cv2.imencode(
+                ".webp", frame, [int(cv2.IMWRITE_WEBP_QUALITY), self.quality]
+            )
+            if not ok:
+                logger.warning("WebP encoding unavailable, using JPEG thumbnails")
+                self.image_format = "jpeg"
+                path = f"{path.rsplit('.', 1)[0]}.{self.extension}"
+
+        if self.image_format != "webp":
+            ok, encoded = cv2.imencode(
+                ".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+            )
+            if not ok:
+                raise ValueError("Could not encode thumbnail")
+
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(encoded.tobytes())
+        os.replace(temp_path, path)
+        return path
+
+
+def init_thumbnails(app):
+    """
+    Create the thumbnail generator and generate thumbnails for new images.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        ThumbnailGenerator: The generator
+    """
+    generator = ThumbnailGenerator(
+        app.config["THUMBNAIL_SIZES"],
+        app.config["THUMBNAIL_FORMAT"],
+        app.config["THUMBNAIL_QUALITY"],
+    )
+
+    writer = getattr(app, "image_writer", None)
+    if writer is not None:
+        writer.add_listener(generator.generate)
+
+    app.thumbnails = generator
+    return generator
+
+
+def get_thumbnail(path, size):
+    """
+    Get the thumbnail of an image using the current application's generator.
+
+    Args:
+        path (str): Absolute path of the original image
+        size (str): Size name
+
+    Returns:
+        str: Absolute path of the thumbnail, or None if the original does not
+        exist
+    """
+    return current_app.thumbnails.get(path, size)
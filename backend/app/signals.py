@@ -0,0 +1,33 @@
+"""
+Application signals.
+
+Signals are sent after the change they describe has been committed, with the
+application as sender. Receivers are connected when the application is
+created and must not assume a request context.
+
+Senders that already refreshed the daily summary of the station and day in
+the same transaction pass ``summary_refreshed=True``.
+"""
+
+from blinker import Namespace
+
+signals = Namespace()
+
+# An attendance record was created or updated, e.g. by an approval.
+# Arguments: personnel_id, station_id, date, attendance
+attendance_recorded = signals.signal("attendance-recorded")
+
+# A manual attendance was submitted for approval.
+# Arguments: personnel_id, station_id, date, pending
+pending_created = signals.signal("pending-created")
+
+# A pending attendance was approved or rejected. Approvals are followed by
+# attendance_recorded for the record they wrote.
+# Arguments: personnel_id, station_id, date, pending_id, approved, attendance
+# (None when rejected)
+pending_resolved = signals.signal("pending-resolved")
+
+# A personnel was added, moved to another station or deleted.
+# Arguments: personnel_id, station_id (None when deleted), previous_station_id
+# (None when added)
+personnel_changed = signals.signal("personnel-changed")
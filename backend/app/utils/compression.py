@@ -0,0 +1,279 @@
+"""
+Response compression.
+
+API responses are compressed with brotli or gzip, whichever the client
+prefers among those available, once they reach ``COMPRESS_MIN_SIZE`` bytes.
+Streamed responses are compressed chunk by chunk and flushed after every
+chunk, so they still reach the client as they are produced.
+
+Frontend files are compressed ahead of time into ``.gz`` and ``.br`` files
+next to them (``precompress_directory``) and sent as they are.
+
+Brotli needs the optional ``brotli`` package. Without it only gzip is used.
+"""
+
+import os
+import re
+import zlib
+import tempfile
+import mimetypes
+
+from flask import request, current_app, send_from_directory
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Suffix of the precompressed file for each encoding
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Files worth compressing ahead of time
+PRECOMPRESS_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt", ".map")
+
+# Names like app.3f2a9c1b.js, whose content never changes
+HASHED_ASSET_REGEX = re.compile(r"[.-][0-9a-f]{8,}\.[a-z0-9]+$", re.IGNORECASE)
+
+
+def available_encodings():
+    """Get the supported encodings, preferred first."""
+    return ("br", "gzip") if brotli else ("gzip",)
+
+
+def negotiate_encoding(encodings=None):
+    """
+    Choose the encoding of a response from ``Accept-Encoding``.
+
+    Args:
+        encodings (tuple): Candidate encodings, preferred first
+
+    Returns:
+        str: The chosen encoding, or None to send the response as is
+    """
+    encodings = encodings or available_encodings()
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = request.accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data, encoding, level):
+    """Compress bytes with ``gzip`` or ``br``."""
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding, level):
+    """
+    Compress a stream, flushing after every chunk.
+
+    Args:
+        chunks (iterable): Bytes chunks
+        encoding (str): ``gzip`` or ``br``
+        level (int): Compression level
+
+    Yields:
+        bytes: Compressed chunks
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _compressible(response, mimetypes_):
+    """Check if a response should be compressed by the application."""
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        and "Content-Encoding" not in response.headers
+        and response.mimetype in mimetypes_
+    )
+
+
+def compress_response(response):
+    """
+    Compress a response if the client accepts it and it is large enough.
+
+    Args:
+        response (Response): Response to compress in place
+
+    Returns:
+        Response: The response
+    """
+    config = current_app.config
+    if not config["COMPRESS_ENABLED"] or not _compressible(
+        response, config["COMPRESS_MIMETYPES"]
+    ):
+        return response
+
+    # The representation depends on Accept-Encoding whether compressed or not
+    response.vary.add("Accept-Encoding")
+
+    streamed = response.is_streamed
+    if not streamed and response.content_length is not None:
+        if response.content_length < config["COMPRESS_MIN_SIZE"]:
+            return response
+
+    encoding = negotiate_encoding()
+    if not encoding:
+        return response
+    level = config["COMPRESS_BROTLI_LEVEL" if encoding == "br" else "COMPRESS_LEVEL"]
+
+    if streamed:
+        response.response = compress_stream(response.iter_encoded(), encoding, level)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < config["COMPRESS_MIN_SIZE"]:
+            return response
+        response.set_data(compress(data, encoding, level))
+
+    response.headers["Content-Encoding"] = encoding
+    # Byte-for-byte equality no longer holds across encodings
+    if response.headers.get("ETag") and not response.headers["ETag"].startswith("W/"):
+        response.headers["ETag"] = "W/" + response.headers["ETag"]
+    return response
+
+
+def _write_compressed(path, encoding, level):
+    """Write the compressed sibling of a file atomically."""
+    with open(path, "rb") as f:
+        data = compress(f.read(), encoding, level)
+
+    target = path + ENCODING_SUFFIXES[encoding]
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".precompress-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # Same modification time as the source, so staleness is detectable
+        stat = os.stat(path)
+        os.utime(temp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _is_fresh(path, compressed_path):
+    """Check if a precompressed file matches its source."""
+    try:
+        return os.stat(compressed_path).st_mtime_ns == os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def precompress_directory(directory, min_size=0, level=9, brotli_level=11):
+    """
+    Write ``.gz`` and ``.br`` files next to the files of a directory.
+
+    Files that are up to date are skipped, so this is cheap to run at every
+    startup.
+
+    Args:
+        directory (str): Directory to walk
+        min_size (int): Skip smaller files
+        level (int): gzip level
+        brotli_level (int): Brotli quality
+
+    Returns:
+        int: Number of files written
+    """
+    written = 0
+    levels = {"gzip": level, "br": brotli_level}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            if os.path.getsize(path) < min_size:
+                continue
+            for encoding in available_encodings():
+                if not _is_fresh(path, path + ENCODING_SUFFIXES[encoding]):
+                    _write_compressed(path, encoding, levels[encoding])
+                    written += 1
+    return written
+
+
+def send_precompressed(directory, path, max_age=None):
+    """
+    Send a static file, using its precompressed version if accepted.
+
+    Files with a content hash in their name are cached for ``max_age``
+    seconds and marked immutable. Other files are revalidated every time.
+
+    Args:
+        directory (str): Directory to send from
+        path (str): File path relative to ``directory``
+        max_age (int): Cache lifetime of hashed files
+
+    Returns:
+        Response: The file response
+    """
+    source = safe_join(directory, path)
+    if source is None:
+        raise NotFound()
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    available = tuple(
+        encoding
+        for encoding in available_encodings()
+        if _is_fresh(source, source + ENCODING_SUFFIXES[encoding])
+    )
+    encoding = negotiate_encoding(available) if available else None
+
+    if encoding:
+        response = send_from_directory(
+            directory, path + ENCODING_SUFFIXES[encoding], mimetype=mimetype
+        )
+        response.headers["Content-Encoding"] = encoding
+    else:
+        response = send_from_directory(directory, path, mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+
+    if max_age and HASHED_ASSET_REGEX.search(path):
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def init_compression(app):
+    """
+    Compress the application's responses.
+
+    Also precompresses the frontend files if ``COMPRESS_STATIC_ON_STARTUP``
+    is set.
+
+    Args:
+        app (Flask): The Flask application
+    """
+    app.after_request(compress_response)
+
+    if app.config["COMPRESS_STATIC_ON_STARTUP"]:
+        try:
+            written = precompress_directory(
+                app.config["FRONTEND_FOLDER"], app.config["COMPRESS_MIN_SIZE"]
+            )
+            if written:
+                app.logger.info(f"Precompressed {written} frontend files")
+        except OSError as e:
+            # Files are then sent uncompressed
+            app.logger.warning(f"Could not precompress frontend files: {e}")
@@ -0,0 +1,74 @@
+"""
+Conditional GET for list endpoints.
+
+Validators are derived from the change counters of the tables a list reads
+(``app.models.change``), which is a single query over a handful of rows. A
+request whose ``If-None-Match`` still matches gets a 304 before the list
+itself is queried or serialized.
+
+There is no ``Last-Modified``: HTTP dates have whole seconds, so a client
+holding a list from before a write in the same second could not tell it
+apart. The ETag changes with every version instead.
+"""
+
+import hashlib
+
+from flask import Response, request
+
+from ..models.change import ChangeCounter
+from .streaming import wants_stream, wants_ndjson
+
+
+class ListValidators:
+    """ETag of a list response."""
+
+    def __init__(self, tables, station_id=None, key=()):
+        """
+        Compute the validators of a list.
+
+        Args:
+            tables (list): Tables the list reads
+            station_id (int): Station the list is limited to, None for all
+            key (tuple): Everything else the response depends on, e.g. the
+                resolved query parameters
+        """
+        version, updated_at = ChangeCounter.current(tables, station_id)
+        # Streamed and NDJSON responses are different representations
+        key = (tuple(tables), station_id, version, updated_at, key)
+        key += (wants_stream(), wants_ndjson())
+        self.tag = hashlib.sha1(repr(key).encode()).hexdigest()[:32]
+
+    @property
+    def etag(self):
+        """The weak ETag, since the same data may be sent compressed or not."""
+        return f'W/"{self.tag}"'
+
+    @property
+    def headers(self):
+        """Response headers carrying the validators."""
+        return {
+            "ETag": self.etag,
+            # Clients may keep the list but must revalidate it
+            "Cache-Control": "private, no-cache",
+            "Vary": "Accept",
+        }
+
+    def not_modified(self):
+        """
+        Check if the client's copy is still current.
+
+        Returns:
+            bool: True if a 304 response should be sent
+        """
+        if not request.if_none_match:
+            return False
+        return request.if_none_match.contains_weak(self.tag)
+
+    def not_modified_response(self):
+        """Build the 304 response."""
+        return Response(status=304, headers=self.headers)
+
+    def apply(self, response):
+        """Add the validators to a response object and return it."""
+        response.headers.update(self.headers)
+        return response
@@ -38,6 +38,15 @@ class ErrorCode(Enum):
     SYSTEM_UNKNOWN_ERROR = 9999
 
 
+# HTTP status of error codes that are not client errors
+STATUS_CODES = {
+    ErrorCode.AUTH_INSUFFICIENT_PERMISSIONS: 403,
+    ErrorCode.SYSTEM_DATABASE_ERROR: 500,
+    ErrorCode.SYSTEM_FILE_ERROR: 500,
+    ErrorCode.SYSTEM_UNKNOWN_ERROR: 500,
+}
+
+
 class AppError(Exception):
     """
     Application-specific error that includes an error code and a message.
@@ -57,6 +66,11 @@ class AppError(Exception):
         self.code = code
         super().__init__(self.message)
 
+    @property
+    def status_code(self):
+        """HTTP status of the error, 400 unless its code says otherwise."""
+        return STATUS_CODES.get(self.code, 400)
+
     def to_dict(self):
         """
         Convert the error to a dictionary suitable for API responses.
@@ -0,0 +1,123 @@
+"""
+Identity of the authenticated user.
+
+The JWT user lookup loads a small ``Identity`` for every authenticated
+request, which flask_jwt_extended keeps as ``current_user`` for the rest of
+the request. Identities are cached per process for a short time so most
+requests do not query the ``user`` table at all. Writes to a user drop its
+cached identity in the process that made them; other processes keep theirs
+until it expires, so the TTL bounds how long a revoked admin flag or a
+deleted user is honoured there.
+"""
+
+import time
+import threading
+from collections import namedtuple
+
+from sqlalchemy import event
+
+from ..models import db, User
+
+Identity = namedtuple("Identity", ["id", "is_admin", "station_id", "station_type"])
+Identity.__doc__ = """
+Authorization details of a user.
+
+``station_id`` is the ID of the station account the user manages, which for
+station accounts is the user's own ID.
+"""
+
+
+class IdentityCache:
+    """Thread-safe TTL cache of user ID to ``Identity``."""
+
+    def __init__(self, ttl=30):
+        """
+        Initialize a new IdentityCache.
+
+        Args:
+            ttl (float): Seconds an identity stays cached
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Get a cached identity, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            identity, expires = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            return identity
+
+    def put(self, identity):
+        """Cache an identity."""
+        with self._lock:
+            self._entries[identity.id] = (identity, time.monotonic() + self.ttl)
+
+    def invalidate(self, user_id):
+        """Remove a user's cached identity."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Remove every cached identity."""
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def load_identity(user_id):
+    """
+    Get the identity of a user, from the cache when possible.
+
+    Args:
+        user_id (int): User ID
+
+    Returns:
+        Identity: The user's identity, or None if the user does not exist
+    """
+    user_id = int(user_id)
+    identity = identity_cache.get(user_id)
+    if identity is not None:
+        return identity
+
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+
+    identity = Identity(
+        id=user.id,
+        is_admin=bool(user.is_admin),
+        station_id=user.id,
+        station_type=user.station_type,
+    )
+    identity_cache.put(identity)
+    return identity
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_identity(mapper, connection, target):
+    """Drop the cached identity of a user that was changed or deleted."""
+    identity_cache.invalidate(target.id)
+
+
+def init_identity(app, jwt):
+    """
+    Register the identity loader with the JWT manager.
+
+    Args:
+        app (Flask): The Flask application
+        jwt (JWTManager): The application's JWT manager
+    """
+    identity_cache.ttl = app.config["IDENTITY_CACHE_TTL"]
+
+    @jwt.user_lookup_loader
+    def user_lookup(jwt_header, jwt_data):
+        return load_identity(jwt_data["sub"])
@@ -0,0 +1,77 @@
+"""
+Keyset pagination utilities for the API.
+"""
+
+import json
+import base64
+from datetime import date, datetime
+
+from flask import request
+
+from .errors import AppError, ErrorCode
+
+
+def encode_cursor(values):
+    """
+    Encode the sort key of the last row of a page as an opaque token.
+
+    Args:
+        values (list): Sort key values (dates, datetimes, numbers or None)
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = [
+        value.isoformat() if isinstance(value, (date, datetime)) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, types):
+    """
+    Decode a cursor token created by ``encode_cursor``.
+
+    Args:
+        token (str): Cursor token
+        types (list): Type of each value: ``date``, ``datetime`` or ``int``
+
+    Returns:
+        list: Sort key values
+
+    Raises:
+        AppError: If the token is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("Wrong number of values")
+
+        values = []
+        for value, value_type in zip(payload, types):
+            if value is None:
+                values.append(None)
+            elif value_type in (date, datetime):
+                values.append(value_type.fromisoformat(value))
+            else:
+                values.append(value_type(value))
+        return values
+    except (ValueError, TypeError):
+        raise AppError("Invalid cursor", ErrorCode.SYSTEM_VALIDATION_ERROR)
+
+
+def get_page_limit(default, maximum):
+    """
+    Get the page size from the ``limit`` query parameter.
+
+    Args:
+        default (int): Page size when ``limit`` is not given
+        maximum (int): Largest page size allowed
+
+    Returns:
+        int: Page size between 1 and ``maximum``
+    """
+    limit = request.args.get("limit", default, type=int)
+    return max(1, min(limit, maximum))
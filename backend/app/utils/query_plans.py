@@ -0,0 +1,118 @@
+"""
+EXPLAIN reports for the application's main queries.
+
+Used by ``python manage.py explain_queries`` to check that the attendance and
+activity log indexes are picked up by the database.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+from ..models import (
+    db,
+    Attendance,
+    PendingAttendance,
+    Personnel,
+    FaceData,
+    ActivityLog,
+)
+
+
+def main_queries(date_from, date_to, station_id=1, personnel_id=1):
+    """
+    Build the main read queries of the API.
+
+    Args:
+        date_from (date): Start of the date range
+        date_to (date): End of the date range
+        station_id (int): Station used for station-scoped queries
+        personnel_id (int): Personnel used for personnel-scoped queries
+
+    Returns:
+        dict: Select statements by description
+    """
+    history_order = (
+        Attendance.date.desc(),
+        Attendance.time_in.desc(),
+        Attendance.id.desc(),
+    )
+
+    return {
+        "Attendance history (admin)": select(Attendance)
+        .where(Attendance.date.between(date_from, date_to))
+        .order_by(*history_order)
+        .limit(100),
+        "Attendance history (station)": select(Attendance)
+        .join(Personnel, Personnel.id == Attendance.personnel_id)
+        .where(
+            Attendance.date.between(date_from, date_to),
+            Personnel.station_id == station_id,
+        )
+        .order_by(*history_order)
+        .limit(100),
+        "Attendance history (personnel)": select(Attendance)
+        .where(
+            Attendance.personnel_id == personnel_id,
+            Attendance.date.between(date_from, date_to),
+        )
+        .order_by(*history_order)
+        .limit(100),
+        "Approval lookup": select(Attendance).where(
+            Attendance.personnel_id == personnel_id, Attendance.date == date_to
+        ),
+        "Pending attendance": select(PendingAttendance).order_by(
+            PendingAttendance.date_created.desc()
+        ),
+        "Personnel face data counts": select(
+            FaceData.personnel_id, func.count(FaceData.id)
+        )
+        .where(FaceData.personnel_id.in_([personnel_id]))
+        .group_by(FaceData.personnel_id),
+        "Recent activity": select(ActivityLog)
+        .where(ActivityLog.timestamp >= datetime.combine(date_from, datetime.min.time()))
+        .order_by(ActivityLog.timestamp.desc())
+        .limit(100),
+    }
+
+
+def explain(statement, bind=None):
+    """
+    Get the query plan of a statement.
+
+    Args:
+        statement (Select): Statement to explain
+        bind (Connection): Connection to use, defaults to the session's
+
+    Returns:
+        tuple: Column names and plan rows
+    """
+    bind = bind or db.session.connection()
+    sql = str(statement.compile(bind=bind, compile_kwargs={"literal_binds": True}))
+
+    if bind.dialect.name == "sqlite":
+        result = bind.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+    else:
+        result = bind.exec_driver_sql(f"EXPLAIN {sql}")
+
+    return list(result.keys()), result.fetchall()
+
+
+def explain_main_queries(days=30, station_id=1, personnel_id=1):
+    """
+    Explain every main query over the last ``days`` days.
+
+    Returns:
+        list: ``(description, sql, columns, rows)`` tuples
+    """
+    date_to = datetime.now().date()
+    date_from = date_to - timedelta(days=days)
+    report = []
+
+    for description, statement in main_queries(
+        date_from, date_to, station_id, personnel_id
+    ).items():
+        columns, rows = explain(statement)
+        report.append((description, statement, columns, rows))
+
+    return report
@@ -4,9 +4,25 @@ Security utilities for the application.
 
 from functools import wraps
 from flask import jsonify, request
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request, current_user
 
-from ..models.user import User
+
+def has_station_access(user, station_id):
+    """
+    Check if a user may access a station's records.
+
+    Args:
+        user (Identity): The authenticated user
+        station_id (int): ID of the station account
+
+    Returns:
+        bool: True for admins and for the station's own account
+    """
+    if not user:
+        return False
+    if user.is_admin:
+        return True
+    return station_id is not None and user.id == int(station_id)
 
 
 def admin_required(fn):
@@ -19,8 +35,7 @@ def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user
 
         if not user or not user.is_admin:
             return jsonify({"msg": "Admin access required"}), 403
@@ -40,11 +55,10 @@ def station_access_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_user
 
         # Admins have access to all stations
-        if user and user.is_admin:
+        if has_station_access(user, None):
             return fn(*args, **kwargs)
 
         # Check station access
@@ -57,7 +71,7 @@ def station_access_required(fn):
         if not station_id:
             return jsonify({"msg": "Station ID required"}), 400
 
-        if not user or user.id != int(station_id):
+        if not has_station_access(user, station_id):
             return jsonify({"msg": "Access denied for this station"}), 403
 
         return fn(*args, **kwargs)
@@ -0,0 +1,83 @@
+"""
+Streaming responses for large result sets.
+
+Rows are read with ``yield_per`` (a server-side cursor on MySQL), serialized a
+chunk at a time and written to the client as they are produced, so memory use
+depends on the chunk size rather than the number of rows.
+"""
+
+from flask import Response, request, stream_with_context, current_app
+
+from ..models.serializers import dumps
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def wants_ndjson():
+    """Check if the client prefers newline delimited JSON."""
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def wants_stream():
+    """
+    Check if the client asked for a streamed response.
+
+    Returns:
+        bool: True for ``?stream=1`` or an ``Accept: application/x-ndjson``
+    """
+    if request.args.get("stream", "").lower() in ("1", "true"):
+        return True
+    return wants_ndjson()
+
+
+def stream_query(query, serialize_chunk, chunk_size=None):
+    """
+    Stream the results of a query as JSON or NDJSON.
+
+    NDJSON is used when the client accepts it, with one object per line.
+    Otherwise the body is the usual ``{"success": true, "data": [...]}``
+    envelope, written incrementally.
+
+    Args:
+        query (Query): Query to stream
+        serialize_chunk (callable): Converts a list of rows to a list of dicts
+        chunk_size (int): Rows fetched and flushed at a time, defaults to
+            ``STREAM_CHUNK_SIZE``
+
+    Returns:
+        Response: Streaming response
+    """
+    chunk_size = chunk_size or current_app.config["STREAM_CHUNK_SIZE"]
+    ndjson = wants_ndjson()
+
+    def chunks():
+        """Yield rows from the query in lists of ``chunk_size``."""
+        chunk = []
+        for row in query.yield_per(chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def generate():
+        if ndjson:
+            for chunk in chunks():
+                yield b"".join(dumps(item) + b"\n" for item in serialize_chunk(chunk))
+            return
+
+        yield b'{"success":true,"data":['
+        separator = b""
+        for chunk in chunks():
+            items = serialize_chunk(chunk)
+            if items:
+                yield separator + b",".join(dumps(item) for item in items)
+                separator = b","
+        yield b"]}"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=NDJSON_MIMETYPE if ndjson else "application/json",
+    )
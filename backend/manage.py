@@ -15,12 +15,25 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from flask import Flask
 from flask_migrate import Migrate
 
+from app.config import get_config
 from app.models import db
 from app.models.user import User
 from app.models.personnel import Personnel
 from app.models.attendance import Attendance, PendingAttendance
 from app.models.face_data import FaceData
 from app.models.activity_log import ActivityLog
+from app.models.summary import DailyAttendanceSummary
+
+# Settings of the application used by the commands below
+COMMAND_SETTINGS = (
+    "WORK_START_TIME",
+    "ATTENDANCE_UTC_OFFSET",
+    "ATTENDANCE_STATUS_LOOKBACK_DAYS",
+    "ARCHIVE_ATTENDANCE_AFTER_DAYS",
+    "ARCHIVE_ACTIVITY_LOG_AFTER_DAYS",
+    "ARCHIVE_BATCH_SIZE",
+    "ARCHIVE_BATCH_PAUSE",
+)
 
 
 def create_app():
@@ -33,6 +46,11 @@ def create_app():
     )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # Use the same settings as the application's configuration
+    config = get_config(os.environ.get("FLASK_CONFIG"))
+    for name in COMMAND_SETTINGS:
+        app.config[name] = getattr(config, name)
+
     # Initialize the database with the app
     db.init_app(app)
 
@@ -127,6 +145,195 @@ def test_connection():
     test_connection_main()
 
 
+@cli.command()
+@click.option("--days", default=30, help="Length of the date range to explain.")
+@click.option("--station-id", default=1, help="Station for station-scoped queries.")
+@click.option(
+    "--personnel-id", default=1, help="Personnel for personnel-scoped queries."
+)
+def explain_queries(days, station_id, personnel_id):
+    """Print the EXPLAIN plans of the application's main queries."""
+    from app.utils.query_plans import explain_main_queries
+
+    app = create_app()
+
+    with app.app_context():
+        for description, statement, columns, rows in explain_main_queries(
+            days, station_id, personnel_id
+        ):
+            print(f"== {description}")
+            print(" | ".join(columns))
+            for row in rows:
+                print(" | ".join("" if value is None else str(value) for value in row))
+            print()
+
+
+def _parse_date(value):
+    """Parse an optional YYYY-MM-DD command option."""
+    from datetime import date
+
+    return date.fromisoformat(value) if value else None
+
+
+@cli.command()
+@click.option("--start-date", default=None, help="First day (YYYY-MM-DD).")
+@click.option("--end-date", default=None, help="Last day (YYYY-MM-DD).")
+def backfill_summary(start_date, end_date):
+    """Add missing daily attendance summary rows, by default for all history."""
+    from app.services.summary import rebuild_daily_summary
+
+    app = create_app()
+
+    with app.app_context():
+        written = rebuild_daily_summary(
+            _parse_date(start_date), _parse_date(end_date), only_missing=True
+        )
+        print(f"Added {written} summary rows.")
+
+
+@cli.command()
+@click.option("--start-date", default=None, help="First day (YYYY-MM-DD).")
+@click.option("--end-date", default=None, help="Last day (YYYY-MM-DD).")
+def rebuild_summary(start_date, end_date):
+    """Recompute the daily attendance summary, by default for all history."""
+    from app.services.summary import rebuild_daily_summary
+
+    app = create_app()
+
+    with app.app_context():
+        written = rebuild_daily_summary(_parse_date(start_date), _parse_date(end_date))
+        print(f"Rebuilt {written} summary rows.")
+
+
+@cli.command()
+@click.option("--start-date", default=None, help="First day (YYYY-MM-DD).")
+@click.option("--end-date", default=None, help="Last day (YYYY-MM-DD).")
+def update_statuses(start_date, end_date):
+    """Mark late, present and absent attendance, by default for the last days."""
+    from datetime import datetime, timedelta
+    from app.services.attendance_status import update_statuses as run
+
+    app = create_app()
+    config = app.config
+
+    with app.app_context():
+        date_to = _parse_date(end_date) or datetime.now().date() - timedelta(days=1)
+        date_from = _parse_date(start_date) or date_to - timedelta(
+            days=config["ATTENDANCE_STATUS_LOOKBACK_DAYS"] - 1
+        )
+        stats = run(
+            date_from,
+            date_to,
+            config["WORK_START_TIME"],
+            utc_offset=config["ATTENDANCE_UTC_OFFSET"],
+        )
+        print(
+            f"Checked {stats['days']} days: {stats['late_or_present']} statuses "
+            f"changed, {stats['absent']} absences added."
+        )
+
+
+@cli.command()
+@click.option(
+    "--attendance-days",
+    default=None,
+    type=int,
+    help="Archive attendance older than this many days.",
+)
+@click.option(
+    "--activity-days",
+    default=None,
+    type=int,
+    help="Archive activity log entries older than this many days.",
+)
+def archive(attendance_days, activity_days):
+    """Move old attendance and activity log entries to the archive tables."""
+    from datetime import datetime, timedelta
+    from app.models import Attendance, ActivityLog
+    from app.services.archive import archive_rows
+
+    app = create_app()
+    config = app.config
+
+    with app.app_context():
+        today = datetime.now().date()
+        horizons = (
+            (Attendance, attendance_days or config["ARCHIVE_ATTENDANCE_AFTER_DAYS"]),
+            (ActivityLog, activity_days or config["ARCHIVE_ACTIVITY_LOG_AFTER_DAYS"]),
+        )
+        for model, days in horizons:
+            moved = archive_rows(
+                model,
+                today - timedelta(days=days),
+                config["ARCHIVE_BATCH_SIZE"],
+                config["ARCHIVE_BATCH_PAUSE"],
+            )
+            print(f"Archived {moved} rows of {model.__tablename__}.")
+
+
+@cli.command()
+def precompress_assets():
+    """Write .gz and .br files next to the frontend files."""
+    from app.config import Config
+    from app.utils.compression import precompress_directory
+
+    written = precompress_directory(Config.FRONTEND_FOLDER, Config.COMPRESS_MIN_SIZE)
+    print(f"Wrote {written} precompressed files.")
+
+
+@cli.command()
+@click.option("--rows", default=10000, help="Attendance records per payload.")
+@click.option("--repeat", default=5, help="Runs per serializer, the best is kept.")
+def benchmark_serializers(rows, repeat):
+    """Compare to_dict and the compiled serializers on an attendance payload."""
+    import json
+    import timeit
+    from datetime import date, datetime, timedelta
+
+    from app.config import json_default
+    from app.models.attendance import AttendanceStatus
+    from app.models.serializers import serialize_many, dumps, JSON_BACKEND
+
+    # Every column is set, as on records loaded from the database
+    start = datetime(2024, 6, 3, 8, 0)
+    records = [
+        Attendance(
+            id=i,
+            personnel_id=i % 200,
+            date=date(2024, 6, 3) - timedelta(days=i // 200),
+            time_in=start + timedelta(seconds=i),
+            time_out=start + timedelta(hours=9, seconds=i),
+            status=AttendanceStatus.LATE if i % 7 == 0 else AttendanceStatus.PRESENT,
+            is_auto_captured=True,
+            is_approved=True,
+            time_in_image=f"2024/06/03/{i:02x}/{i:064x}.jpg",
+            time_out_image=None,
+            confidence_score=None,
+            approved_by=None,
+            date_created=start,
+        )
+        for i in range(rows)
+    ]
+
+    paths = {
+        "to_dict + json": lambda: json.dumps(
+            {"success": True, "data": [record.to_dict() for record in records]},
+            default=json_default,
+        ),
+        f"compiled + {JSON_BACKEND}": lambda: dumps(
+            {"success": True, "data": serialize_many(Attendance, records)}
+        ),
+    }
+
+    results = {}
+    for name, run in paths.items():
+        results[name] = min(timeit.repeat(run, number=1, repeat=repeat))
+        print(f"{name:24} {results[name] * 1000:8.1f} ms for {rows} rows")
+
+    baseline, compiled = results.values()
+    print(f"Speedup: {baseline / compiled:.1f}x")
+
+
 if __name__ == "__main__":
     # Import StationType for initialize_db command
     from app.models.user import StationType
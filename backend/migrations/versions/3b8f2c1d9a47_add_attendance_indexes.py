@@ -0,0 +1,205 @@
+"""Add attendance, activity log and image path indexes
+
+Baseline revision. Creates the original tables if they do not exist, so
+``flask db upgrade`` works on an empty database as well as on one created
+by ``db.create_all()`` before migrations were introduced.
+
+Adds a unique (personnel_id, date) key and a (date, personnel_id) index to
+attendance, an index on activity_log.timestamp and indexes on the image path
+columns used to authorize image requests. Duplicate attendance records for
+the same personnel and day are merged before the unique key is created.
+
+Revision ID: 3b8f2c1d9a47
+Revises:
+Create Date: 2024-06-03 09:12:44.512310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3b8f2c1d9a47"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Tables as they were before migrations, created only where missing
+BASELINE = sa.MetaData()
+
+sa.Table(
+    "user",
+    BASELINE,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("date_created", sa.DateTime(), nullable=True),
+    sa.Column("username", sa.String(length=100), nullable=False, unique=True),
+    sa.Column("email", sa.String(length=150), nullable=False, unique=True),
+    sa.Column("password", sa.String(length=255), nullable=False),
+    sa.Column(
+        "station_type",
+        sa.Enum("CENTRAL", "TALISAY", "BACON", "ABUYOG", name="stationtype"),
+        nullable=False,
+    ),
+    sa.Column("is_admin", sa.Boolean(), nullable=True),
+    sa.Column("profile_picture", sa.String(length=255), nullable=True),
+)
+sa.Table(
+    "personnel",
+    BASELINE,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("date_created", sa.DateTime(), nullable=True),
+    sa.Column("first_name", sa.String(length=100), nullable=False),
+    sa.Column("last_name", sa.String(length=100), nullable=False),
+    sa.Column("rank", sa.String(length=100), nullable=False),
+    sa.Column("station_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+    sa.Column("image_path", sa.String(length=255), nullable=True),
+)
+sa.Table(
+    "attendance",
+    BASELINE,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("date_created", sa.DateTime(), nullable=True),
+    sa.Column(
+        "personnel_id", sa.Integer(), sa.ForeignKey("personnel.id"), nullable=False
+    ),
+    sa.Column("date", sa.Date(), nullable=False),
+    sa.Column("time_in", sa.DateTime(), nullable=True),
+    sa.Column("time_out", sa.DateTime(), nullable=True),
+    sa.Column(
+        "status",
+        sa.Enum("PRESENT", "LATE", "ABSENT", name="attendancestatus"),
+        nullable=True,
+    ),
+    sa.Column("confidence_score", sa.Float(), nullable=True),
+    sa.Column("is_auto_captured", sa.Boolean(), nullable=True),
+    sa.Column("is_approved", sa.Boolean(), nullable=True),
+    sa.Column("approved_by", sa.Integer(), sa.ForeignKey("user.id"), nullable=True),
+    sa.Column("time_in_image", sa.String(length=255), nullable=True),
+    sa.Column("time_out_image", sa.String(length=255), nullable=True),
+)
+sa.Table(
+    "pending_attendance",
+    BASELINE,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("date_created", sa.DateTime(), nullable=True),
+    sa.Column(
+        "personnel_id", sa.Integer(), sa.ForeignKey("personnel.id"), nullable=False
+    ),
+    sa.Column("date", sa.Date(), nullable=False),
+    sa.Column(
+        "attendance_type",
+        sa.Enum("TIME_IN", "TIME_OUT", name="attendancetype"),
+        nullable=False,
+    ),
+    sa.Column("image_path", sa.String(length=255), nullable=False),
+    sa.Column("notes", sa.Text(), nullable=True),
+)
+sa.Table(
+    "face_data",
+    BASELINE,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("date_created", sa.DateTime(), nullable=True),
+    sa.Column(
+        "personnel_id", sa.Integer(), sa.ForeignKey("personnel.id"), nullable=False
+    ),
+    sa.Column("filename", sa.String(length=255), nullable=False),
+    sa.Column("embedding", sa.Text(length=4294967295), nullable=True),
+    sa.Column("confidence", sa.Float(), nullable=True),
+)
+sa.Table(
+    "activity_log",
+    BASELINE,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("date_created", sa.DateTime(), nullable=True),
+    sa.Column("user_id", sa.Integer(), sa.ForeignKey("user.id"), nullable=False),
+    sa.Column("title", sa.String(length=255), nullable=False),
+    sa.Column("description", sa.Text(), nullable=True),
+    sa.Column("timestamp", sa.DateTime(), nullable=True),
+)
+
+INDEXES = [
+    ("attendance", "uq_attendance_personnel_date", ["personnel_id", "date"], True),
+    ("attendance", "ix_attendance_date_personnel", ["date", "personnel_id"], False),
+    ("activity_log", "ix_activity_log_timestamp", ["timestamp"], False),
+    ("attendance", "ix_attendance_time_in_image", ["time_in_image"], False),
+    ("attendance", "ix_attendance_time_out_image", ["time_out_image"], False),
+    (
+        "pending_attendance",
+        "ix_pending_attendance_image_path",
+        ["image_path"],
+        False,
+    ),
+    ("face_data", "ix_face_data_filename", ["filename"], False),
+    ("personnel", "ix_personnel_image_path", ["image_path"], False),
+]
+
+
+def merge_duplicate_attendance(bind):
+    """Merge attendance records sharing a personnel and date into the oldest."""
+    duplicates = bind.execute(
+        sa.text(
+            "SELECT personnel_id, date FROM attendance "
+            "GROUP BY personnel_id, date HAVING COUNT(*) > 1"
+        )
+    ).fetchall()
+
+    for personnel_id, day in duplicates:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, time_in, time_out, time_in_image, time_out_image "
+                "FROM attendance WHERE personnel_id = :personnel_id AND date = :day "
+                "ORDER BY id"
+            ),
+            {"personnel_id": personnel_id, "day": day},
+        ).fetchall()
+
+        keep = rows[0]
+        time_in = [row for row in rows if row.time_in is not None]
+        time_out = [row for row in rows if row.time_out is not None]
+        first_in = min(time_in, key=lambda row: row.time_in) if time_in else None
+        last_out = max(time_out, key=lambda row: row.time_out) if time_out else None
+
+        bind.execute(
+            sa.text(
+                "UPDATE attendance SET time_in = :time_in, "
+                "time_in_image = :time_in_image, time_out = :time_out, "
+                "time_out_image = :time_out_image WHERE id = :id"
+            ),
+            {
+                "id": keep.id,
+                "time_in": first_in.time_in if first_in else None,
+                "time_in_image": first_in.time_in_image if first_in else None,
+                "time_out": last_out.time_out if last_out else None,
+                "time_out_image": last_out.time_out_image if last_out else None,
+            },
+        )
+        bind.execute(
+            sa.text("DELETE FROM attendance WHERE id IN :ids").bindparams(
+                sa.bindparam("ids", expanding=True)
+            ),
+            {"ids": [row.id for row in rows[1:]]},
+        )
+
+
+def upgrade():
+    bind = op.get_bind()
+    BASELINE.create_all(bind, checkfirst=True)
+    inspector = sa.inspect(bind)
+
+    merge_duplicate_attendance(bind)
+
+    for table, name, columns, unique in INDEXES:
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    for table, name, _, _ in reversed(INDEXES):
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        if name in existing:
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,103 @@
+"""Add archive tables
+
+Attendance and activity log entries older than the archive horizon are
+moved to these tables. The watermark records up to which day each table
+may have been archived.
+
+Revision ID: 4e6b0d8a2f15
+Revises: 9d2a6f31c8e4
+Create Date: 2024-07-01 10:03:18.214907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "4e6b0d8a2f15"
+down_revision = "9d2a6f31c8e4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "attendance_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("date_created", sa.DateTime(), nullable=True),
+        sa.Column("personnel_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("time_in", sa.DateTime(), nullable=True),
+        sa.Column("time_out", sa.DateTime(), nullable=True),
+        sa.Column(
+            "status",
+            sa.Enum("PRESENT", "LATE", "ABSENT", name="attendancestatus"),
+            nullable=True,
+        ),
+        sa.Column("confidence_score", sa.Float(), nullable=True),
+        sa.Column("is_auto_captured", sa.Boolean(), nullable=True),
+        sa.Column("is_approved", sa.Boolean(), nullable=True),
+        sa.Column("approved_by", sa.Integer(), nullable=True),
+        sa.Column("time_in_image", sa.String(length=255), nullable=True),
+        sa.Column("time_out_image", sa.String(length=255), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_attendance_archive_personnel_date",
+        "attendance_archive",
+        ["personnel_id", "date"],
+    )
+    op.create_index(
+        "ix_attendance_archive_date_personnel",
+        "attendance_archive",
+        ["date", "personnel_id"],
+    )
+
+    op.create_table(
+        "activity_log_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("date_created", sa.DateTime(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("timestamp", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_activity_log_archive_timestamp", "activity_log_archive", ["timestamp"]
+    )
+    op.create_index(
+        "ix_activity_log_archive_user_timestamp",
+        "activity_log_archive",
+        ["user_id", "timestamp"],
+    )
+
+    op.create_table(
+        "archive_watermark",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date_created", sa.DateTime(), nullable=True),
+        sa.Column("table_name", sa.String(length=64), nullable=False),
+        sa.Column("archived_before", sa.Date(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_archive_watermark_table", "archive_watermark", ["table_name"], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index("uq_archive_watermark_table", table_name="archive_watermark")
+    op.drop_table("archive_watermark")
+    op.drop_index(
+        "ix_activity_log_archive_user_timestamp", table_name="activity_log_archive"
+    )
+    op.drop_index("ix_activity_log_archive_timestamp", table_name="activity_log_archive")
+    op.drop_table("activity_log_archive")
+    op.drop_index(
+        "ix_attendance_archive_date_personnel", table_name="attendance_archive"
+    )
+    op.drop_index(
+        "ix_attendance_archive_personnel_date", table_name="attendance_archive"
+    )
+    op.drop_table("attendance_archive")
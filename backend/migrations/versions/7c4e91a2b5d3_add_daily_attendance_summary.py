@@ -0,0 +1,50 @@
+"""Add daily attendance summary table
+
+Per-station, per-day counts of present, late, absent and pending attendance.
+Fill it with ``python manage.py backfill_summary`` after upgrading.
+
+Revision ID: 7c4e91a2b5d3
+Revises: 3b8f2c1d9a47
+Create Date: 2024-06-10 14:27:03.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7c4e91a2b5d3"
+down_revision = "3b8f2c1d9a47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "daily_attendance_summary",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date_created", sa.DateTime(), nullable=True),
+        sa.Column("station_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("present", sa.Integer(), nullable=False),
+        sa.Column("late", sa.Integer(), nullable=False),
+        sa.Column("absent", sa.Integer(), nullable=False),
+        sa.Column("pending", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["station_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_daily_attendance_summary_date_station",
+        "daily_attendance_summary",
+        ["date", "station_id"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "uq_daily_attendance_summary_date_station",
+        table_name="daily_attendance_summary",
+    )
+    op.drop_table("daily_attendance_summary")
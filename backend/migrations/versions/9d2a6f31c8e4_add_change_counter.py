@@ -0,0 +1,43 @@
+"""Add change counter table
+
+Per-station versions of the personnel, attendance and pending attendance
+tables, bumped with every write and used as ETags by the list endpoints.
+
+Revision ID: 9d2a6f31c8e4
+Revises: 7c4e91a2b5d3
+Create Date: 2024-06-17 09:12:44.530218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d2a6f31c8e4"
+down_revision = "7c4e91a2b5d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "change_counter",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date_created", sa.DateTime(), nullable=True),
+        sa.Column("table_name", sa.String(length=64), nullable=False),
+        sa.Column("station_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "uq_change_counter_table_station",
+        "change_counter",
+        ["table_name", "station_id"],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("uq_change_counter_table_station", table_name="change_counter")
+    op.drop_table("change_counter")
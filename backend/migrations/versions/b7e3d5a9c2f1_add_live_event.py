@@ -0,0 +1,37 @@
+"""Add live event table
+
+Events of the live dashboards, shared by the API processes so each one
+can stream the events of writes handled by the others.
+
+Revision ID: b7e3d5a9c2f1
+Revises: 4e6b0d8a2f15
+Create Date: 2024-07-15 14:26:03.918244
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b7e3d5a9c2f1"
+down_revision = "4e6b0d8a2f15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "live_event",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date_created", sa.DateTime(), nullable=True),
+        sa.Column("station_id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=32), nullable=False),
+        sa.Column("data", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_live_event_date_created", "live_event", ["date_created"])
+
+
+def downgrade():
+    op.drop_index("ix_live_event_date_created", table_name="live_event")
+    op.drop_table("live_event")
@@ -26,6 +26,76 @@ def app():
         db.drop_all()
 
 
+@pytest.fixture
+def station(app):
+    """Create a station account."""
+    from app.models import User
+    from app.models.user import StationType
+
+    station = User(
+        username="station", email="station@example.com", station_type=StationType.BACON
+    )
+    station.set_password("password")
+    db.session.add(station)
+    db.session.commit()
+    return station
+
+
+@pytest.fixture
+def admin(app):
+    """Create an admin account."""
+    from app.models import User
+    from app.models.user import StationType
+
+    admin = User(
+        username="admin",
+        email="admin@example.com",
+        station_type=StationType.CENTRAL,
+        is_admin=True,
+    )
+    admin.set_password("password")
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+@pytest.fixture
+def add_personnel(station):
+    """
+    Get a function adding personnel to the station.
+
+    ``add_personnel(count, **values)`` creates ``count`` personnel named
+    ``P0 Doe``, ``P1 Doe``... with rank FO1, unless ``values`` say otherwise,
+    and returns them as a list.
+    """
+    from app.models import Personnel
+
+    def add(count=1, **values):
+        personnel = [
+            Personnel(
+                **{
+                    "first_name": f"P{index}",
+                    "last_name": "Doe",
+                    "rank": "FO1",
+                    "station_id": station.id,
+                    **values,
+                }
+            )
+            for index in range(count)
+        ]
+        db.session.add_all(personnel)
+        db.session.commit()
+        return personnel
+
+    return add
+
+
+@pytest.fixture
+def personnel(add_personnel):
+    """Create one personnel of the station."""
+    return add_personnel(first_name="Juan", last_name="Cruz")[0]
+
+
 @pytest.fixture
 def client(app):
     """Create a test client for the app."""
@@ -36,3 +106,53 @@ def client(app):
 def runner(app):
     """Create a test CLI runner for the app."""
     return app.test_cli_runner()
+
+
+# Image folders of the full application, named like the real ones since the
+# folder name is part of stored image paths
+APP_FOLDERS = {
+    "UPLOAD_FOLDER": "face_data",
+    "TEMP_ATTENDANCE_FOLDER": "attendance_images_temp",
+    "ANNOTATIONS_FOLDER": "annotations",
+    "RETENTION_STATE_FOLDER": "instance",
+}
+
+
+@pytest.fixture
+def api_app(tmp_path, monkeypatch):
+    """
+    Create the full application with the testing configuration.
+
+    The database is seeded with the admin (ID 1) and the station accounts
+    central, talisay, bacon and abuyog (IDs 2 to 5).
+    """
+    from app import create_app
+    from app.config import TestingConfig
+    from app.utils.identity import identity_cache
+
+    for name, folder in APP_FOLDERS.items():
+        monkeypatch.setattr(TestingConfig, name, str(tmp_path / folder))
+    identity_cache.clear()
+
+    app = create_app("testing")
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def api_client(api_app):
+    """Create a test client for the full application."""
+    return api_app.test_client()
+
+
+@pytest.fixture
+def auth_headers(api_app):
+    """Get a function building the Authorization header of a user ID."""
+    from flask_jwt_extended import create_access_token
+
+    def headers(user_id):
+        return {"Authorization": f"Bearer {create_access_token(identity=user_id)}"}
+
+    return headers
@@ -0,0 +1,135 @@
+"""
+Test the buffered activity logger.
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models import db, ActivityLog, Personnel, PendingAttendance
+from app.models.attendance import AttendanceType
+from app.services.activity_logger import ActivityLogger
+
+
+def _count_inserts(app):
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("INSERT"):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    return statements, lambda: event.remove(db.engine, "before_cursor_execute", count)
+
+
+def test_entries_are_written_in_one_batch(app):
+    """Test that queued entries are written with a single insert."""
+    logger = ActivityLogger(app, batch_size=100, flush_interval=60)
+    logger.start()
+    statements, stop = _count_inserts(app)
+    try:
+        for i in range(10):
+            logger.log(1, "Test", f"Entry {i}")
+        logger.flush()
+    finally:
+        stop()
+        logger.shutdown()
+
+    assert len(statements) == 1
+    assert ActivityLog.query.count() == 10
+    assert logger.metrics()["written"] == 10
+
+
+def test_batch_size_triggers_write(app):
+    """Test that a full batch is written without waiting for the interval."""
+    logger = ActivityLogger(app, batch_size=5, flush_interval=60)
+    logger.start()
+    statements, stop = _count_inserts(app)
+    try:
+        for i in range(10):
+            logger.log(1, "Test", f"Entry {i}")
+        logger.flush()
+    finally:
+        stop()
+        logger.shutdown()
+
+    assert len(statements) == 2
+    assert ActivityLog.query.count() == 10
+
+
+def test_writes_synchronously_when_not_running(app):
+    """Test that entries are written immediately when the logger is stopped."""
+    logger = ActivityLogger(app)
+    logger.log(1, "Test", "Entry")
+
+    assert ActivityLog.query.count() == 1
+    assert logger.metrics()["sync_writes"] == 1
+
+
+def test_shutdown_drains_queue(app):
+    """Test that entries still queued at shutdown are written."""
+    logger = ActivityLogger(app, batch_size=100, flush_interval=60)
+    logger.start()
+    for i in range(3):
+        logger.log(1, "Test", f"Entry {i}")
+    logger.shutdown()
+
+    assert ActivityLog.query.count() == 3
+
+
+def test_sync_writes_leave_the_session_alone(app, station):
+    """Test that synchronous writes neither commit nor roll back the session."""
+    logger = ActivityLogger(app)
+    personnel = Personnel(
+        first_name="Juan", last_name="Cruz", rank="FO1", station_id=station.id
+    )
+
+    db.session.add(personnel)
+    logger.log(station.id, "Test", "Entry")
+    db.session.rollback()
+
+    assert ActivityLog.query.count() == 1
+    assert Personnel.query.count() == 0
+
+    # A failed entry does not discard the caller's pending changes
+    db.session.add(personnel)
+    logger.log(None, "Test", "Missing user")
+    db.session.commit()
+
+    assert Personnel.query.count() == 1
+    assert logger.metrics()["failed"] == 1
+
+
+def test_failed_approval_is_not_logged(api_app, api_client, auth_headers, monkeypatch):
+    """Test that an approval is only logged once it is committed."""
+    personnel = Personnel(first_name="Juan", last_name="Cruz", rank="FO1", station_id=4)
+    db.session.add(personnel)
+    db.session.commit()
+    pending = PendingAttendance(
+        personnel_id=personnel.id,
+        date=date(2024, 6, 3),
+        attendance_type=AttendanceType.TIME_IN,
+        image_path="pending.jpg",
+        date_created=datetime(2024, 6, 3, 8, 0),
+    )
+    db.session.add(pending)
+    db.session.commit()
+
+    def fail(self):
+        raise SQLAlchemyError("lost connection")
+
+    logged = []
+    monkeypatch.setattr(PendingAttendance, "delete", fail)
+    monkeypatch.setattr(
+        api_app.activity_logger, "log", lambda *args: logged.append(args)
+    )
+
+    with pytest.raises(SQLAlchemyError):
+        api_client.post(
+            "/api/v1/attendance/pending",
+            json={"pending_id": pending.id, "action": "approve"},
+            headers=auth_headers(1),
+        )
+    assert logged == []
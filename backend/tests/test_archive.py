@@ -0,0 +1,105 @@
+"""
+Test the archival of old attendance and activity.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.models import (
+    db,
+    Attendance,
+    AttendanceStatus,
+    ActivityLog,
+    AttendanceArchive,
+    ActivityLogArchive,
+    DailyAttendanceSummary,
+)
+from app.services.archive import (
+    archive_rows,
+    archived_before,
+    attendance_source,
+    activity_log_source,
+)
+from app.services.summary import rebuild_daily_summary
+
+
+def _attendance(person, days):
+    db.session.add_all(
+        [
+            Attendance(
+                personnel_id=person.id,
+                date=day,
+                time_in=datetime.combine(day, datetime.min.time()),
+                status=AttendanceStatus.PRESENT,
+            )
+            for day in days
+        ]
+    )
+    db.session.commit()
+
+
+def test_archive_rows_moves_old_records_in_batches(personnel):
+    """Test that only records before the cutoff are moved, keeping their IDs."""
+    days = [date(2023, 1, day) for day in range(1, 6)] + [date(2024, 1, 1)]
+    _attendance(personnel, days)
+    old_ids = [record.id for record in Attendance.query if record.date.year == 2023]
+
+    moved = archive_rows(Attendance, date(2023, 12, 1), batch_size=2)
+
+    assert moved == 5
+    assert [record.date for record in Attendance.query] == [date(2024, 1, 1)]
+    assert sorted(record.id for record in AttendanceArchive.query) == old_ids
+    assert archived_before(Attendance) == date(2023, 12, 1)
+
+    # An earlier cutoff moves nothing and keeps the watermark
+    assert archive_rows(Attendance, date(2023, 6, 1)) == 0
+    assert archived_before(Attendance) == date(2023, 12, 1)
+
+
+def test_attendance_source_includes_archive_when_needed(station, personnel):
+    """Test that ranges reaching the watermark read both tables."""
+    _attendance(personnel, [date(2023, 1, 2), date(2024, 1, 2)])
+    assert attendance_source(date(2023, 1, 1)) is Attendance
+
+    archive_rows(Attendance, date(2023, 12, 1))
+
+    # Only recent days, the hot table is enough
+    assert attendance_source(date(2023, 12, 1), date(2024, 1, 31)) is Attendance
+
+    source = attendance_source(date(2023, 1, 1), date(2024, 1, 31))
+    assert db.session.scalars(
+        select(source.date)
+        .where(source.personnel_id == personnel.id)
+        .order_by(source.date)
+    ).all() == [date(2023, 1, 2), date(2024, 1, 2)]
+
+    # Rebuilding the summary of an archived day still counts its records
+    rebuild_daily_summary(date(2023, 1, 2), date(2023, 1, 2))
+    summary = DailyAttendanceSummary.query.filter_by(
+        station_id=station.id, date=date(2023, 1, 2)
+    ).one()
+    assert summary.present == 1
+
+
+def test_activity_log_source_includes_archive(station):
+    """Test that archived activity log entries are read back by time range."""
+    db.session.add_all(
+        [
+            ActivityLog(
+                user_id=station.id, title="Old", timestamp=datetime(2023, 1, 2, 9)
+            ),
+            ActivityLog(
+                user_id=station.id, title="New", timestamp=datetime(2024, 1, 2, 9)
+            ),
+        ]
+    )
+    db.session.commit()
+
+    assert archive_rows(ActivityLog, date(2023, 12, 1)) == 1
+    assert ActivityLogArchive.query.one().title == "Old"
+
+    source = activity_log_source(datetime(2023, 1, 1), datetime(2024, 12, 31))
+    titles = db.session.scalars(select(source.title).order_by(source.timestamp))
+    assert titles.all() == ["Old", "New"]
+    assert activity_log_source(datetime(2024, 1, 1)) is ActivityLog
@@ -0,0 +1,144 @@
+"""
+Test the attendance history endpoint.
+"""
+
+import json
+from datetime import date, datetime
+
+from app.models import db, Personnel, Attendance, AttendanceStatus
+
+HISTORY_URL = "/api/v1/attendance/history?date_from=2024-06-01&date_to=2024-06-30"
+
+
+def _history(station_id=3, count=3):
+    """Create personnel of a station with tied and missing times in."""
+    personnel = [
+        Personnel(
+            first_name=f"Juan{index}",
+            last_name="Cruz",
+            rank="FO1",
+            station_id=station_id,
+        )
+        for index in range(count)
+    ]
+    db.session.add_all(personnel)
+    db.session.commit()
+
+    records = []
+    for person in personnel:
+        for day, time_in in (
+            (date(2024, 6, 3), datetime(2024, 6, 3, 8, 0)),
+            (date(2024, 6, 4), datetime(2024, 6, 4, 8, 0)),
+            (date(2024, 6, 5), None),
+        ):
+            records.append(
+                Attendance(
+                    personnel_id=person.id,
+                    date=day,
+                    time_in=time_in,
+                    status=AttendanceStatus.PRESENT,
+                )
+            )
+    db.session.add_all(records)
+    db.session.commit()
+    return records
+
+
+def _pages(client, headers, url):
+    """Follow the cursors of a paginated list and return every page."""
+    pages = []
+    cursor = None
+    while True:
+        page_url = f"{url}&cursor={cursor}" if cursor else url
+        response = client.get(page_url, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.get_json())
+        cursor = pages[-1]["next_cursor"]
+        if not cursor:
+            return pages
+
+
+def test_history_cursor_pages_through_ties(api_app, api_client, auth_headers):
+    """Test that pages neither skip nor repeat rows sharing date and time in."""
+    records = _history()
+    expected = [
+        record.id
+        for record in sorted(
+            records,
+            key=lambda r: (r.date, r.time_in or datetime.min, r.id),
+            reverse=True,
+        )
+    ]
+
+    pages = _pages(api_client, auth_headers(3), f"{HISTORY_URL}&limit=2")
+
+    assert [len(page["data"]) for page in pages] == [2, 2, 2, 2, 1]
+    assert [row["id"] for page in pages for row in page["data"]] == expected
+
+
+def test_history_rejects_malformed_cursor(api_app, api_client, auth_headers):
+    """Test that cursors that do not decode to the sort key are rejected."""
+    _history()
+
+    for cursor in ("not-a-cursor", "WzFd", "WyJ4IiwiMjAyNCIsMV0"):
+        response = api_client.get(
+            f"{HISTORY_URL}&cursor={cursor}", headers=auth_headers(3)
+        )
+        assert response.status_code == 400
+        assert response.get_json()["success"] is False
+
+
+def test_history_fields_projection(api_app, api_client, auth_headers):
+    """Test that only the requested fields are returned, and unknown ones rejected."""
+    _history(count=1)
+    headers = auth_headers(3)
+
+    response = api_client.get(f"{HISTORY_URL}&fields=date,status", headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()["data"][0] == {"date": "2024-06-05", "status": "Present"}
+
+    response = api_client.get(f"{HISTORY_URL}&fields=date,password", headers=headers)
+    assert response.status_code == 400
+    assert "password" in response.get_json()["error"]
+
+
+def test_history_stream_matches_pages(api_app, api_client, auth_headers):
+    """Test that streamed JSON and NDJSON hold exactly the paginated rows."""
+    api_app.config["STREAM_CHUNK_SIZE"] = 2
+    _history()
+    headers = auth_headers(3)
+    paged = [
+        row
+        for page in _pages(api_client, headers, f"{HISTORY_URL}&limit=4")
+        for row in page["data"]
+    ]
+
+    response = api_client.get(f"{HISTORY_URL}&stream=1", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert response.get_json() == {"success": True, "data": paged}
+
+    response = api_client.get(
+        HISTORY_URL, headers={**headers, "Accept": "application/x-ndjson"}
+    )
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == paged
+
+
+def test_history_stream_is_scoped_to_station(api_app, api_client, auth_headers):
+    """Test that streaming applies the same station filter as pages."""
+    own = _history(station_id=3, count=1)
+    other = _history(station_id=4, count=1)
+
+    response = api_client.get(f"{HISTORY_URL}&stream=1", headers=auth_headers(3))
+    ids = {row["id"] for row in response.get_json()["data"]}
+    assert ids == {record.id for record in own}
+
+    response = api_client.get(f"{HISTORY_URL}&stream=1", headers=auth_headers(1))
+    ids = {row["id"] for row in response.get_json()["data"]}
+    assert ids == {record.id for record in own + other}
+
+    # An empty result is still a valid document
+    response = api_client.get(f"{HISTORY_URL}&stream=1", headers=auth_headers(5))
+    assert response.get_json() == {"success": True, "data": []}
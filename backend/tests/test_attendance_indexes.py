@@ -0,0 +1,114 @@
+"""
+Test the attendance index migration and the EXPLAIN report.
+"""
+
+import importlib.util
+import os
+from datetime import date, datetime
+
+import sqlalchemy as sa
+from flask import Flask
+from flask_migrate import Migrate, upgrade
+
+from app.models import db
+from app.utils.query_plans import explain_main_queries
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), "..", "migrations")
+
+
+def _baseline_revision():
+    """Load the baseline migration module."""
+    path = os.path.join(
+        MIGRATIONS, "versions", "3b8f2c1d9a47_add_attendance_indexes.py"
+    )
+    spec = importlib.util.spec_from_file_location("baseline_revision", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _row(personnel_id, day, **values):
+    """Build an attendance row for the baseline table."""
+    row = dict.fromkeys(("time_in", "time_out", "time_in_image", "time_out_image"))
+    row.update(values, personnel_id=personnel_id, date=day)
+    return row
+
+
+def test_merge_duplicate_attendance_keeps_first_in_and_last_out():
+    """Test that duplicates merge into the oldest row with the widest times."""
+    revision = _baseline_revision()
+    engine = sa.create_engine("sqlite://")
+    revision.BASELINE.create_all(engine)
+    attendance = revision.BASELINE.tables["attendance"]
+    day = date(2024, 6, 3)
+
+    with engine.begin() as connection:
+        connection.execute(
+            sa.text(
+                "INSERT INTO user (id, username, email, password, station_type) "
+                "VALUES (1, 'station', 'station@example.com', 'x', 'BACON')"
+            )
+        )
+        connection.execute(
+            sa.text(
+                "INSERT INTO personnel (id, first_name, last_name, rank, station_id) "
+                "VALUES (1, 'Juan', 'Cruz', 'FO1', 1), (2, 'Ana', 'Abad', 'FO2', 1)"
+            )
+        )
+        connection.execute(
+            sa.insert(attendance),
+            [
+                _row(1, day, time_in=datetime(2024, 6, 3, 9), time_in_image="late.jpg"),
+                _row(
+                    1,
+                    day,
+                    time_in=datetime(2024, 6, 3, 8),
+                    time_in_image="early.jpg",
+                    time_out=datetime(2024, 6, 3, 12),
+                ),
+                _row(
+                    1, day, time_out=datetime(2024, 6, 3, 17), time_out_image="out.jpg"
+                ),
+                _row(2, day, time_in=datetime(2024, 6, 3, 7)),
+            ],
+        )
+
+        revision.merge_duplicate_attendance(connection)
+
+        rows = connection.execute(
+            sa.select(attendance).order_by(attendance.c.id)
+        ).fetchall()
+
+    assert [(row.id, row.personnel_id) for row in rows] == [(1, 1), (4, 2)]
+    merged = rows[0]
+    assert merged.time_in == datetime(2024, 6, 3, 8)
+    assert merged.time_in_image == "early.jpg"
+    assert merged.time_out == datetime(2024, 6, 3, 17)
+    assert merged.time_out_image == "out.jpg"
+    assert rows[1].time_in == datetime(2024, 6, 3, 7)
+
+
+def test_upgrade_creates_schema_on_empty_database(tmp_path):
+    """Test that every revision applies to an empty database."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'empty.db'}"
+    db.init_app(app)
+    Migrate(app, db, directory=MIGRATIONS)
+
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+
+        inspector = sa.inspect(db.engine)
+        tables = set(inspector.get_table_names())
+        assert {"user", "personnel", "attendance", "activity_log"} <= tables
+        indexes = {index["name"] for index in inspector.get_indexes("attendance")}
+        assert "uq_attendance_personnel_date" in indexes
+
+
+def test_explain_main_queries(app):
+    """Test that every main query gets a plan."""
+    report = explain_main_queries(days=7)
+
+    assert len(report) == 7
+    for description, statement, columns, rows in report:
+        assert columns and rows, description
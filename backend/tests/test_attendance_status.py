@@ -0,0 +1,139 @@
+"""
+Test the nightly attendance status computation.
+"""
+
+from datetime import date, datetime
+
+from app.models import (
+    db,
+    Attendance,
+    AttendanceStatus,
+    PendingAttendance,
+    DailyAttendanceSummary,
+)
+from app.models.attendance import AttendanceType
+from app.models.change import ChangeCounter
+from app.services.attendance_status import update_statuses, run_status_job
+from app.services.dashboard import DashboardCounters
+
+
+def test_update_statuses_marks_late_and_absent(station, add_personnel):
+    """Test that statuses are computed from time in and missing records."""
+    on_time, late, absent, pending, fixed = add_personnel(
+        5, date_created=datetime(2024, 1, 1)
+    )
+    day = date(2024, 6, 3)
+    Attendance.record_punch(on_time.id, day, time_in=datetime(2024, 6, 3, 7, 59))
+    Attendance.record_punch(late.id, day, time_in=datetime(2024, 6, 3, 8, 15))
+    db.session.add_all(
+        [
+            PendingAttendance(
+                personnel_id=pending.id,
+                date=day,
+                attendance_type=AttendanceType.TIME_IN,
+                image_path="pending.jpg",
+            ),
+            # Marked absent, then an approved time in arrived
+            Attendance(
+                personnel_id=fixed.id,
+                date=day,
+                time_in=datetime(2024, 6, 3, 7, 30),
+                status=AttendanceStatus.ABSENT,
+            ),
+        ]
+    )
+    db.session.commit()
+    version, _ = ChangeCounter.current(["attendance"], station.id)
+
+    stats = update_statuses(day, day, "08:00", today=date(2024, 6, 4))
+
+    statuses = dict(db.session.query(Attendance.personnel_id, Attendance.status))
+    assert statuses == {
+        on_time.id: AttendanceStatus.PRESENT,
+        late.id: AttendanceStatus.LATE,
+        absent.id: AttendanceStatus.ABSENT,
+        fixed.id: AttendanceStatus.PRESENT,
+    }
+    assert stats == {"days": 1, "late_or_present": 2, "absent": 1}
+    assert ChangeCounter.current(["attendance"], station.id)[0] > version
+
+    summary = DailyAttendanceSummary.query.filter_by(date=day).one()
+    assert summary.present == 2 and summary.late == 1
+    assert summary.absent == 1 and summary.pending == 1
+
+    # A second run changes nothing
+    stats = update_statuses(day, day, "08:00", today=date(2024, 6, 4))
+    assert stats == {"days": 1, "late_or_present": 0, "absent": 0}
+    assert Attendance.query.count() == 4
+
+
+def test_update_statuses_compares_local_time(add_personnel):
+    """Test that UTC times in are compared with the local start of work."""
+    early, late, afternoon = add_personnel(3, date_created=datetime(2024, 1, 1))
+    day = date(2024, 6, 3)
+    # 07:59, 08:15 and 15:59 in UTC+8
+    Attendance.record_punch(early.id, day, time_in=datetime(2024, 6, 2, 23, 59))
+    Attendance.record_punch(late.id, day, time_in=datetime(2024, 6, 3, 0, 15))
+    Attendance.record_punch(afternoon.id, day, time_in=datetime(2024, 6, 3, 7, 59))
+
+    update_statuses(day, day, "08:00", today=date(2024, 6, 4), utc_offset=8)
+
+    statuses = dict(db.session.query(Attendance.personnel_id, Attendance.status))
+    assert statuses == {
+        early.id: AttendanceStatus.PRESENT,
+        late.id: AttendanceStatus.LATE,
+        afternoon.id: AttendanceStatus.LATE,
+    }
+
+
+def test_update_statuses_compares_local_days_added(add_personnel):
+    """Test that personnel added in UTC are absent from their local day on."""
+    # 01:00 of January 2 in UTC+8
+    add_personnel(date_created=datetime(2024, 1, 1, 17, 0))
+
+    update_statuses(
+        date(2024, 1, 1),
+        date(2024, 1, 2),
+        "08:00",
+        today=date(2024, 1, 3),
+        utc_offset=8,
+    )
+
+    assert [record.date for record in Attendance.query] == [date(2024, 1, 2)]
+
+
+def test_update_statuses_skips_days_not_ended(add_personnel):
+    """Test that today and personnel added later are not marked absent."""
+    add_personnel(date_created=datetime(2024, 1, 1))
+
+    stats = update_statuses(
+        date(2023, 12, 31), date(2024, 6, 4), "08:00", today=date(2024, 1, 2)
+    )
+
+    assert stats["days"] == 2
+    assert [record.date for record in Attendance.query] == [date(2024, 1, 1)]
+
+
+class _Lock:
+    """Leader lock that is always acquired."""
+
+    def acquire(self):
+        return True
+
+    def release(self):
+        pass
+
+
+def test_status_job_reloads_dashboard(app, add_personnel):
+    """Test that the job reloads the dashboard counters after writing."""
+    add_personnel(date_created=datetime(2024, 1, 1))
+    app.config["ATTENDANCE_STATUS_LOOKBACK_DAYS"] = 2
+    app.config["WORK_START_TIME"] = "08:00"
+    app.config["ATTENDANCE_UTC_OFFSET"] = 8
+    app.dashboard_counters = DashboardCounters()
+    app.dashboard_counters.reconcile()
+
+    stats = run_status_job(app, _Lock(), today=date(2024, 1, 3))
+
+    assert stats["absent"] == 2
+    assert not app.dashboard_counters.is_stale()
@@ -0,0 +1,86 @@
+"""
+Test the atomic time in/time out upsert.
+"""
+
+from datetime import date, datetime
+
+from app.models import db, Attendance, PendingAttendance, Personnel
+from app.models.attendance import AttendanceType
+
+
+def test_record_punch_creates_and_updates_one_row(personnel):
+    """Test that punches for a day update a single attendance record."""
+    day = date(2024, 6, 3)
+
+    attendance, applied = Attendance.record_punch(
+        personnel.id, day, time_in=datetime(2024, 6, 3, 8, 0), time_in_image="in.jpg"
+    )
+    assert applied
+    assert attendance.time_in == datetime(2024, 6, 3, 8, 0)
+    assert attendance.time_out is None
+
+    # A later time in does not replace the first one
+    attendance, applied = Attendance.record_punch(
+        personnel.id, day, time_in=datetime(2024, 6, 3, 9, 0), time_in_image="late.jpg"
+    )
+    assert not applied
+    assert attendance.time_in == datetime(2024, 6, 3, 8, 0)
+    assert attendance.time_in_image == "in.jpg"
+
+    attendance, applied = Attendance.record_punch(
+        personnel.id,
+        day,
+        time_out=datetime(2024, 6, 3, 17, 0),
+        time_out_image="out.jpg",
+    )
+    # An earlier time out does not move the time out back
+    attendance, applied = Attendance.record_punch(
+        personnel.id,
+        day,
+        time_out=datetime(2024, 6, 3, 16, 0),
+        time_out_image="early.jpg",
+    )
+    assert not applied
+    assert attendance.time_out == datetime(2024, 6, 3, 17, 0)
+    assert attendance.time_out_image == "out.jpg"
+
+    attendance, applied = Attendance.record_punch(
+        personnel.id,
+        day,
+        time_out=datetime(2024, 6, 3, 18, 0),
+        time_out_image="last.jpg",
+    )
+    assert applied
+    assert attendance.time_out == datetime(2024, 6, 3, 18, 0)
+    assert attendance.time_out_image == "last.jpg"
+    assert attendance.time_in == datetime(2024, 6, 3, 8, 0)
+    assert Attendance.query.count() == 1
+
+
+def test_approval_reports_a_time_in_that_was_not_applied(api_client, auth_headers):
+    """Test that approving a second time in says the record kept the first."""
+    personnel = Personnel(first_name="Juan", last_name="Cruz", rank="FO1", station_id=4)
+    db.session.add(personnel)
+    db.session.commit()
+    day = date(2024, 6, 3)
+    Attendance.record_punch(personnel.id, day, time_in=datetime(2024, 6, 3, 8, 0))
+    pending = PendingAttendance(
+        personnel_id=personnel.id,
+        date=day,
+        attendance_type=AttendanceType.TIME_IN,
+        image_path="pending.jpg",
+        date_created=datetime(2024, 6, 3, 9, 0),
+    )
+    db.session.add(pending)
+    db.session.commit()
+
+    response = api_client.post(
+        "/api/v1/attendance/pending",
+        json={"pending_id": pending.id, "action": "approve"},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200
+    assert response.json["applied"] is False
+    assert "keeps its time in" in response.json["message"]
+    assert response.json["data"]["time_in"].startswith("2024-06-03T08:00")
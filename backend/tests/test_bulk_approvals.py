@@ -0,0 +1,179 @@
+"""
+Test resolving pending attendance in bulk.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from app.models import (
+    db,
+    Attendance,
+    PendingAttendance,
+    ActivityLog,
+    DailyAttendanceSummary,
+)
+from app.models.attendance import AttendanceType
+from app.models.change import ChangeCounter
+from app.services.approvals import resolve_pending_bulk
+from app.signals import attendance_recorded, pending_resolved
+from app.utils.errors import AppError, ErrorCode
+
+BULK_URL = "/api/v1/attendance/pending/bulk"
+
+
+def _pending(person, attendance_type, created):
+    pending = PendingAttendance(
+        personnel_id=person.id,
+        date=created.date(),
+        attendance_type=attendance_type,
+        image_path=f"{created:%H%M}.jpg",
+        date_created=created,
+    )
+    db.session.add(pending)
+    db.session.commit()
+    return pending.id
+
+
+def test_resolve_pending_bulk_merges_approvals(admin, personnel):
+    """Test that approvals of one day merge into one attendance record."""
+    time_out = _pending(personnel, AttendanceType.TIME_OUT, datetime(2024, 6, 3, 17, 0))
+    time_in = _pending(personnel, AttendanceType.TIME_IN, datetime(2024, 6, 3, 8, 0))
+    rejected = _pending(personnel, AttendanceType.TIME_IN, datetime(2024, 6, 4, 8, 0))
+    version, _ = ChangeCounter.current(["pending_attendance"])
+
+    received = []
+    recorded = []
+
+    def receiver(sender, **kwargs):
+        received.append(kwargs)
+
+    def record(sender, **kwargs):
+        recorded.append(kwargs)
+
+    pending_resolved.connect(receiver)
+    attendance_recorded.connect(record)
+    try:
+        items = [
+            (time_out, "approve"),
+            (time_in, "approve"),
+            (rejected, "reject"),
+            (999, "approve"),
+        ]
+        results = resolve_pending_bulk(items, admin.id)
+    finally:
+        pending_resolved.disconnect(receiver)
+        attendance_recorded.disconnect(record)
+
+    assert [result["success"] for result in results] == [True, True, True, False]
+    assert results[0]["attendance_id"] == results[1]["attendance_id"]
+    assert "attendance_id" not in results[2]
+
+    attendance = Attendance.query.one()
+    assert attendance.date == date(2024, 6, 3)
+    assert attendance.time_in == datetime(2024, 6, 3, 8, 0)
+    assert attendance.time_out == datetime(2024, 6, 3, 17, 0)
+    assert attendance.approved_by == admin.id
+    assert PendingAttendance.query.count() == 0
+    assert ActivityLog.query.count() == 3
+    assert ChangeCounter.current(["pending_attendance"])[0] > version
+
+    assert [event["pending_id"] for event in received] == [time_out, time_in, rejected]
+    assert [event["approved"] for event in received] == [True, True, False]
+    assert received[2]["attendance"] is None
+
+    # One record event for the two approvals merged into it
+    assert [event["attendance"] for event in recorded] == [attendance]
+    assert recorded[0]["station_id"] == personnel.station_id
+
+
+def test_resolve_pending_bulk_completes_existing_record(admin, personnel):
+    """Test that an approved time out completes an existing record."""
+    Attendance.record_punch(
+        personnel.id, date(2024, 6, 3), time_in=datetime(2024, 6, 3, 7, 30)
+    )
+    time_out = _pending(personnel, AttendanceType.TIME_OUT, datetime(2024, 6, 3, 17, 0))
+
+    results = resolve_pending_bulk([(time_out, "approve")], admin.id)
+
+    attendance = Attendance.query.one()
+    assert results[0]["attendance_id"] == attendance.id
+    assert attendance.time_in == datetime(2024, 6, 3, 7, 30)
+    assert attendance.time_out == datetime(2024, 6, 3, 17, 0)
+
+
+def test_resolve_pending_bulk_refreshes_summary_once(admin, personnel):
+    """Test that every station day is summarized in the bulk transaction."""
+    first = _pending(personnel, AttendanceType.TIME_IN, datetime(2024, 6, 3, 8, 0))
+    second = _pending(personnel, AttendanceType.TIME_OUT, datetime(2024, 6, 3, 17, 0))
+    rejected = _pending(personnel, AttendanceType.TIME_IN, datetime(2024, 6, 5, 8, 0))
+
+    received = []
+
+    def receiver(sender, **kwargs):
+        received.append(kwargs)
+
+    pending_resolved.connect(receiver)
+    try:
+        resolve_pending_bulk(
+            [(first, "approve"), (second, "approve"), (rejected, "reject")],
+            admin.id,
+        )
+    finally:
+        pending_resolved.disconnect(receiver)
+
+    summaries = {
+        summary.date: (summary.present, summary.pending)
+        for summary in DailyAttendanceSummary.query
+    }
+    assert summaries == {date(2024, 6, 3): (1, 0), date(2024, 6, 5): (0, 0)}
+    assert all(event["summary_refreshed"] for event in received)
+
+
+def test_resolve_pending_bulk_does_not_reload_records(admin, add_personnel):
+    """Test that the results and signals do not reload each record."""
+    personnel = add_personnel(3)
+    pending_ids = [
+        _pending(person, AttendanceType.TIME_IN, datetime(2024, 6, 3, 8, 0))
+        for person in personnel
+    ]
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    def receiver(sender, attendance=None, **kwargs):
+        attendance.to_dict()
+
+    attendance_recorded.connect(receiver)
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        results = resolve_pending_bulk(
+            [(pending_id, "approve") for pending_id in pending_ids], admin.id
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+        attendance_recorded.disconnect(receiver)
+
+    assert all(result["attendance_id"] for result in results)
+    # No attendance record is reloaded by its ID
+    assert not any("WHERE attendance.id =" in statement for statement in statements)
+
+
+def test_bulk_database_error_is_a_server_error(api_client, auth_headers, monkeypatch):
+    """Test that a failed bulk transaction returns 500 rather than 400."""
+
+    def fail(items, user_id):
+        raise AppError("Database error", ErrorCode.SYSTEM_DATABASE_ERROR)
+
+    monkeypatch.setattr("app.api.attendance.resolve_pending_bulk", fail)
+
+    response = api_client.post(
+        BULK_URL,
+        json={"pending_ids": [1], "action": "approve"},
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 500
+    assert response.get_json()["error_code"] == ErrorCode.SYSTEM_DATABASE_ERROR.value
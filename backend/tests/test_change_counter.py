@@ -0,0 +1,89 @@
+"""
+Test the change counters behind conditional list requests.
+"""
+
+from datetime import date
+
+from werkzeug.http import http_date
+
+from app.models import db, User, Personnel, Attendance, ChangeCounter
+from app.models.user import StationType
+from app.utils.conditional import ListValidators
+
+
+def _station(name):
+    station = User(
+        username=name, email=f"{name}@example.com", station_type=StationType.BACON
+    )
+    station.set_password("password")
+    db.session.add(station)
+    db.session.commit()
+    return station
+
+
+def test_writes_bump_their_station_only(app):
+    """Test that ORM and upsert writes bump the versions of their station."""
+    first, second = _station("first"), _station("second")
+    person = Personnel(first_name="Juan", last_name="Cruz", rank="FO1", station_id=first.id)
+    db.session.add(person)
+    db.session.commit()
+
+    assert ChangeCounter.current(["personnel"], first.id)[0] == 1
+    assert ChangeCounter.current(["personnel"], second.id) == (0, None)
+
+    Attendance.record_punch(person.id, date(2024, 6, 3), time_in=None)
+    assert ChangeCounter.current(["attendance"], first.id)[0] == 1
+    assert ChangeCounter.current(["attendance"], second.id)[0] == 0
+
+    # Moving a personnel changes both stations' lists
+    person.station_id = second.id
+    db.session.commit()
+    assert ChangeCounter.current(["personnel"], first.id)[0] == 2
+    assert ChangeCounter.current(["attendance"], second.id)[0] == 1
+    assert ChangeCounter.current(["personnel"])[0] == 3
+
+    # Rolled back writes leave the versions alone
+    person.rank = "FO2"
+    db.session.flush()
+    db.session.rollback()
+    assert ChangeCounter.current(["personnel"])[0] == 3
+
+
+def test_validators_answer_revalidation(app):
+    """Test that a matching ETag is not modified until the next write."""
+    station = _station("station")
+
+    with app.test_request_context():
+        validators = ListValidators(["personnel"], station.id)
+        etag = validators.etag
+
+    with app.test_request_context(headers={"If-None-Match": etag}):
+        assert ListValidators(["personnel"], station.id).not_modified()
+        assert not ListValidators(["personnel"], station.id, key=(1,)).not_modified()
+
+    db.session.add(
+        Personnel(first_name="Juan", last_name="Cruz", rank="FO1", station_id=station.id)
+    )
+    db.session.commit()
+
+    with app.test_request_context(headers={"If-None-Match": etag}):
+        assert not ListValidators(["personnel"], station.id).not_modified()
+
+
+def test_validators_ignore_if_modified_since(app):
+    """Test that whole second dates cannot hide a write in the same second."""
+    station = _station("station")
+
+    with app.test_request_context():
+        headers = ListValidators(["personnel"], station.id).headers
+    assert "Last-Modified" not in headers
+
+    db.session.add(
+        Personnel(first_name="Juan", last_name="Cruz", rank="FO1", station_id=station.id)
+    )
+    db.session.commit()
+    _, updated_at = ChangeCounter.current(["personnel"], station.id)
+
+    since = http_date(updated_at.replace(microsecond=0))
+    with app.test_request_context(headers={"If-Modified-Since": since}):
+        assert not ListValidators(["personnel"], station.id).not_modified()
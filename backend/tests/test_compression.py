@@ -0,0 +1,88 @@
+"""
+Test response compression and precompressed static files.
+"""
+
+import gzip
+import os
+
+from flask import Flask, Response
+
+from app.config import Config
+from app.utils.compression import (
+    init_compression,
+    precompress_directory,
+    send_precompressed,
+)
+
+
+def _app(tmp_path):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config["COMPRESS_STATIC_ON_STARTUP"] = False
+    init_compression(app)
+
+    @app.route("/big")
+    def big():
+        return {"data": ["x" * 10] * 500}
+
+    @app.route("/small")
+    def small():
+        return {"data": []}
+
+    @app.route("/stream")
+    def stream():
+        return Response((f"{i}\n" for i in range(1000)), mimetype="application/x-ndjson")
+
+    @app.route("/files/<path:path>")
+    def static_file(path):
+        return send_precompressed(str(tmp_path), path, 3600)
+
+    return app
+
+
+def test_json_responses_are_compressed_above_threshold(tmp_path):
+    """Test that large responses are gzipped for clients that accept it."""
+    client = _app(tmp_path).test_client()
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert b'"data"' in gzip.decompress(response.data)
+
+    assert "Content-Encoding" not in client.get("/big").headers
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == "".join(
+        f"{i}\n" for i in range(1000)
+    ).encode()
+
+
+def test_precompressed_files_are_served(tmp_path):
+    """Test that fresh .gz files are sent and hashed assets cached."""
+    (tmp_path / "app.js").write_text("console.log('hello');" * 100)
+    (tmp_path / "app.3f2a9c1b.js").write_text("console.log('hashed');" * 100)
+    assert precompress_directory(str(tmp_path)) >= 2
+    assert precompress_directory(str(tmp_path)) == 0
+
+    client = _app(tmp_path).test_client()
+    response = client.get("/files/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.mimetype in ("text/javascript", "application/javascript")
+    assert gzip.decompress(response.data).startswith(b"console.log")
+    assert response.cache_control.no_cache
+
+    response = client.get("/files/app.js")
+    assert "Content-Encoding" not in response.headers
+    assert response.data.startswith(b"console.log")
+
+    response = client.get("/files/app.3f2a9c1b.js")
+    assert response.cache_control.max_age == 3600
+    assert response.cache_control.immutable
+
+    # A changed source is sent uncompressed until precompressed again
+    os.utime(tmp_path / "app.js", ns=(0, 10**9))
+    response = client.get("/files/app.js", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,101 @@
+"""
+Test the in-memory dashboard counters.
+"""
+
+import threading
+from datetime import datetime, time
+
+from app.models import db, Attendance, AttendanceStatus
+from app.services.dashboard import DashboardCounters
+
+
+def test_counters_follow_events_and_reconcile(station, add_personnel):
+    """Test that event updates match a reload from the database."""
+    personnel = add_personnel(3)
+
+    counters = DashboardCounters()
+    counters.reconcile()
+    today = datetime.now().date()
+
+    attendance = Attendance(
+        personnel_id=personnel[0].id,
+        date=today,
+        time_in=datetime.now(),
+        status=AttendanceStatus.LATE,
+    )
+    db.session.add(attendance)
+    db.session.commit()
+    counters.record_attendance(personnel[0].id, station.id, today, attendance)
+
+    stats = counters.snapshot(station.id)["stations"][station.id]
+    assert stats["personnel"] == 3
+    assert stats["timed_in"] == 1
+    assert stats["late"] == 1
+    assert stats["not_recorded"] == 2
+
+    # Timing out moves the personnel from timed in to timed out
+    attendance.time_out = datetime.now()
+    db.session.commit()
+    counters.record_attendance(personnel[0].id, station.id, today, attendance)
+
+    stats = counters.snapshot(station.id)["stations"][station.id]
+    assert (stats["timed_in"], stats["timed_out"], stats["late"]) == (0, 1, 1)
+    assert counters.reconcile() == 0
+
+
+def test_late_and_absent_are_counted_before_the_day_ends(station, add_personnel):
+    """Test that today's late and absent counts do not wait for the status job."""
+    personnel = add_personnel(3)
+    today = datetime.now().date()
+    # Work started at midnight UTC, so a time in a minute later is late
+    counters = DashboardCounters("00:00", 0)
+    counters.reconcile()
+
+    attendance, _ = Attendance.record_punch(
+        personnel[0].id, today, time_in=datetime.combine(today, time(0, 1))
+    )
+    assert attendance.status == AttendanceStatus.PRESENT
+    counters.record_attendance(personnel[0].id, station.id, today, attendance)
+
+    stats = counters.snapshot(station.id)["stations"][station.id]
+    assert (stats["late"], stats["absent"], stats["not_recorded"]) == (1, 2, 0)
+    assert counters.reconcile() == 0
+    assert counters.snapshot(station.id)["stations"][station.id] == stats
+
+    # Before the start of work nobody is late or absent yet
+    counters = DashboardCounters("23:59", -24)
+    counters.reconcile()
+    stats = counters.snapshot(station.id)["stations"][station.id]
+    assert (stats["late"], stats["absent"], stats["not_recorded"]) == (0, 0, 2)
+
+
+def test_reconcile_corrects_drift(app):
+    """Test that a reload corrects counters that missed an event."""
+    counters = DashboardCounters()
+    counters.reconcile()
+    counters.add_pending(1, 5)
+
+    assert counters.snapshot()["totals"]["pending"] == 5
+    assert counters.reconcile() == 1
+    assert counters.snapshot()["totals"]["pending"] == 0
+
+
+def test_writes_without_signals_make_counters_stale(add_personnel):
+    """Test that writes outside this process are noticed from the versions."""
+    counters = DashboardCounters()
+    counters.reconcile()
+    assert not counters.is_stale()
+
+    # E.g. seeded from manage.py, so no signal reaches these counters
+    add_personnel(first_name="Juan", last_name="Cruz")
+
+    assert counters.is_stale()
+    assert counters.reconcile() == 1
+    assert counters.snapshot()["totals"]["personnel"] == 1
+    assert not counters.is_stale()
+
+
+def test_reconcile_thread_is_off_when_testing(api_app):
+    """Test that the testing configuration starts no reconcile thread."""
+    assert not api_app.config["DASHBOARD_RECONCILE_ENABLED"]
+    assert "dashboard-reconcile" not in {t.name for t in threading.enumerate()}
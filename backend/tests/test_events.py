@@ -0,0 +1,170 @@
+"""
+Test the server-sent event broker and the feed shared by processes.
+"""
+
+from datetime import datetime
+
+from app.models import db, LiveEvent, Personnel, PendingAttendance
+from app.models.attendance import AttendanceType
+from app.services.events import ALL_CHANNEL, EventBroker, EventFeed, stream_events
+
+PENDING_URL = "/api/v1/attendance/pending"
+
+
+def test_broker_replays_events_per_channel():
+    """Test that events are replayed after an ID to their channels only."""
+    broker = EventBroker(buffer_size=10)
+    first = broker.publish("attendance", 1, {"personnel_id": 1})
+    second = broker.publish("attendance", 2, {"personnel_id": 2})
+    third = broker.publish("pending_created", 1, {"personnel_id": 3})
+
+    events, complete = broker.events_after(1, first)
+    assert complete
+    assert [event.id for event in events] == [third]
+
+    events, complete = broker.events_after(ALL_CHANNEL, 0)
+    assert complete
+    assert [event.id for event in events] == [first, second, third]
+
+    events, complete = broker.events_after(3, 0)
+    assert complete and events == []
+
+
+def test_broker_detects_evicted_events():
+    """Test that a client behind the ring buffer is told to reset."""
+    broker = EventBroker(buffer_size=2)
+    ids = [broker.publish("attendance", 1, {"n": n}) for n in range(4)]
+
+    events, complete = broker.events_after(1, ids[0])
+    assert not complete
+
+    events, complete = broker.events_after(1, ids[1])
+    assert complete
+    assert [event.id for event in events] == ids[2:]
+
+
+def test_stream_events_sends_missed_events_and_heartbeats():
+    """Test the event stream of a reconnecting client."""
+    broker = EventBroker(buffer_size=10)
+    first = broker.publish("attendance", 1, {"personnel_id": 1})
+    broker.publish("attendance", 1, {"personnel_id": 2})
+
+    chunks = list(stream_events(broker, 1, first, heartbeat=0.05, max_duration=0.12))
+    assert chunks[0].startswith("retry:")
+    assert chunks[1].startswith("id: 2\nevent: attendance\n")
+    assert '"personnel_id":2' in chunks[1]
+    assert all(chunk == ": heartbeat\n\n" for chunk in chunks[2:])
+
+    # IDs from before a restart cannot be replayed
+    chunks = list(stream_events(broker, 1, 99, heartbeat=0.05, max_duration=0.05))
+    assert "event: reset" in chunks[1]
+
+
+def test_feed_shares_events_between_processes(app):
+    """Test that events stored by one process are published by the others."""
+    first = EventFeed(EventBroker(buffer_size=10))
+    second = EventFeed(EventBroker(buffer_size=10))
+
+    first.record("attendance", 1, {"time_in": datetime(2024, 6, 3, 8, 0)})
+    first.record("pending_created", 2, {"personnel_id": 3})
+    assert second.poll() == 2
+
+    for feed in (first, second):
+        events, complete = feed.broker.events_after(ALL_CHANNEL, 0)
+        assert complete
+        assert [(event.id, event.type) for event in events] == [
+            (1, "attendance"),
+            (2, "pending_created"),
+        ]
+        assert events[0].data == {"time_in": "2024-06-03T08:00:00"}
+
+
+def test_feed_waits_for_missing_ids(app):
+    """Test that an event is held back while an earlier ID may commit."""
+    feed = EventFeed(EventBroker(buffer_size=10), gap_timeout=60)
+    db.session.add(LiveEvent(id=2, station_id=1, event_type="attendance", data="{}"))
+    db.session.commit()
+
+    assert feed.poll() == 0
+    db.session.add(LiveEvent(id=1, station_id=1, event_type="attendance", data="{}"))
+    db.session.commit()
+    assert feed.poll() == 2
+
+    # A gap that is never filled is skipped after the timeout
+    feed.gap_timeout = 0
+    db.session.add(LiveEvent(id=4, station_id=1, event_type="attendance", data="{}"))
+    db.session.commit()
+    assert feed.poll() == 1
+    assert feed.broker.last_id == 4
+
+
+def test_broker_does_not_replay_events_from_before_it_started():
+    """Test that clients behind the broker's first ID are told to reset."""
+    broker = EventBroker(buffer_size=10, last_id=5)
+    event_id = broker.publish("attendance", 1, {"n": 1})
+
+    assert event_id == 6
+    events, complete = broker.events_after(1, 5)
+    assert complete and [event.id for event in events] == [6]
+    _, complete = broker.events_after(1, 4)
+    assert not complete
+
+
+def test_feed_prunes_old_events(app):
+    """Test that events past their retention are deleted."""
+    feed = EventFeed(EventBroker(buffer_size=10))
+    db.session.add(
+        LiveEvent(
+            station_id=1,
+            event_type="attendance",
+            data="{}",
+            date_created=datetime(2024, 6, 3),
+        )
+    )
+    db.session.commit()
+    feed.record("attendance", 1, {})
+
+    assert feed.prune(3600) == 1
+    assert LiveEvent.query.count() == 1
+
+
+def _pending(station_id, created):
+    person = Personnel(
+        first_name="Juan", last_name="Cruz", rank="FO1", station_id=station_id
+    )
+    db.session.add(person)
+    db.session.commit()
+    pending = PendingAttendance(
+        personnel_id=person.id,
+        date=created.date(),
+        attendance_type=AttendanceType.TIME_IN,
+        image_path="pending.jpg",
+        date_created=created,
+    )
+    db.session.add(pending)
+    db.session.commit()
+    return person.id, pending.id
+
+
+def test_approval_publishes_attendance_event(api_app, api_client, auth_headers):
+    """Test that an approved punch is published as an attendance event."""
+    personnel_id, pending_id = _pending(4, datetime.now())
+    api_app.dashboard_counters.reconcile()
+    broker = api_app.event_broker
+    last_id = broker.last_id
+
+    response = api_client.post(
+        PENDING_URL,
+        json={"pending_id": pending_id, "action": "approve"},
+        headers=auth_headers(1),
+    )
+    assert response.status_code == 200
+
+    events, _ = broker.events_after(4, last_id)
+    assert [event.type for event in events] == ["pending_approved", "attendance"]
+    assert events[1].data["personnel_id"] == personnel_id
+    assert events[1].data["time_in"] is not None
+
+    # The punch is counted once, and the approval leaves the queue
+    stats = api_app.dashboard_counters.snapshot(4)["stations"][4]
+    assert (stats["timed_in"], stats["pending"]) == (1, 0)
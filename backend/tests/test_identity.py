@@ -0,0 +1,77 @@
+"""
+Test the cached identity loader.
+"""
+
+import time
+
+from sqlalchemy import event
+
+from app.models import db, User
+from app.utils.identity import identity_cache, load_identity
+
+
+def _count_statements():
+    statements = []
+
+    def count(*args):
+        statements.append(args)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    return statements, lambda: event.remove(db.engine, "before_cursor_execute", count)
+
+
+def test_identity_is_cached(station):
+    """Test that a cached identity does not query the user table."""
+    identity_cache.clear()
+    user_id = station.id
+    db.session.expunge_all()
+
+    statements, stop = _count_statements()
+    try:
+        first = load_identity(user_id)
+        second = load_identity(str(user_id))
+    finally:
+        stop()
+
+    assert len(statements) == 1
+    assert first == second
+    assert first.station_id == user_id
+    assert first.is_admin is False
+
+
+def test_update_invalidates_identity(station):
+    """Test that changing a user drops the cached identity."""
+    identity_cache.clear()
+    assert load_identity(station.id).is_admin is False
+
+    station.is_admin = True
+    db.session.commit()
+
+    assert load_identity(station.id).is_admin is True
+
+
+def test_delete_invalidates_identity(station):
+    """Test that a deleted user no longer has an identity."""
+    identity_cache.clear()
+    user_id = station.id
+    assert load_identity(user_id) is not None
+
+    db.session.delete(station)
+    db.session.commit()
+
+    assert load_identity(user_id) is None
+
+
+def test_identity_expires(station, monkeypatch):
+    """Test that an identity changed by another process is reloaded after the TTL."""
+    identity_cache.clear()
+    assert load_identity(station.id).is_admin is False
+
+    # A write from another worker does not invalidate this process' cache
+    db.session.execute(User.__table__.update().values(is_admin=True))
+    db.session.commit()
+    assert load_identity(station.id).is_admin is False
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + identity_cache.ttl + 1)
+    assert load_identity(station.id).is_admin is True
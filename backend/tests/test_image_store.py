@@ -0,0 +1,118 @@
+"""
+Test the content-addressed image store.
+"""
+
+import os
+import hashlib
+import threading
+from datetime import date
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.image_store import ImageStore, ImageStoreRegistry
+from app.services.image_writer import ImageWriter
+
+
+def _frame(value=0):
+    """Create a small frame with a colored half."""
+    frame = np.zeros((16, 16, 3), dtype=np.uint8)
+    frame[:, :8] = (value, 0, 255)
+    return frame
+
+
+def _encoded(frame, ext):
+    """Encode a frame in a lossless format."""
+    ok, encoded = cv2.imencode(ext, frame)
+    assert ok
+    return encoded.tobytes()
+
+
+def test_put_shards_by_date_and_digest(tmp_path):
+    """Test that images are stored under date and hash subdirectories."""
+    store = ImageStore(str(tmp_path / "attendance_images_temp"))
+
+    stored_path = store.put(_encoded(_frame(), ".png"), day=date(2024, 5, 1))
+
+    name, year, month, day, shard, filename = stored_path.split("/")
+    assert name == "attendance_images_temp"
+    assert (year, month, day) == ("2024", "05", "01")
+    assert filename.startswith(shard)
+    assert filename.endswith(".jpg")
+    assert os.path.exists(store.absolute_path(stored_path.split("/", 1)[1]))
+
+
+def test_put_names_files_after_upload(tmp_path):
+    """Test that the name is the digest of the upload, stored as JPEG."""
+    store = ImageStore(str(tmp_path / "attendance_images_temp"))
+    data = _encoded(_frame(), ".png")
+
+    stored_path = store.put(data, day=date(2024, 5, 1))
+
+    with open(store.absolute_path(stored_path.split("/", 1)[1]), "rb") as f:
+        content = f.read()
+    assert content[:2] == b"\xff\xd8"
+    assert stored_path.endswith(f"/{hashlib.sha256(data).hexdigest()}.jpg")
+
+
+def test_put_leaves_decoding_to_the_writer(tmp_path):
+    """Test that uploads are decoded on the writer thread, not the caller's."""
+    writer = ImageWriter(workers=1)
+    writer.start()
+    store = ImageStore(str(tmp_path / "attendance_images_temp"), writer)
+    decode = writer._decode
+    threads = []
+
+    def record_thread(frame):
+        threads.append(threading.current_thread())
+        return decode(frame)
+
+    writer._decode = record_thread
+    stored_path = store.put(_encoded(_frame(), ".png"), day=date(2024, 5, 1))
+    writer.shutdown()
+
+    assert threads and threading.current_thread() not in threads
+    assert cv2.imread(store.absolute_path(stored_path.split("/", 1)[1])) is not None
+
+
+def test_put_deduplicates_identical_content(tmp_path):
+    """Test that the same upload on the same day shares a file."""
+    store = ImageStore(str(tmp_path / "attendance_images_temp"))
+
+    first = store.put(_encoded(_frame(), ".png"), day=date(2024, 5, 1))
+    second = store.put(_encoded(_frame(), ".png"), day=date(2024, 5, 1))
+    other = store.put(_encoded(_frame(128), ".png"), day=date(2024, 5, 1))
+    next_day = store.put(_encoded(_frame(), ".png"), day=date(2024, 5, 2))
+
+    assert first == second
+    assert first != other
+    assert first.rsplit("/", 1)[1] == next_day.rsplit("/", 1)[1]
+    assert first != next_day
+
+
+def test_put_rejects_data_that_is_not_an_image(tmp_path):
+    """Test that data that is not an image gets no path and no file."""
+    store = ImageStore(str(tmp_path / "attendance_images_temp"))
+
+    with pytest.raises(ValueError):
+        store.put(b"not an image", day=date(2024, 5, 1))
+
+    assert not os.path.exists(store.root)
+
+
+def test_registry_resolves_stored_paths(tmp_path):
+    """Test resolving new, legacy and invalid stored paths."""
+    store = ImageStore(str(tmp_path / "attendance_images_temp"))
+    stores = ImageStoreRegistry()
+    stores.register("attendance", store)
+
+    stored_path = store.put(_frame(), day=date(2024, 5, 1))
+    assert os.path.exists(stores.resolve(stored_path))
+
+    legacy = stores.resolve("attendance_images_temp/manual_time_in_1.jpg")
+    assert legacy == os.path.join(store.root, "manual_time_in_1.jpg")
+
+    assert stores.resolve("attendance_images_temp/../secret.txt") is None
+    assert stores.resolve("unknown/file.jpg") is None
+    assert stores.resolve(None) is None
@@ -0,0 +1,70 @@
+"""
+Test the background attendance image writer.
+"""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.image_writer import ImageWriter
+
+
+def _jpeg_bytes():
+    """Create a small JPEG image."""
+    frame = np.zeros((32, 32, 3), dtype=np.uint8)
+    frame[:, :16] = (0, 0, 255)
+    ok, encoded = cv2.imencode(".jpg", frame)
+    assert ok
+    return encoded.tobytes()
+
+
+def test_writer_flushes_on_shutdown(tmp_path):
+    """Test that queued frames are written before shutdown returns."""
+    writer = ImageWriter(workers=2, queue_size=4, jpeg_quality=70)
+    writer.start()
+
+    paths = [str(tmp_path / "day" / f"{i}.jpg") for i in range(10)]
+    for path in paths:
+        assert writer.submit(path, _jpeg_bytes()) == path
+
+    writer.shutdown()
+
+    for path in paths:
+        assert os.path.exists(path)
+        assert cv2.imread(path) is not None
+
+    metrics = writer.metrics()
+    assert metrics["written"] == 10
+    assert metrics["failed"] == 0
+    assert metrics["queue_depth"] == 0
+    assert metrics["in_flight"] == 0
+
+
+def test_writer_synchronous_mode(tmp_path):
+    """Test that a writer without threads writes on the calling thread."""
+    writer = ImageWriter(workers=0, fsync="always")
+    path = str(tmp_path / "frame.jpg")
+
+    writer.submit(path, np.zeros((8, 8, 3), dtype=np.uint8))
+
+    assert os.path.exists(path)
+    assert writer.metrics()["sync_writes"] == 1
+
+
+def test_writer_counts_failures(tmp_path):
+    """Test that undecodable frames are counted and not written."""
+    writer = ImageWriter(workers=0)
+    path = str(tmp_path / "broken.jpg")
+
+    writer.submit(path, b"not an image")
+
+    assert not os.path.exists(path)
+    assert writer.metrics()["failed"] == 1
+
+
+def test_writer_rejects_unknown_fsync_policy():
+    """Test that an unknown fsync policy is rejected."""
+    with pytest.raises(ValueError):
+        ImageWriter(fsync="sometimes")
@@ -0,0 +1,78 @@
+"""
+Test serving stored images.
+"""
+
+import numpy as np
+
+from app.models import db, Personnel
+
+
+def _profile_image(app, station_id=3):
+    """Store a profile picture for a personnel of a station."""
+    frame = np.zeros((40, 30, 3), dtype=np.uint8)
+    frame[:, :15] = (0, 0, 255)
+    image_path = app.image_stores["faces"].put(frame)
+    db.session.add(
+        Personnel(
+            first_name="Juan",
+            last_name="Cruz",
+            rank="FO1",
+            station_id=station_id,
+            image_path=image_path,
+        )
+    )
+    db.session.commit()
+    return image_path
+
+
+def test_image_etag_and_not_modified(api_app, api_client, auth_headers):
+    """Test that images carry a content ETag and revalidate to 304."""
+    image_path = _profile_image(api_app)
+    url = f"/api/v1/images/{image_path}"
+    headers = auth_headers(3)
+
+    response = api_client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "image/jpeg"
+    etag, weak = response.get_etag()
+    assert not weak
+    assert image_path.endswith(f"/{etag}.jpg")
+    assert "private" in response.headers["Cache-Control"]
+
+    response = api_client.get(url, headers={**headers, "If-None-Match": f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    # Other stations cannot tell the image exists
+    assert api_client.get(url, headers=auth_headers(4)).status_code == 404
+
+
+def test_image_range_request(api_app, api_client, auth_headers):
+    """Test that a Range request gets partial content."""
+    url = f"/api/v1/images/{_profile_image(api_app)}"
+    headers = auth_headers(3)
+    full = api_client.get(url, headers=headers).data
+
+    response = api_client.get(url, headers={**headers, "Range": "bytes=0-9"})
+
+    assert response.status_code == 206
+    assert response.data == full[:10]
+    assert response.headers["Content-Range"] == f"bytes 0-9/{len(full)}"
+
+
+def test_image_accel_redirect(api_app, api_client, auth_headers):
+    """Test that the transfer is handed to the proxy when configured."""
+    api_app.config["IMAGE_ACCEL_REDIRECT_PREFIX"] = "/protected/"
+    image_path = _profile_image(api_app)
+    url = f"/api/v1/images/{image_path}"
+    headers = auth_headers(3)
+
+    response = api_client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["X-Accel-Redirect"] == f"/protected/{image_path}"
+    assert response.data == b""
+    etag, _ = response.get_etag()
+
+    response = api_client.get(url, headers={**headers, "If-None-Match": f'"{etag}"'})
+    assert response.status_code == 304
+    assert "X-Accel-Redirect" not in response.headers
@@ -0,0 +1,83 @@
+"""
+Test the monthly attendance matrix.
+"""
+
+from datetime import date, datetime
+
+from app.models import db, Attendance, AttendanceStatus
+from app.services.monthly_matrix import build_monthly_matrix, MonthlyMatrixCache
+
+
+def _personnel(add_personnel):
+    (cruz,) = add_personnel(first_name="Juan", last_name="Cruz")
+    (abad,) = add_personnel(first_name="Ana", last_name="Abad", rank="FO2")
+    return cruz, abad
+
+
+def test_build_monthly_matrix(station, add_personnel):
+    """Test that statuses, hours and totals land in the right cells."""
+    cruz, abad = _personnel(add_personnel)
+    db.session.add_all(
+        [
+            Attendance(
+                personnel_id=cruz.id,
+                date=date(2024, 2, 1),
+                time_in=datetime(2024, 2, 1, 8, 0),
+                time_out=datetime(2024, 2, 1, 17, 30),
+                status=AttendanceStatus.PRESENT,
+            ),
+            Attendance(
+                personnel_id=cruz.id,
+                date=date(2024, 2, 29),
+                time_in=datetime(2024, 2, 29, 9, 0),
+                status=AttendanceStatus.LATE,
+            ),
+            Attendance(
+                personnel_id=abad.id,
+                date=date(2024, 2, 1),
+                status=AttendanceStatus.ABSENT,
+            ),
+            # Outside the month
+            Attendance(
+                personnel_id=abad.id,
+                date=date(2024, 3, 1),
+                status=AttendanceStatus.ABSENT,
+            ),
+        ]
+    )
+    db.session.commit()
+
+    matrix = build_monthly_matrix(station.id, 2024, 2)
+
+    assert matrix["days"] == list(range(1, 30))
+    # Ordered by last name
+    abad_row, cruz_row = matrix["rows"]
+    assert abad_row["personnel_id"] == abad.id
+    assert abad_row["statuses"][0] == "A" and abad_row["absent"] == 1
+    assert abad_row["hours"][0] is None and abad_row["hours_total"] == 0
+
+    assert cruz_row["full_name"] == "FO1 Juan Cruz"
+    assert cruz_row["statuses"][0] == "P" and cruz_row["statuses"][28] == "L"
+    assert cruz_row["statuses"][1:28] == [""] * 27
+    assert cruz_row["hours"][0] == 9.5 and cruz_row["hours"][28] is None
+    assert cruz_row["present"] == 1 and cruz_row["late"] == 1
+    assert cruz_row["hours_total"] == 9.5
+
+    assert matrix["totals"]["present"][0] == 1
+    assert matrix["totals"]["absent"][0] == 1
+    assert matrix["totals"]["hours"][0] == 9.5
+
+
+def test_monthly_matrix_cache_follows_changes(station, add_personnel):
+    """Test that a cached matrix is rebuilt once the station's data changes."""
+    cruz, _ = _personnel(add_personnel)
+    cache = MonthlyMatrixCache()
+
+    first = cache.get(station.id, 2024, 2)
+    assert cache.get(station.id, 2024, 2) is first
+
+    Attendance.record_punch(cruz.id, date(2024, 2, 5), time_in=datetime(2024, 2, 5, 8))
+    rebuilt = cache.get(station.id, 2024, 2)
+
+    assert rebuilt is not first
+    assert rebuilt["totals"]["present"][4] == 1
@@ -0,0 +1,142 @@
+"""
+Test the personnel roster import.
+"""
+
+from app.models import db, User, Personnel, ActivityLog
+from app.models.change import ChangeCounter
+from app.models.user import StationType
+from app.services.personnel_import import import_personnel, parse_csv
+from app.utils.errors import AppError, ErrorCode
+from app.utils.identity import Identity
+
+IMPORT_URL = "/api/v1/personnel/import"
+ROWS = [{"first_name": "Juan", "last_name": "Cruz", "rank": "FO1"}]
+
+
+def _stations():
+    stations = []
+    for station_type in (StationType.BACON, StationType.ABUYOG):
+        name = station_type.name.lower()
+        station = User(
+            username=name, email=f"{name}@example.com", station_type=station_type
+        )
+        station.set_password("password")
+        stations.append(station)
+    db.session.add_all(stations)
+    db.session.commit()
+    return [station.id for station in stations]
+
+
+def _identity(user_id, is_admin=False):
+    return Identity(
+        id=user_id, is_admin=is_admin, station_id=user_id, station_type=None
+    )
+
+
+def test_parse_csv_normalizes_headers():
+    """Test that CSV headers map to column names and blank rows are skipped."""
+    rows = parse_csv("﻿First Name,Last Name,RANK\nJuan,Cruz,FO1\n,,\n")
+    assert rows == [{"first_name": "Juan", "last_name": "Cruz", "rank": "FO1"}]
+
+
+def test_import_personnel_creates_and_updates(app):
+    """Test that a roster is diffed against existing personnel by name."""
+    bacon, abuyog = _stations()
+    existing = Personnel(
+        first_name="Juan", last_name="Cruz", rank="FO1", station_id=bacon
+    )
+    same = Personnel(first_name="Ana", last_name="Lim", rank="FO2", station_id=bacon)
+    db.session.add_all([existing, same])
+    db.session.commit()
+    version, _ = ChangeCounter.current(["personnel"], bacon)
+
+    rows = [
+        {"first_name": " juan ", "last_name": "CRUZ", "rank": "FO2"},
+        {"first_name": "Ana", "last_name": "Lim", "rank": "FO2"},
+        {"first_name": "Maria", "last_name": "Santos", "rank": "FO1"},
+        {
+            "first_name": "Juan",
+            "last_name": "Cruz",
+            "rank": "FO1",
+            "station_id": abuyog,
+        },
+    ]
+    applied, report = import_personnel(rows, _identity(bacon, True), False, bacon)
+
+    assert applied
+    assert [entry["action"] for entry in report["rows"]] == [
+        "update",
+        "unchanged",
+        "create",
+        "create",
+    ]
+    assert report["rows"][0]["personnel_id"] == existing.id
+    assert (report["created"], report["updated"], report["unchanged"]) == (2, 1, 1)
+
+    db.session.expire_all()
+    assert existing.rank == "FO2"
+    assert existing.first_name == "juan"
+    created = db.session.get(Personnel, report["rows"][2]["personnel_id"])
+    assert created.full_name == "FO1 Maria Santos"
+    assert Personnel.query.filter_by(station_id=abuyog).count() == 1
+    assert ActivityLog.query.count() == 1
+    assert ChangeCounter.current(["personnel"], bacon)[0] > version
+
+
+def test_import_personnel_rejects_invalid_rosters(app):
+    """Test that a roster with invalid rows changes nothing."""
+    bacon, abuyog = _stations()
+    rows = [
+        {"first_name": "Maria", "last_name": "Santos", "rank": "FO1"},
+        {"first_name": "maria", "last_name": "santos", "rank": "FO2"},
+        {
+            "first_name": "Pedro",
+            "last_name": "Reyes",
+            "rank": "FO1",
+            "station_id": abuyog,
+        },
+        {"first_name": "Jose", "last_name": "Rizal", "station_id": "x"},
+    ]
+    applied, report = import_personnel(rows, _identity(bacon), False, bacon)
+
+    assert not applied
+    assert report["failed"] == 3
+    assert report["rows"][1]["errors"] == ["Same personnel as row 1"]
+    assert report["rows"][2]["errors"] == ["Access denied to this station"]
+    assert report["rows"][3]["errors"] == ["Missing rank", "Invalid station_id"]
+    assert Personnel.query.count() == 0
+
+
+def test_import_personnel_dry_run(app):
+    """Test that a dry run reports the changes without writing them."""
+    bacon, _ = _stations()
+    rows = [{"first_name": "Maria", "last_name": "Santos", "rank": "FO1"}]
+
+    applied, report = import_personnel(rows, _identity(bacon), True, bacon)
+
+    assert applied
+    assert report["dry_run"] and report["created"] == 1
+    assert Personnel.query.count() == 0
+    assert ActivityLog.query.count() == 0
+
+
+def test_import_api_status_codes(api_client, auth_headers, monkeypatch):
+    """Test that import errors keep their own status codes."""
+    headers = auth_headers(3)
+
+    response = api_client.post(
+        f"{IMPORT_URL}?station_id=4", json={"personnel": ROWS}, headers=headers
+    )
+    assert response.status_code == 403
+
+    response = api_client.post(
+        IMPORT_URL, json={"personnel": [{"first_name": "Juan"}]}, headers=headers
+    )
+    assert response.status_code == 400
+
+    def fail(*args):
+        raise AppError("Database error", ErrorCode.SYSTEM_DATABASE_ERROR)
+
+    monkeypatch.setattr("app.api.personnel.import_personnel", fail)
+    response = api_client.post(IMPORT_URL, json={"personnel": ROWS}, headers=headers)
+    assert response.status_code == 500
@@ -0,0 +1,29 @@
+"""
+Test that personnel serialization does not issue a query per row.
+"""
+
+from sqlalchemy import event
+
+from app.models import db, Personnel, FaceData
+
+
+def test_to_dict_list_uses_constant_queries(add_personnel):
+    """Test that listing personnel does not query face data per person."""
+    personnel = add_personnel(20)
+    db.session.add(FaceData(personnel_id=personnel[3].id, filename="face.jpg"))
+    db.session.commit()
+
+    statements = []
+
+    def count(*args):
+        statements.append(args)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        result = Personnel.to_dict_list(Personnel.query.all())
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert len(statements) == 2
+    assert [p["has_face_data"] for p in result].count(True) == 1
+    assert result[3]["has_face_data"] is True
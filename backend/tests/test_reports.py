@@ -0,0 +1,218 @@
+"""
+Test the report writers, progress registry and export endpoints.
+"""
+
+import csv
+import io
+from datetime import date, datetime
+
+import pytest
+
+from app.models import db, ActivityLog, Attendance, Personnel
+from app.models.attendance import AttendanceStatus
+from app.services.reports import ReportProgress, write_csv
+
+REPORTS_URL = "/api/v1/reports"
+
+
+def test_write_csv_formats_values():
+    """Test that CSV output formats dates, enums, booleans and nulls."""
+    rows = [
+        (date(2024, 6, 3), datetime(2024, 6, 3, 8, 0), AttendanceStatus.LATE, True, None)
+    ] * 1200
+
+    data = b"".join(write_csv("Test", ["Date", "Time", "Status", "Auto", "Notes"], rows))
+    lines = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+
+    assert lines[0] == ["Date", "Time", "Status", "Auto", "Notes"]
+    assert lines[1] == ["2024-06-03", "2024-06-03 08:00:00", "Late", "Yes", ""]
+    assert len(lines) == 1201
+
+
+def test_progress_tracks_rows():
+    """Test that progress reports rows written and completion."""
+    progress = ReportProgress()
+    progress.start(1, "r1", "attendance", "csv", total=200)
+    progress.update(1, "r1", 50)
+
+    running = progress.get(1, "r1")
+    assert running["status"] == "running"
+    assert running["percent"] == 25.0
+
+    progress.update(1, "r1", 200)
+    progress.finish(1, "r1")
+    assert progress.get(1, "r1")["percent"] == 100.0
+    assert progress.get(1, "r1")["status"] == "complete"
+    assert progress.get(1, "missing") is None
+    assert progress.get(2, "r1") is None
+
+
+def test_progress_drops_oldest_entries():
+    """Test that the registry does not grow beyond its limit."""
+    progress = ReportProgress(max_entries=2)
+    for report_id in ("a", "b", "c"):
+        progress.start(1, report_id, "attendance", "csv", total=1)
+
+    assert progress.get(1, "a") is None
+    assert progress.get(1, "c") is not None
+
+
+def _seed():
+    """Add attendance and activity at the talisay (3) and bacon (4) stations."""
+    bacon = Personnel(
+        first_name="Juan",
+        last_name="Cruz",
+        rank="FO1",
+        station_id=4,
+        date_created=datetime(2024, 6, 3, 23, 59, 59, 999999),
+    )
+    talisay = Personnel(
+        first_name="Maria",
+        last_name="Abad",
+        rank="FO2",
+        station_id=3,
+        date_created=datetime(2024, 6, 4),
+    )
+    db.session.add_all([bacon, talisay])
+    db.session.commit()
+    db.session.add_all(
+        [
+            Attendance(
+                personnel_id=person.id,
+                date=date(2024, 6, 3),
+                time_in=datetime(2024, 6, 3, 8, 0),
+            )
+            for person in (bacon, talisay)
+        ]
+        + [
+            ActivityLog(
+                user_id=user_id,
+                title=f"Login {user_id}",
+                timestamp=datetime(2024, 6, 3, 23, 59, 59, 999999),
+            )
+            for user_id in (3, 4)
+        ]
+    )
+    db.session.commit()
+
+
+def _csv_rows(response):
+    return list(csv.reader(io.StringIO(response.data.decode("utf-8-sig"))))[1:]
+
+
+@pytest.mark.parametrize(
+    "url", [f"{REPORTS_URL}/attendance", "/api/v1/attendance/report"]
+)
+def test_attendance_report_is_scoped_to_the_station(api_client, auth_headers, url):
+    """Test that a station only exports its own personnel's attendance."""
+    _seed()
+
+    response = api_client.get(url, headers=auth_headers(4))
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert [row[2] for row in _csv_rows(response)] == ["Cruz"]
+
+    response = api_client.get(url, headers=auth_headers(1))
+    assert sorted(row[2] for row in _csv_rows(response)) == ["Abad", "Cruz"]
+
+    # Admins may pick a station, stations may not
+    response = api_client.get(f"{url}?station_id=3", headers=auth_headers(1))
+    assert [row[2] for row in _csv_rows(response)] == ["Abad"]
+    response = api_client.get(f"{url}?station_id=3", headers=auth_headers(4))
+    assert [row[2] for row in _csv_rows(response)] == ["Cruz"]
+
+
+def test_personnel_report_includes_the_whole_end_date(api_client, auth_headers):
+    """Test that the end date includes its last microsecond and no more."""
+    _seed()
+
+    response = api_client.get(
+        f"{REPORTS_URL}/personnel?start_date=2024-06-03&end_date=2024-06-03",
+        headers=auth_headers(1),
+    )
+
+    assert response.status_code == 200
+    assert [row[1] for row in _csv_rows(response)] == ["Cruz"]
+
+
+def test_activity_report_is_scoped_to_the_user(api_client, auth_headers):
+    """Test that a station only exports its own activity."""
+    _seed()
+
+    response = api_client.get(
+        f"{REPORTS_URL}/activity?end_date=2024-06-03", headers=auth_headers(4)
+    )
+    assert response.status_code == 200
+    assert [row[2] for row in _csv_rows(response)] == ["Login 4"]
+
+    response = api_client.get(
+        f"{REPORTS_URL}/activity?end_date=2024-06-03", headers=auth_headers(1)
+    )
+    assert sorted(row[2] for row in _csv_rows(response)) == ["Login 3", "Login 4"]
+
+
+@pytest.mark.parametrize(
+    "report_format, mimetype, magic",
+    [
+        ("csv", "text/csv", b"\xef\xbb\xbfDate"),
+        (
+            "excel",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            b"PK",
+        ),
+        ("pdf", "application/pdf", b"%PDF"),
+    ],
+)
+def test_report_downloads_each_format(
+    api_client, auth_headers, report_format, mimetype, magic
+):
+    """Test that every format downloads as an attachment."""
+    _seed()
+
+    response = api_client.get(
+        f"{REPORTS_URL}/attendance?format={report_format}", headers=auth_headers(1)
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == mimetype
+    assert response.headers["Content-Disposition"].startswith(
+        'attachment; filename="attendance_report_'
+    )
+    assert response.data.startswith(magic)
+
+
+@pytest.mark.parametrize("report", ["attendance", "personnel", "activity"])
+@pytest.mark.parametrize(
+    "query", ["format=doc", "start_date=2024-13-01", "end_date=03-06-2024"]
+)
+def test_report_rejects_bad_parameters(api_client, auth_headers, report, query):
+    """Test that an unknown format or a malformed date is a bad request."""
+    response = api_client.get(
+        f"{REPORTS_URL}/{report}?{query}", headers=auth_headers(1)
+    )
+
+    assert response.status_code == 400
+    assert response.json["success"] is False
+
+
+def test_progress_is_kept_per_user(api_client, auth_headers):
+    """Test that users choosing the same report ID get their own progress."""
+    _seed()
+
+    for user_id in (1, 4):
+        response = api_client.get(
+            f"{REPORTS_URL}/attendance?report_id=daily", headers=auth_headers(user_id)
+        )
+        assert response.headers["X-Report-Id"] == "daily"
+        assert response.data
+
+    admin = api_client.get(f"{REPORTS_URL}/progress/daily", headers=auth_headers(1))
+    station = api_client.get(f"{REPORTS_URL}/progress/daily", headers=auth_headers(4))
+    other = api_client.get(f"{REPORTS_URL}/progress/daily", headers=auth_headers(3))
+
+    assert admin.json["data"]["user_id"] == 1
+    assert admin.json["data"]["total"] == 2
+    assert station.json["data"]["user_id"] == 4
+    assert station.json["data"]["total"] == 1
+    assert station.json["data"]["status"] == "complete"
+    assert other.status_code == 404
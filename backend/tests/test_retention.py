@@ -0,0 +1,90 @@
+"""
+Test the attendance image retention cleanup.
+"""
+
+import os
+import time
+from datetime import date
+
+import numpy as np
+
+from app.services.image_store import ImageStore
+from app.services.retention import LeaderLock, RetentionEngine
+
+
+def _frame(value):
+    """Create a small frame filled with one gray level."""
+    return np.full((8, 8, 3), value, dtype=np.uint8)
+
+
+def _engine(tmp_path, store):
+    """Create a retention engine keeping images for one day."""
+    return RetentionEngine(
+        store, 1, str(tmp_path / "state" / "retention.json"), batch_pause=0
+    )
+
+
+def test_expired_partitions_are_removed(tmp_path):
+    """Test that expired partitions go and recent ones stay."""
+    store = ImageStore(str(tmp_path / "attendance_images_temp"))
+    old = store.put(_frame(10), day=date(2024, 5, 1))
+    recent = store.put(_frame(20), day=date(2024, 5, 10))
+
+    stats = _engine(tmp_path, store).run(set(), today=date(2024, 5, 10))
+
+    assert stats["partitions"] == 1
+    assert not os.path.exists(store.root + "/2024/05/01")
+    assert os.path.exists(store.absolute_path(recent.split("/", 1)[1]))
+    assert old != recent
+
+
+def test_pending_images_are_kept_until_resolved(tmp_path):
+    """Test that images of pending records survive until they are resolved."""
+    store = ImageStore(str(tmp_path / "attendance_images_temp"))
+    pending = store.put(_frame(30), day=date(2024, 5, 1))
+    store.put(_frame(40), day=date(2024, 5, 1))
+    pending_path = store.absolute_path(pending.split("/", 1)[1])
+
+    engine = _engine(tmp_path, store)
+    stats = engine.run({pending}, today=date(2024, 5, 10))
+
+    assert stats == {"partitions": 0, "files": 1, "kept": 1}
+    assert os.path.exists(pending_path)
+
+    # Once the record is resolved the partition is revisited and removed
+    stats = engine.run(set(), today=date(2024, 5, 11))
+
+    assert stats["partitions"] == 1
+    assert not os.path.exists(pending_path)
+
+
+def test_legacy_flat_files_are_cleaned(tmp_path):
+    """Test that expired flat files from before the store are deleted."""
+    store = ImageStore(str(tmp_path / "attendance_images_temp"))
+    os.makedirs(store.root)
+    expired = time.time() - 7 * 86400
+    for name in ("old.jpg", "pending.jpg"):
+        path = os.path.join(store.root, name)
+        open(path, "wb").close()
+        os.utime(path, (expired, expired))
+
+    stats = _engine(tmp_path, store).run(
+        {"attendance_images_temp/pending.jpg"}, today=date.today()
+    )
+
+    assert stats["files"] == 1
+    assert sorted(os.listdir(store.root)) == ["pending.jpg"]
+
+
+def test_leader_lock_is_exclusive(tmp_path):
+    """Test that only one holder gets the leader lock."""
+    path = str(tmp_path / "retention.lock")
+    leader = LeaderLock(path)
+    follower = LeaderLock(path)
+
+    assert leader.acquire()
+    assert not follower.acquire()
+
+    leader.release()
+    assert follower.acquire()
+    follower.release()
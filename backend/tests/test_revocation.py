@@ -0,0 +1,106 @@
+"""
+Test the revoked token stores.
+"""
+
+import time
+
+import pytest
+
+from app.services.revocation import (
+    RevocationStore,
+    MemoryRevocationStore,
+    SQLiteRevocationStore,
+)
+
+LOGOUT_URL = "/api/v1/auth/logout"
+REFRESH_URL = "/api/v1/auth/refresh"
+
+
+def test_memory_store_revokes_until_expiry(monkeypatch):
+    """Test that the memory store forgets tokens once their bucket passes."""
+    now = 1000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+
+    store = MemoryRevocationStore(bucket_seconds=60)
+    store.revoke("a", expires_at=now + 30)
+    store.revoke("b", expires_at=now + 3600)
+
+    assert store.is_revoked("a")
+    assert store.is_revoked("b")
+    assert not store.is_revoked("c")
+
+    now += 120
+    assert not store.is_revoked("a")
+    assert store.is_revoked("b")
+    assert len(store) == 1
+
+
+def test_sqlite_store_is_shared(tmp_path):
+    """Test that revocations are visible to other store instances."""
+    path = str(tmp_path / "revoked.db")
+    first = SQLiteRevocationStore(path)
+    second = SQLiteRevocationStore(path)
+
+    first.revoke("a", expires_at=time.time() + 3600)
+    first.revoke("expired", expires_at=time.time() - 1)
+
+    assert second.is_revoked("a")
+    assert not second.is_revoked("expired")
+    assert not second.is_revoked("b")
+
+
+def test_store_interface_is_abstract():
+    """Test that a store must implement both operations."""
+
+    class Incomplete(RevocationStore):
+        def revoke(self, jti, expires_at):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def _tokens(user_id):
+    from flask_jwt_extended import create_access_token, create_refresh_token
+
+    return create_access_token(identity=user_id), create_refresh_token(identity=user_id)
+
+
+def test_logout_revokes_refresh_token(api_client):
+    """Test that the refresh token sent on logout can no longer be used."""
+    access, refresh = _tokens(3)
+
+    response = api_client.post(
+        LOGOUT_URL,
+        json={"refresh_token": refresh},
+        headers={"Authorization": f"Bearer {access}"},
+    )
+    assert response.status_code == 200
+
+    response = api_client.post(
+        REFRESH_URL, headers={"Authorization": f"Bearer {refresh}"}
+    )
+    assert response.status_code == 401
+
+
+def test_logout_rejects_foreign_refresh_token(api_client):
+    """Test that a refresh token of another user is not revoked."""
+    access, _ = _tokens(3)
+    _, other = _tokens(4)
+
+    response = api_client.post(
+        LOGOUT_URL,
+        json={"refresh_token": other},
+        headers={"Authorization": f"Bearer {access}"},
+    )
+    assert response.status_code == 401
+
+    # Neither token was revoked
+    response = api_client.post(
+        REFRESH_URL, headers={"Authorization": f"Bearer {other}"}
+    )
+    assert response.status_code == 200
+    response = api_client.post(
+        LOGOUT_URL, headers={"Authorization": f"Bearer {access}"}
+    )
+    assert response.status_code == 200
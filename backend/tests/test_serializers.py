@@ -0,0 +1,68 @@
+"""
+Test the compiled model serializers.
+"""
+
+import json
+from datetime import date, datetime
+
+from app.config import json_default
+from app.models import (
+    db,
+    User,
+    Personnel,
+    Attendance,
+    AttendanceStatus,
+    AttendanceType,
+    PendingAttendance,
+)
+from app.models.serializers import serializer, serialize_many, dumps
+
+
+def _json(value):
+    return json.loads(json.dumps(value, default=json_default))
+
+
+def test_serializers_match_to_dict(station, personnel):
+    """Test that compiled serializers encode like ``to_dict``."""
+
+    records = [
+        Attendance(
+            personnel_id=personnel.id,
+            date=date(2024, 6, 3),
+            time_in=datetime(2024, 6, 3, 8, 5),
+            time_out=datetime(2024, 6, 3, 17, 0, 30),
+            status=AttendanceStatus.LATE,
+        ),
+        Attendance(personnel_id=personnel.id, date=date(2024, 6, 4), status=None),
+        PendingAttendance(
+            personnel_id=personnel.id,
+            date=date(2024, 6, 5),
+            attendance_type=AttendanceType.TIME_OUT,
+            image_path="a.jpg",
+        ),
+    ]
+    db.session.add_all(records)
+    db.session.commit()
+
+    for instance in records + [station]:
+        expected = _json(instance.to_dict())
+        assert json.loads(dumps(serializer(type(instance))(instance))) == expected
+    assert "password" not in serializer(User)(station)
+
+    # Expired attributes are loaded as usual
+    db.session.expire(records[0])
+    assert serializer(Attendance)(records[0])["status"] == "Late"
+
+    expected = _json(personnel.to_dict(has_face_data=False))
+    assert Personnel.to_dict_list([personnel]) == [expected]
+
+
+def test_field_subsets_serialize_projected_rows(app):
+    """Test that a field subset only reads the selected columns."""
+    rows = [
+        type("Row", (), {"id": 1, "date": date(2024, 6, 3), "status": AttendanceStatus.PRESENT})
+    ]
+    assert serialize_many(Attendance, rows, ["date", "status"]) == [
+        {"date": "2024-06-03", "status": "Present"}
+    ]
+    assert serializer(Attendance, ("date",)) is serializer(Attendance, ("date",))
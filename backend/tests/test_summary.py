@@ -0,0 +1,62 @@
+"""
+Test the daily attendance summary.
+"""
+
+from datetime import date
+
+from app.models import (
+    db,
+    Attendance,
+    AttendanceStatus,
+    AttendanceType,
+    PendingAttendance,
+    DailyAttendanceSummary,
+)
+from app.services.summary import refresh_daily_summary, rebuild_daily_summary
+
+
+def test_refresh_counts_one_station_day(station, add_personnel):
+    """Test that refreshing a day counts attendance by status and pending."""
+    personnel = add_personnel(4)
+    day = date(2024, 6, 3)
+    statuses = [AttendanceStatus.PRESENT, AttendanceStatus.PRESENT, AttendanceStatus.LATE]
+    db.session.add_all(
+        Attendance(personnel_id=p.id, date=day, status=status)
+        for p, status in zip(personnel, statuses)
+    )
+    db.session.add(
+        PendingAttendance(
+            personnel_id=personnel[3].id,
+            date=day,
+            attendance_type=AttendanceType.TIME_IN,
+            image_path="x.jpg",
+        )
+    )
+    db.session.commit()
+
+    refresh_daily_summary(station.id, day)
+    refresh_daily_summary(station.id, day)
+
+    summary = DailyAttendanceSummary.query.one()
+    assert (summary.present, summary.late, summary.absent, summary.pending) == (
+        2,
+        1,
+        0,
+        1,
+    )
+
+
+def test_rebuild_fills_history(station, add_personnel):
+    """Test that a rebuild writes one row per station day with records."""
+    personnel = add_personnel(2)
+    for day in (date(2024, 6, 1), date(2024, 6, 2), date(2024, 7, 15)):
+        db.session.add_all(Attendance(personnel_id=p.id, date=day) for p in personnel)
+    db.session.commit()
+
+    assert rebuild_daily_summary(batch_days=10) == 3
+    assert rebuild_daily_summary(only_missing=True) == 0
+
+    db.session.query(DailyAttendanceSummary).filter_by(date=date(2024, 6, 2)).delete()
+    db.session.commit()
+    assert rebuild_daily_summary(only_missing=True) == 1
+    assert [s.present for s in DailyAttendanceSummary.query.all()] == [2, 2, 2]
@@ -0,0 +1,106 @@
+"""
+Test thumbnail generation and the thumbnail endpoint.
+"""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from app.models import db, Personnel
+from app.services.thumbnails import ThumbnailGenerator
+
+
+def _write_image(path, width, height):
+    """Write a JPEG of the given size."""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[:, : width // 2] = (0, 0, 255)
+    assert cv2.imwrite(str(path), frame)
+    return str(path)
+
+
+def test_generate_scales_longest_edge(tmp_path):
+    """Test that every size fits its longest edge and small images keep theirs."""
+    generator = ThumbnailGenerator({"sm": 32, "md": 640}, "jpeg")
+    path = _write_image(tmp_path / "image.jpg", 200, 100)
+
+    generator.generate(path)
+
+    small = cv2.imread(generator.path_for(path, "sm"))
+    assert small.shape[:2] == (16, 32)
+    # Never scaled up
+    medium = cv2.imread(generator.path_for(path, "md"))
+    assert medium.shape[:2] == (100, 200)
+    assert generator.path_for(path, "sm") == str(tmp_path / "image.sm.jpg")
+
+
+def test_get_generates_missing_thumbnails(tmp_path):
+    """Test that thumbnails of older images are created on first request."""
+    generator = ThumbnailGenerator({"sm": 32})
+    path = _write_image(tmp_path / "image.jpg", 64, 64)
+
+    thumbnail_path = generator.get(path, "sm")
+
+    assert os.path.exists(thumbnail_path)
+    assert cv2.imread(thumbnail_path).shape[:2] == (32, 32)
+    assert generator.get(path, "sm") == thumbnail_path
+
+
+def test_get_without_source(tmp_path):
+    """Test that a missing original has no thumbnail and sizes are checked."""
+    generator = ThumbnailGenerator({"sm": 32})
+
+    assert generator.get(str(tmp_path / "missing.jpg"), "sm") is None
+    with pytest.raises(ValueError):
+        generator.get(str(tmp_path / "missing.jpg"), "xl")
+
+
+def _profile_image(app, station_id):
+    """Store a profile picture for a personnel of a station."""
+    frame = np.zeros((400, 300, 3), dtype=np.uint8)
+    image_path = app.image_stores["faces"].put(frame)
+    db.session.add(
+        Personnel(
+            first_name="Juan",
+            last_name="Cruz",
+            rank="FO1",
+            station_id=station_id,
+            image_path=image_path,
+        )
+    )
+    db.session.commit()
+    return image_path
+
+
+def test_thumbnail_endpoint_checks_station_access(api_app, api_client, auth_headers):
+    """Test that stations only get thumbnails of their own personnel."""
+    image_path = _profile_image(api_app, station_id=3)
+    url = f"/api/v1/images/thumbnails/sm/{image_path}"
+
+    response = api_client.get(url, headers=auth_headers(3))
+    assert response.status_code == 200
+    assert "immutable" in response.headers["Cache-Control"]
+    thumbnail = cv2.imdecode(np.frombuffer(response.data, np.uint8), cv2.IMREAD_COLOR)
+    assert max(thumbnail.shape[:2]) == api_app.config["THUMBNAIL_SIZES"]["sm"]
+
+    assert api_client.get(url, headers=auth_headers(1)).status_code == 200
+    assert api_client.get(url, headers=auth_headers(4)).status_code == 404
+
+
+def test_thumbnail_endpoint_errors(api_app, api_client, auth_headers):
+    """Test unknown sizes and images whose file is gone."""
+    image_path = _profile_image(api_app, station_id=3)
+
+    response = api_client.get(
+        f"/api/v1/images/thumbnails/xl/{image_path}", headers=auth_headers(3)
+    )
+    assert response.status_code == 400
+
+    path = api_app.image_stores.resolve(image_path)
+    for name in os.listdir(os.path.dirname(path)):
+        os.remove(os.path.join(os.path.dirname(path), name))
+    response = api_client.get(
+        f"/api/v1/images/thumbnails/md/{image_path}", headers=auth_headers(3)
+    )
+    assert response.status_code == 404
@@ -102,8 +102,12 @@ export class AuthService {
     try {
       // Only call API if we have a token
       if (this.isAuthenticated()) {
+        // Send the refresh token so it is revoked too
         await this.api.request("/auth/logout", {
           method: "POST",
+          body: JSON.stringify({
+            refresh_token: localStorage.getItem(config.refreshTokenName),
+          }),
         });
       }
     } catch (error) {